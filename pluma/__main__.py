@@ -3,7 +3,7 @@ import traceback
 import os
 from typing import Any, Callable, Optional
 
-from pluma.core.baseclasses import Logger, LogMode, LogLevel
+from pluma.core.baseclasses import Logger, LogMode, LogLevel, JsonLogSink
 from pluma.core.builder import TestsBuildError
 from pluma.cli import Pluma, TestsConfigError, TargetConfigError
 from pluma.cli.plugins import load_plugin_modules
@@ -15,8 +15,9 @@ CHECK_COMMAND = 'check'
 TESTS_COMMAND = 'tests'
 CLEAN_COMMAND = 'clean'
 VERSION_COMMAND = 'version'
+RESULTS_COMMAND = 'results'
 COMMANDS = [RUN_COMMAND, CHECK_COMMAND,
-            TESTS_COMMAND, CLEAN_COMMAND, VERSION_COMMAND]
+            TESTS_COMMAND, CLEAN_COMMAND, VERSION_COMMAND, RESULTS_COMMAND]
 
 
 def arg_is_x(arg: Any, predicate: Callable, err_msg: Optional[str] = None):
@@ -41,7 +42,12 @@ def parse_arguments():
                         help=f'command for pluma, defaults to "{RUN_COMMAND}". "{RUN_COMMAND}": Run the tests suite, '
                         f'"{CHECK_COMMAND}": validate configuration files and tests, '
                         f'"{TESTS_COMMAND}": list all tests available and selected, '
-                        f'"{CLEAN_COMMAND}": remove logs, toolchains, and built executables')
+                        f'"{CLEAN_COMMAND}": remove logs, toolchains, and built executables, '
+                        f'"{RESULTS_COMMAND}": analyse the data of results FILES')
+    parser.add_argument(
+        'files', metavar='FILES', nargs='*',
+        type=lambda arg: arg_is_file(arg, 'Results'),
+        help=f'results files to analyse, for the "{RESULTS_COMMAND}" command')
     parser.add_argument(
         '-v', '--verbose', action='store_const', const=True,
         help='prints more information related to tests and progress')
@@ -69,8 +75,45 @@ def parse_arguments():
     parser.add_argument(
         '--debug', action='store_const', const=True,
         help='enable debug information')
+    parser.add_argument(
+        '-j', '--jobs', type=lambda arg: arg_is_x(int(arg), lambda jobs: jobs > 0,
+                                                  'jobs must be a positive integer'),
+        help='run up to JOBS tests concurrently, when they do not use the same resources')
+    parser.add_argument(
+        '--log-json', metavar='FILE',
+        help='also write structured log records to FILE, as newline-delimited JSON')
+    parser.add_argument(
+        '--resume', metavar='JOURNAL',
+        help='resume an interrupted run from its results JOURNAL, and append to it')
+    parser.add_argument(
+        '--profile', metavar='DIR', nargs='?', const='',
+        help='profile the tasks of each test and the test loop, and write the profiles to DIR. '
+        'Default: "pluma-profile-<timestamp>"')
+    parser.add_argument(
+        '--percentiles', metavar='LIST',
+        type=lambda arg: [float(p) for p in arg.split(',')],
+        help='comma separated percentiles of data fields to compute, for the '
+        f'"{RESULTS_COMMAND}" command. Default: "50,90,99"')
+    parser.add_argument(
+        '--rolling-window', metavar='N',
+        type=lambda arg: arg_is_x(int(arg), lambda window: window > 0,
+                                  'rolling window must be a positive integer'),
+        help=f'number of values in rolling window statistics, for the "{RESULTS_COMMAND}" '
+        'command. Default: 10')
+    parser.add_argument(
+        '--group-by', metavar='SETTING', action='append',
+        help=f'also analyse data fields per value of the test SETTING, for the '
+        f'"{RESULTS_COMMAND}" command')
+    parser.add_argument(
+        '-o', '--output', metavar='FILE',
+        help=f'write the analysis to FILE as JSON, for the "{RESULTS_COMMAND}" command')
 
     args = parser.parse_args()
+    if args.files and args.command != RESULTS_COMMAND:
+        parser.error(f'results files can only be passed to the "{RESULTS_COMMAND}" command')
+    if args.command == RESULTS_COMMAND and not args.files:
+        parser.error(f'the "{RESULTS_COMMAND}" command requires at least one results file')
+
     return args
 
 
@@ -98,10 +141,17 @@ def main():
         for plugin_dir in args.plugin:
             load_plugin_modules(plugin_dir)
 
+    json_sink = None
+    if args.log_json:
+        json_sink = JsonLogSink(args.log_json)
+        log.add_sink(json_sink)
+
     try:
         command = args.command
         if command == RUN_COMMAND:
-            success = Pluma.execute_run(tests_config_path, target_config_path)
+            success = Pluma.execute_run(tests_config_path, target_config_path,
+                                        jobs=args.jobs, resume=args.resume,
+                                        profile=args.profile)
             exit(0 if success else 1)
         elif command == CHECK_COMMAND:
             Pluma.execute_run(tests_config_path, target_config_path,
@@ -112,6 +162,10 @@ def main():
             Pluma.execute_clean(args.force)
         elif command == VERSION_COMMAND:
             log.log(Pluma.version(), level=LogLevel.IMPORTANT)
+        elif command == RESULTS_COMMAND:
+            Pluma.execute_results(args.files, output=args.output,
+                                  percentiles=args.percentiles,
+                                  rolling_window=args.rolling_window, group_by=args.group_by)
     except TestsConfigError as e:
         log.error(
             [f'Error while parsing the tests configuration ({tests_config_path}):', str(e)])
@@ -129,6 +183,9 @@ def main():
             traceback.print_exc()
         log.error(repr(e))
         exit(-1)
+    finally:
+        if json_sink:
+            log.remove_sink(json_sink)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,18 @@
 from pluma.cli.resultsconfig import ResultsConfig
+import json
 import sys
 import time
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
 from pluma.core.baseclasses import Logger, LogLevel
 from pluma.core.builder import TestsBuildError,  YoctoCBuilder
-from pluma.test import TestController
-from pluma.cli import PlumaContext, PlumaConfig, TestsConfig, TargetConfig
+from pluma.test import TestController, ResultsJournal, ResultsAnalyser, load_results_files, \
+    merge_iteration_results, Profiler
+from pluma.test.profiling import HOTSPOTS_FILE
+from pluma.utils import json_dump_streamed
+from pluma.cli import PlumaContext, PlumaConfig, TestsConfig, TargetConfig, TestsConfigError
 from pluma.cli import PythonTestsProvider, ShellTestsProvider, CTestsProvider, \
     DeviceActionProvider
 from pkg_resources import get_distribution
@@ -28,20 +33,140 @@ class Pluma:
 
     @staticmethod
     def execute_run(tests_config_path: str, target_config_path: str,
-                    check_only: bool = False) -> bool:
-        '''Execute the "run" command, and allow checking only ("check" command).'''
+                    check_only: bool = False, jobs: int = None, resume: str = None,
+                    profile: str = None) -> bool:
+        '''Execute the "run" command, and allow checking only ("check" command).
+
+        If "resume" is set, the run continues from this results journal.
+        If "profile" is set, the tasks of each test and the TestController loop
+        are profiled, and the profiles written to this folder, or to
+        "pluma-profile-<timestamp>" if empty.
+        '''
 
         context = Pluma.create_target_context(target_config_path)
         tests_config = Pluma.create_tests_config(tests_config_path, context)
         results_config = Pluma.create_results_config(tests_config)
 
-        controller = Pluma.build_test_controller(tests_config, context, show_tests_list=check_only)
+        if len(context.boards) > 1:
+            return Pluma.execute_farm_run(tests_config, context, results_config,
+                                          check_only=check_only, jobs=jobs, resume=resume,
+                                          profile=profile)
+
+        controller = Pluma.build_test_controller(tests_config, context, show_tests_list=check_only,
+                                                 jobs=jobs)
+        Pluma.set_results_journal(controller, results_config, resume=resume)
         if check_only:
             log.log('Configuration and tests successfully validated.',
                     level=LogLevel.IMPORTANT)
             return True
 
-        success = controller.run()
+        if resume:
+            controller.resume()
+
+        profiler = Profiler() if profile is not None else None
+        controller.profiler = profiler
+        try:
+            success = controller.run()
+        finally:
+            if profiler:
+                Pluma.write_profile(profiler, profile)
+
+        Pluma.log_run_result(success)
+        Pluma.save_results(controller, results_config)
+
+        return success
+
+    @staticmethod
+    def execute_farm_run(tests_config: TestsConfig, context: PlumaContext,
+                         results_config: ResultsConfig, check_only: bool = False,
+                         jobs: int = None, resume: str = None, profile: str = None) -> bool:
+        '''Run the tests sequence on all the boards of a farm concurrently.
+
+        With the "sharding" setting, the boards share the tests ("tests") or
+        the iterations ("iterations") to run, instead of each running all of them.
+        If "resume" is set, each board continues from its own results journal,
+        named after this one. If "profile" is set, the boards share the same
+        profiler, as for a single board.
+        '''
+        if resume and tests_config.sharding == 'iterations':
+            raise TestsConfigError('Resuming a run is not supported when sharding iterations')
+
+        tests_list_log_level = LogLevel.INFO if check_only else LogLevel.NOTICE
+        tests_config.print_tests(log_level=tests_list_log_level)
+
+        board_names = [board.name for board in context.boards]
+        if tests_config.sharding == 'tests':
+            controllers = {', '.join(board_names):
+                           tests_config.create_sharded_test_controller(context.boards)}
+        elif tests_config.sharding == 'iterations':
+            controllers = dict(zip(board_names, tests_config.create_iteration_sharded_controllers(
+                context.boards, jobs=jobs)))
+        else:
+            controllers = {board.name: tests_config.create_test_controller(board, jobs=jobs)
+                           for board in context.boards}
+
+        for name, controller in controllers.items():
+            Pluma.set_results_journal(controller, results_config,
+                                      board_name=None if tests_config.sharding == 'tests' else name,
+                                      resume=resume)
+
+        if check_only:
+            log.log('Configuration and tests successfully validated.',
+                    level=LogLevel.IMPORTANT)
+            return True
+
+        if resume:
+            for controller in controllers.values():
+                controller.resume()
+
+        profiler = Profiler() if profile is not None else None
+        for controller in controllers.values():
+            controller.profiler = profiler
+
+        sharding = f', sharding {tests_config.sharding}' if tests_config.sharding else ''
+        log.log(f'Running tests on {len(board_names)} boards{sharding}: {board_names}',
+                level=LogLevel.IMPORTANT, bold=True)
+
+        board_success = {}
+        with ThreadPoolExecutor(max_workers=len(controllers)) as executor:
+            futures = {name: executor.submit(controller.run)
+                       for name, controller in controllers.items()}
+            for name, future in futures.items():
+                try:
+                    board_success[name] = bool(future.result())
+                except Exception as e:
+                    log.error(f'{name}: Testing aborted due to exception: {e!r}')
+                    board_success[name] = False
+
+        if profiler:
+            Pluma.write_profile(profiler, profile)
+
+        for name, board_passed in board_success.items():
+            log.log(f'{name}: {"PASS" if board_passed else "FAIL"}',
+                    level=LogLevel.IMPORTANT, color='green' if board_passed else 'red')
+
+        success = all(board_success.values())
+        Pluma.log_run_result(success)
+
+        if tests_config.sharding == 'tests':
+            Pluma.save_results(next(iter(controllers.values())), results_config)
+        elif tests_config.sharding == 'iterations':
+            Pluma.save_sharded_iterations_results(list(controllers.values()), results_config)
+        else:
+            Pluma.save_farm_results(controllers, results_config)
+
+        return success
+
+    @staticmethod
+    def write_profile(profiler: Profiler, profile_dir: str = None):
+        '''Write the profiles of a run, by default to "pluma-profile-<timestamp>"'''
+        profile_dir = profile_dir or f'pluma-profile-{START_TIMESTAMP}'
+        profiler.write(profile_dir)
+        log.log(f'Profiles written to "{profile_dir}", hot spots in '
+                f'"{os.path.join(profile_dir, HOTSPOTS_FILE)}"', level=LogLevel.IMPORTANT)
+
+    @staticmethod
+    def log_run_result(success: bool):
         if success:
             log.log('All tests were successful.',
                     level=LogLevel.IMPORTANT, color='green', bold=True)
@@ -49,10 +174,6 @@ class Pluma:
             log.log('One of more test failed.',
                     level=LogLevel.IMPORTANT, color='red', bold=True)
 
-        Pluma.save_results(controller, results_config)
-
-        return success
-
     @staticmethod
     def execute_tests(tests_config_path: str, target_config_path: str):
         '''Execute the "tests" command, listing all tests.'''
@@ -80,6 +201,28 @@ class Pluma:
 
         YoctoCBuilder.clean(force)
 
+    @staticmethod
+    def execute_results(files: List[str], output: str = None, percentiles: List[float] = None,
+                        rolling_window: int = None, group_by: List[str] = None) -> dict:
+        '''Execute the "results" command, analysing the data of results files.
+
+        The analysis is written to "output" as JSON if set, or printed otherwise.
+        '''
+        analyser = ResultsAnalyser(percentiles=percentiles, rolling_window=rolling_window,
+                                   group_by=group_by)
+        for results in load_results_files(files):
+            analyser.add_results(results)
+
+        analysis = analyser.analyse()
+        if output:
+            with open(output, 'w') as f:
+                json.dump(analysis, f, indent=4)
+            log.log(f'Results analysis written to "{output}"', level=LogLevel.IMPORTANT)
+        else:
+            log.log(json.dumps(analysis, indent=4), level=LogLevel.IMPORTANT)
+
+        return analysis
+
     @staticmethod
     def create_target_context(target_config_path: str) -> PlumaContext:
         env_vars = dict(os.environ)
@@ -102,7 +245,13 @@ class Pluma:
         tests_config = PlumaConfig.load_configuration('Tests config', tests_config_path,
                                                       PlumaConfigPreprocessor(context.variables))
         default_log = f'pluma-{START_TIMESTAMP}.log'
-        context.board.log_file = tests_config.pop_optional(str, 'log', default_log)
+        log_file = tests_config.pop_optional(str, 'log', default_log)
+        if len(context.boards) > 1:
+            log_root, log_ext = os.path.splitext(log_file)
+            for board in context.boards:
+                board.log_file = f'{log_root}-{board.name}{log_ext}'
+        else:
+            context.board.log_file = log_file
 
         return TestsConfig(tests_config, Pluma.tests_providers())
 
@@ -112,12 +261,12 @@ class Pluma:
 
     @staticmethod
     def build_test_controller(tests_config: TestsConfig, target_context: PlumaContext,
-                              show_tests_list: bool) -> TestController:
+                              show_tests_list: bool, jobs: int = None) -> TestController:
 
         tests_list_log_level = LogLevel.INFO if show_tests_list else LogLevel.NOTICE
         tests_config.print_tests(log_level=tests_list_log_level)
 
-        return tests_config.create_test_controller(target_context.board)
+        return tests_config.create_test_controller(target_context.board, jobs=jobs)
 
     @staticmethod
     def version() -> str:
@@ -126,14 +275,80 @@ class Pluma:
         return get_distribution(top_level_package).version
 
     @staticmethod
-    def save_results(controller: TestController, results_config: ResultsConfig):
+    def set_results_journal(controller: TestController, results_config: ResultsConfig,
+                            board_name: str = None, resume: str = None):
+        '''Journal the results of each iteration and checkpoint the run, if configured.
+
+        If "resume" is set, it is used as the journal, which must exist.
+        '''
+        journal_file = resume or results_config.journal
+        if not journal_file:
+            return
+
+        if board_name:
+            journal_root, journal_ext = os.path.splitext(journal_file)
+            journal_file = f'{journal_root}-{board_name}{journal_ext}'
+
+        if resume and not os.path.isfile(journal_file):
+            raise FileNotFoundError(f'Results journal to resume not found: {journal_file}')
+
+        controller.results_journal = ResultsJournal(
+            journal_file, fsync_interval_s=results_config.journal_fsync_interval_s,
+            resume=bool(resume))
+        controller.checkpoint_file = f'{journal_file}.checkpoint'
+        controller.settings['results_in_memory'] = results_config.iterations_in_memory
+
+    @staticmethod
+    def controller_results(controller: TestController) -> dict:
+        '''Return the results of a TestController, as saved in the results file.
+
+        Iteration results are returned as an iterator, as they may have to be
+        read back from the results journal.
+        '''
         settings_summary = controller.collect_test_settings()
         data_summary = controller.get_test_data_summary()
-        results = {
+        tasks_summary = controller.get_tasks_summary()
+        return {
             'data': data_summary,
+            'tasks': tasks_summary,
             'settings': settings_summary,
-            'results': controller.results
+            'results': controller.all_results()
+        }
+
+    @staticmethod
+    def save_results(controller: TestController, results_config: ResultsConfig):
+        results = Pluma.controller_results(controller)
+
+        with open(results_config.path, 'w') as f:
+            json_dump_streamed(results, f, indent=4)
+
+    @staticmethod
+    def save_sharded_iterations_results(controllers: List[TestController],
+                                        results_config: ResultsConfig):
+        '''Save the merged results of boards sharing iterations, as for a single board'''
+        first = controllers[0]
+        summary_builder = first.results_processor.summary_builder()
+        for result in merge_iteration_results(controllers):
+            summary_builder.add(result)
+
+        results = {
+            'data': summary_builder.summary(first.testrunner.tests),
+            'tasks': summary_builder.tasks_summary(first.testrunner.tests),
+            'settings': first.collect_test_settings(),
+            'results': merge_iteration_results(controllers)
+        }
+
+        with open(results_config.path, 'w') as f:
+            json_dump_streamed(results, f, indent=4)
+
+    @staticmethod
+    def save_farm_results(controllers: Dict[str, TestController],
+                          results_config: ResultsConfig):
+        '''Save the results of all boards in a single file, under "boards"'''
+        results = {
+            'boards': {name: Pluma.controller_results(controller)
+                       for name, controller in controllers.items()}
         }
 
         with open(results_config.path, 'w') as f:
-            json.dump(results, f, indent=4)
+            json_dump_streamed(results, f, indent=4)
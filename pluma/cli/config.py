@@ -1,7 +1,8 @@
 import yaml
 import json
 import os
-from typing import Optional, List, TypeVar, Type, Union, overload, cast
+from itertools import product
+from typing import Any, Iterator, Optional, List, TypeVar, Type, Union, overload, cast
 from abc import ABC, abstractmethod
 from yaml.parser import ParserError
 
@@ -70,6 +71,10 @@ class Configuration:
                 if datatype is int and isinstance(value, str):
                     value = int(value)
                     converted = True
+                elif datatype is float and isinstance(value, (int, str)) \
+                        and not isinstance(value, bool):
+                    value = float(value)
+                    converted = True
                 elif datatype is Configuration and isinstance(value, dict):
                     value = Configuration(value)
                     converted = True
@@ -145,6 +150,29 @@ class TestDefinition():
     def __repr__(self):
         return f'{self.__module__}.{self.__class__.__name__}{self.parameter_sets or ""}'
 
+    def iter_parameter_sets(self) -> Iterator[Any]:
+        '''Yield the parameter sets of the test, one at a time.
+
+        A parameter set with a "sweep" attribute, mapping parameter names to
+        lists of values, is expanded to one parameter set for each combination
+        of values (cartesian product), with the other parameters of the set.
+        '''
+        for parameters in self.parameter_sets:
+            if not isinstance(parameters, dict) or 'sweep' not in parameters:
+                yield parameters
+                continue
+
+            parameters = dict(parameters)
+            sweep = parameters.pop('sweep')
+            if not isinstance(sweep, dict) or \
+                    not all(isinstance(values, list) for values in sweep.values()):
+                raise ValueError(
+                    f'The "sweep" of test "{self.name}" should map parameter names '
+                    f'to lists of values, but got {sweep}')
+
+            for values in product(*sweep.values()):
+                yield {**parameters, **dict(zip(sweep, values))}
+
     @property
     def description(self):
         return self.testclass.description()
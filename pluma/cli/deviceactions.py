@@ -4,7 +4,7 @@ import time
 
 from typing import List, Union
 
-from pluma.core.baseclasses import Logger, LogLevel
+from pluma.core.baseclasses import Logger, LogLevel, cancellable_input
 from pluma import Board
 from pluma.test import TaskFailed
 from pluma.cli import DeviceActionBase, DeviceActionRegistry
@@ -15,12 +15,14 @@ log = Logger()
 @DeviceActionRegistry.register('power_on')
 class PowerOnAction(DeviceActionBase):
     def execute(self):
+        self.board.forget_state()
         self.board.power.on()
 
 
 @DeviceActionRegistry.register('power_off')
 class PowerOffAction(DeviceActionBase):
     def execute(self):
+        self.board.forget_state()
         self.board.power.off()
 
 
@@ -31,6 +33,7 @@ class PowerCycleAction(DeviceActionBase):
         self.off_duration_ms = off_duration_ms or 1000
 
     def execute(self):
+        self.board.forget_state()
         self.board.power.off()
         time.sleep(self.off_duration_ms / 1000)
         self.board.power.on()
@@ -38,8 +41,12 @@ class PowerCycleAction(DeviceActionBase):
 
 @DeviceActionRegistry.register('login')
 class LoginAction(DeviceActionBase):
+    def __init__(self, board: Board, force: bool = False):
+        super().__init__(board)
+        self.force = force
+
     def execute(self):
-        self.board.login()
+        self.board.login(force=self.force)
 
 
 @DeviceActionRegistry.register('wait')
@@ -152,7 +159,7 @@ class ManualDeviceAction(ManualDeviceActionBase):
                 f'{os.linesep}  > {self.message}'
                 f'{os.linesep}Press ENTER when done',
                 level=LogLevel.INFO, bypass_hold=True, newline=False)
-        input()
+        cancellable_input()
 
 
 @DeviceActionRegistry.register('manual_test')
@@ -176,12 +183,12 @@ class ManualTestDeviceAction(ManualDeviceActionBase):
                     f'{os.linesep}  > Expected: {self.message}'
                     f'{os.linesep}Was the test successful? [y/n]: ',
                     level=LogLevel.INFO, bypass_hold=True, newline=False)
-            entered = input().lower()
+            entered = cancellable_input().lower()
 
         log.log(f'The user entered: "{entered}"', level=LogLevel.INFO,
                 bypass_hold=True)
         log.log('Comments: ', level=LogLevel.INFO, bypass_hold=True, newline=False)
-        comments = input()
+        comments = cancellable_input()
         log.log(f'The user entered: "{comments}"',
                 level=LogLevel.INFO, bypass_hold=True)
 
@@ -1,10 +1,20 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
 from pluma import Board
 
 
 @dataclass
 class PlumaContext:
-    '''Data class for Pluma context'''
+    '''Data class for Pluma context.
+
+    "board" is the main board, and "boards" all the boards of the farm,
+    when the target configuration defines multiple boards.
+    '''
     board: Board
     variables: dict
+    boards: List[Board] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.boards:
+            self.boards = [self.board]
@@ -1,8 +1,11 @@
-
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
 class ResultsConfig:
     '''Data class to hold the results settings'''
     path: str
+    journal: Optional[str] = None
+    journal_fsync_interval_s: Optional[float] = None
+    iterations_in_memory: Optional[int] = None
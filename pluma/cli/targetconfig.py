@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from copy import deepcopy
 
 from pluma import Board, SerialConsole, SSHConsole, SoftPower, IPPowerPDU
@@ -34,42 +34,44 @@ class TargetConfig:
             config.pop_optional(Configuration, 'variables'))
         system = TargetFactory.parse_system_context(
             config.pop_optional(Configuration, 'system'))
-        consoles = TargetFactory.create_consoles(
-            config.pop_optional(Configuration, 'console'), system)
 
-        serial = consoles.get('serial')
-        ssh = consoles.get('ssh')
-        if not serial and not ssh:
-            log.warning("No console defined in the device configuration file")
-
-        power = TargetFactory.create_power_control(
-            config.pop_optional(Configuration, 'power'), ssh or serial)
+        boards_config = config.pop_optional(Configuration, 'boards')
+        if boards_config:
+            boards = TargetFactory.create_boards(boards_config, system)
+        else:
+            boards = [TargetFactory.create_board('Test board', config, system)]
 
         config.ensure_consumed()
 
-        board = Board('Test board', console=consoles, power=power,
-                      system=system)
-        return PlumaContext(board, variables=variables)
+        return PlumaContext(boards[0], variables=variables, boards=boards)
 
     @staticmethod
     def print_context_settings(context: PlumaContext):
-        log.log('Components:', bold=True)
+        for board in context.boards:
+            if len(context.boards) > 1:
+                log.log(f'{board.name} components:', bold=True)
+            else:
+                log.log('Components:', bold=True)
 
-        serial = context.board.get_console('serial')
-        suffix = 'Default' if serial and context.board.console is serial else None
+            TargetConfig.print_board_settings(board)
+
+    @staticmethod
+    def print_board_settings(board: Board):
+        serial = board.get_console('serial')
+        suffix = 'Default' if serial and board.console is serial else None
         TargetConfig.print_component('Serial', serial, suffix)
 
-        ssh = context.board.get_console('ssh')
-        suffix = 'Default' if ssh and context.board.console is ssh else None
+        ssh = board.get_console('ssh')
+        suffix = 'Default' if ssh and board.console is ssh else None
         TargetConfig.print_component('SSH', ssh, suffix)
 
-        TargetConfig.print_component('Prompt', context.board.system.prompt_regex)
-        TargetConfig.print_component('Login', context.board.system.credentials.login)
+        TargetConfig.print_component('Prompt', board.system.prompt_regex)
+        TargetConfig.print_component('Login', board.system.credentials.login)
         TargetConfig.print_component(
-            'Password', '******' if context.board.system.credentials.password else None)
-        TargetConfig.print_component('Power control', context.board.power)
-        TargetConfig.print_component('Storage', context.board.storage)
-        TargetConfig.print_component('USB Hub', context.board.hub)
+            'Password', '******' if board.system.credentials.password else None)
+        TargetConfig.print_component('Power control', board.power)
+        TargetConfig.print_component('Storage', board.storage)
+        TargetConfig.print_component('USB Hub', board.hub)
         log.log('')
 
     @staticmethod
@@ -83,6 +85,43 @@ class TargetConfig:
 
 
 class TargetFactory:
+    @staticmethod
+    def create_boards(boards_config: Configuration,
+                      system: SystemContext) -> List[Board]:
+        '''Create the boards of a farm, "system" being the default system context'''
+        boards = []
+        while boards_config:
+            board_name, board_dict = boards_config.popitem()
+            if not isinstance(board_dict, dict):
+                raise TargetConfigError(f'Invalid configuration for board "{board_name}", '
+                                        f'which should be a dictionary but got "{board_dict}"')
+
+            board_config = Configuration(board_dict)
+            board_system = TargetFactory.parse_system_context(
+                board_config.pop_optional(Configuration, 'system'), default=system)
+            boards.append(TargetFactory.create_board(board_name, board_config, board_system))
+            board_config.ensure_consumed()
+
+        # popitem returns the last item first
+        boards.reverse()
+        return boards
+
+    @staticmethod
+    def create_board(name: str, config: Configuration, system: SystemContext) -> Board:
+        '''Create a board from its "console" and "power" configuration'''
+        consoles = TargetFactory.create_consoles(
+            config.pop_optional(Configuration, 'console'), system)
+
+        serial = consoles.get('serial')
+        ssh = consoles.get('ssh')
+        if not serial and not ssh:
+            log.warning(f'No console defined for "{name}" in the device configuration file')
+
+        power = TargetFactory.create_power_control(
+            config.pop_optional(Configuration, 'power'), ssh or serial)
+
+        return Board(name, console=consoles, power=power, system=system)
+
     @staticmethod
     def parse_variables(variables_config: Optional[Configuration]) -> dict:
         if not variables_config:
@@ -102,9 +141,10 @@ class TargetFactory:
         return credentials
 
     @staticmethod
-    def parse_system_context(system_config: Optional[Configuration]) -> SystemContext:
+    def parse_system_context(system_config: Optional[Configuration],
+                             default: SystemContext = None) -> SystemContext:
         if not system_config:
-            return SystemContext()
+            return deepcopy(default) if default else SystemContext()
 
         credentials = TargetFactory.parse_credentials(
             system_config.pop_optional(Configuration, 'credentials'))
@@ -1,11 +1,15 @@
 import os
 import yaml
-from typing import List, Optional, Union, cast
+from copy import deepcopy
+from typing import Dict, Iterator, List, Optional, Union, cast
 
 from pluma.cli.resultsconfig import ResultsConfig
 from pluma.core.baseclasses import Logger, LogLevel
-from pluma.test import TestController, TestRunner, TestBase
-from pluma.test.stock.deffuncs import sc_run_n_iterations
+from pluma.test import TestController, TestRunner, TestRunnerBase, TestRunnerParallel, \
+    TestRunnerSharded, TestBase, TestHistory, TestResultCache, IterationPool, copy_test_for_board, \
+    FixtureRegistry, EarlyStopping
+from pluma.test.stock.deffuncs import sc_run_n_iterations, sc_run_shared_iterations, \
+    sc_run_until_confident
 from pluma.cli import Configuration, ConfigurationError, TestsConfigError, TestDefinition,\
     TestsProvider
 from pluma import Board
@@ -15,6 +19,7 @@ log = Logger()
 
 SETTINGS_SECTION = 'settings'
 RESULTS_SECTION = 'results'
+SHARDING_MODES = ['tests', 'iterations']
 
 
 class TestsConfig:
@@ -33,39 +38,132 @@ class TestsConfig:
                                                    Configuration())
         self.results_config = self.settings_config.pop_optional(Configuration, RESULTS_SECTION,
                                                                 Configuration())
+        self.sharding = self.settings_config.pop_optional(str, 'sharding')
+        if self.sharding is not None and self.sharding not in SHARDING_MODES:
+            raise TestsConfigError(
+                f'Invalid sharding mode "{self.sharding}", must be one of {SHARDING_MODES}')
+
         self.test_providers: List[TestsProvider] = test_providers
         self.tests: List[TestDefinition] = []
 
+        # Tests history files, shared by the controllers of all boards
+        self.histories: Dict[str, TestHistory] = {}
+
+        # Result cache files, shared by the controllers of all boards
+        self.result_caches: Dict[str, TestResultCache] = {}
+
         self.__populate_tests(config)
 
         config.ensure_consumed()
 
-    def create_test_controller(self, board: Board) -> TestController:
-        '''Create a TestController from the configuration, and Board'''
+    def create_test_controller(self, board: Board, jobs: int = None,
+                               tests: List[TestBase] = None) -> TestController:
+        '''Create a TestController from the configuration, and Board.
+
+        If "jobs" is more than 1, tests are run concurrently with up to "jobs" workers.
+        If "tests" are provided, they are used instead of creating them for the board.
+        '''
         if not board or not isinstance(board, Board):
             raise ValueError(
                 f'Null or invalid \'board\', which must be of type \'{Board}\'')
 
-        settings = self.settings_config
+        return self._create_test_controller_from_config(board=board, jobs=jobs, tests=tests)
+
+    def create_sharded_test_controller(self, boards: List[Board]) -> TestController:
+        '''Create a TestController running its tests across a pool of identical boards'''
+        if not boards or not all(isinstance(board, Board) for board in boards):
+            raise ValueError(
+                f'Null or invalid \'boards\', which must be a list of \'{Board}\'')
+
+        return self._create_test_controller_from_config(board=boards[0], boards=boards)
+
+    def create_iteration_sharded_controllers(self, boards: List[Board],
+                                             jobs: int = None) -> List[TestController]:
+        '''Create a TestController per board, sharing the iterations to run.
+
+        Tests are the same for all boards, so that their results can be merged.
+        '''
+        iterations = self.settings_config.read_and_keep('iterations')
+        if not iterations:
+            raise TestsConfigError(
+                'The "iterations" setting is required to shard iterations between boards')
+        if self.settings_config.read_and_keep('early_stopping'):
+            raise TestsConfigError(
+                'The "early_stopping" setting is not supported when sharding iterations')
+
+        pool = IterationPool(int(iterations))
+        tests = TestsConfig.create_tests(self.selected_tests(), boards[0])
+
+        controllers = []
+        for board in boards:
+            controller = self.create_test_controller(
+                board, jobs=jobs, tests=[copy_test_for_board(test, board) for test in tests])
+            controller.run_condition = sc_run_shared_iterations(pool=pool)
+            controllers.append(controller)
+
+        return controllers
+
+    def _create_test_controller_from_config(self, board: Board, **kwargs) -> TestController:
+        # Each controller consumes its own copy, to allow one per board
+        settings = deepcopy(self.settings_config)
 
         try:
-            controller = self._create_test_controller(board, settings)
+            controller = self._create_test_controller(board, settings, **kwargs)
             settings.ensure_consumed()
         except ConfigurationError as e:
             raise TestsConfigError(e)
         else:
             return controller
 
-    def _create_test_controller(self, board: Board, settings: Configuration) -> TestController:
-        testrunner = TestRunner(
-            board=board,
-            tests=TestsConfig.create_tests(
-                self.selected_tests(), board),
+    def _create_test_controller(self, board: Board, settings: Configuration,
+                                jobs: int = None, tests: List[TestBase] = None,
+                                boards: List[Board] = None) -> TestController:
+        if tests is None:
+            tests = TestsConfig.create_tests(self.selected_tests(), board)
+
+        try:
+            TestRunnerBase.dependency_order(tests, TestRunnerBase.dependency_graph(tests))
+        except ValueError as e:
+            raise TestsConfigError(e)
+
+        runner_args = dict(
+            tests=tests,
             email_on_fail=settings.pop_optional(bool, 'email_on_fail', default=False),
             continue_on_fail=settings.pop_optional(bool,
                                                    'continue_on_fail', default=True)
         )
 
+        testrunner: TestRunnerBase
+        if boards:
+            testrunner = TestRunnerSharded(boards=boards, **runner_args)
+        elif jobs and jobs > 1:
+            testrunner = TestRunnerParallel(board=board, jobs=jobs, **runner_args)
+        else:
+            testrunner = TestRunner(board=board, **runner_args)
+
+        history_file = settings.pop_optional(str, 'history')
+        if history_file:
+            if history_file not in self.histories:
+                self.histories[history_file] = TestHistory(history_file)
+            testrunner.history = self.histories[history_file]
+
+        testrunner.task_deadline_s = self._task_deadline(
+            settings.pop_optional(float, 'task_deadline_s'))
+
+        fixtures_config = settings.pop_optional(Configuration, 'fixtures', Configuration())
+        try:
+            for name, args in fixtures_config.content().items():
+                testrunner.fixtures[name] = FixtureRegistry.create(name, args)
+            for test in tests:
+                for name in test.fixtures or []:
+                    FixtureRegistry.fixture_class(name)
+        except (TypeError, ValueError) as e:
+            raise TestsConfigError(f'Invalid fixture: {e}')
+
+        cache_config = settings.pop_optional(Configuration, 'cache')
+        if cache_config:
+            testrunner.result_cache = self._result_cache(cache_config)
+
         controller = TestController(
             testrunner, log_func=log.info,
             verbose_log_func=log.notice,
@@ -73,16 +171,91 @@ class TestsConfig:
         )
 
         iterations = settings.pop_optional(int, 'iterations')
-        if iterations:
+        early_stopping_config = settings.pop_optional(Configuration, 'early_stopping')
+        if early_stopping_config:
+            controller.run_condition = sc_run_until_confident(
+                early_stopping=self._early_stopping(early_stopping_config, iterations))
+        elif iterations:
             controller.run_condition = sc_run_n_iterations(ntimes=int(iterations))
 
         return controller
 
+    @staticmethod
+    def _early_stopping(early_stopping_config: Configuration,
+                        iterations: Optional[int]) -> EarlyStopping:
+        '''Return the sequential test for the "early_stopping" settings, stopping
+        after "iterations" at most'''
+        if not iterations:
+            raise TestsConfigError(
+                'The "iterations" setting is required with "early_stopping", as the '
+                'maximum number of iterations, so that runs on stable boards end')
+
+        field_config = early_stopping_config.pop_optional(Configuration, 'field', Configuration())
+        try:
+            early_stopping = EarlyStopping(
+                confidence=early_stopping_config.pop_optional(float, 'confidence'),
+                min_iterations=early_stopping_config.pop_optional(int, 'min_iterations'),
+                max_iterations=iterations,
+                pass_rate_precision=early_stopping_config.pop_optional(
+                    float, 'pass_rate_precision'),
+                max_failures=early_stopping_config.pop_optional(int, 'max_failures'),
+                max_failure_rate=early_stopping_config.pop_optional(float, 'max_failure_rate'),
+                test=field_config.pop_optional(str, 'test'),
+                field=field_config.pop_optional(str, 'name'),
+                field_precision=field_config.pop_optional(float, 'precision'))
+        except ValueError as e:
+            raise TestsConfigError(f'Invalid "early_stopping" setting: {e}')
+
+        field_config.ensure_consumed()
+        early_stopping_config.ensure_consumed()
+        return early_stopping
+
+    @staticmethod
+    def _task_deadline(deadline_s: Optional[float]) -> Optional[float]:
+        if deadline_s is not None and deadline_s <= 0:
+            raise TestsConfigError(
+                f'"task_deadline_s" must be more than 0, but got {deadline_s}')
+
+        return deadline_s
+
+    def _result_cache(self, cache_config: Configuration) -> TestResultCache:
+        '''Return the result cache for the "cache" settings, shared by file'''
+        cache_file = cache_config.pop(str, 'file')
+        expiry_s = cache_config.pop_optional(float, 'expiry_s')
+        fingerprint = cache_config.pop_optional(str, 'fingerprint')
+        cache_config.ensure_consumed()
+
+        if expiry_s is not None and expiry_s <= 0:
+            raise TestsConfigError(
+                f'The cache "expiry_s" must be more than 0, but got {expiry_s}')
+
+        result_cache = self.result_caches.get(cache_file)
+        if result_cache is None:
+            result_cache = TestResultCache(cache_file, expiry_s=expiry_s,
+                                           fingerprint=fingerprint)
+            self.result_caches[cache_file] = result_cache
+
+        return result_cache
+
     def create_results_config(self, default_file: str) -> ResultsConfig:
         path = self.results_config.pop_optional(str, 'file', default=default_file)
+        journal = self.results_config.pop_optional(str, 'journal')
+        journal_fsync_interval_s = self.results_config.pop_optional(
+            float, 'journal_fsync_interval_s')
+        iterations_in_memory = self.results_config.pop_optional(int, 'iterations_in_memory')
         self.results_config.ensure_consumed()
 
-        return ResultsConfig(path=path)
+        if iterations_in_memory is not None:
+            if not journal:
+                raise TestsConfigError(
+                    'A results "journal" is required to use "iterations_in_memory"')
+            if iterations_in_memory < 1:
+                raise TestsConfigError(
+                    f'"iterations_in_memory" must be at least 1, but got {iterations_in_memory}')
+
+        return ResultsConfig(path=path, journal=journal,
+                             journal_fsync_interval_s=journal_fsync_interval_s,
+                             iterations_in_memory=iterations_in_memory)
 
     def __populate_tests(self, tests_config: Configuration):
         self.tests = []
@@ -221,20 +394,48 @@ class TestsConfig:
 
     @staticmethod
     def create_tests(tests: List[TestDefinition], board: Board) -> List[TestBase]:
-        test_objects = []
+        return list(TestsConfig.iter_tests(tests, board))
+
+    @staticmethod
+    def iter_tests(tests: List[TestDefinition], board: Board) -> Iterator[TestBase]:
+        '''Create the tests for each of their parameter sets, one at a time'''
         for test in tests:
             try:
-                for parameters in test.parameter_sets:
+                for parameters in test.iter_parameter_sets():
                     parameters = parameters if parameters else dict()
 
+                    depends_on = None
+                    cacheable = None
+                    task_deadline_s = None
+                    fixtures = None
                     if isinstance(parameters, dict):
+                        parameters = dict(parameters)
+                        depends_on = parameters.pop('depends_on', None)
+                        cacheable = parameters.pop('cache', None)
+                        task_deadline_s = parameters.pop('task_deadline_s', None)
+                        fixtures = parameters.pop('fixtures', None)
                         test_object = test.testclass(board, **parameters)
                         test_object.settings = parameters
                     else:
                         test_object = test.testclass(board, parameters)
                         test_object.settings = {'default_setting': parameters}
 
-                    test_objects.append(test_object)
+                    if depends_on is not None:
+                        test_object.depends_on = [depends_on] if isinstance(depends_on, str) \
+                            else list(depends_on)
+
+                    if cacheable is not None:
+                        test_object.cacheable = bool(cacheable)
+
+                    if fixtures is not None:
+                        test_object.fixtures = [fixtures] if isinstance(fixtures, str) \
+                            else list(fixtures)
+
+                    if task_deadline_s is not None:
+                        test_object.task_deadline_s = TestsConfig._task_deadline(
+                            float(task_deadline_s))
+
+                    yield test_object
             except Exception as e:
                 if f'{e}'.startswith('__init__()'):
                     raise TestsConfigError(
@@ -244,5 +445,3 @@ class TestsConfig:
                 else:
                     raise TestsConfigError(
                         f'Failed to create test "{test.name}":{os.linesep}    {e}')
-
-        return test_objects
@@ -1,3 +1,5 @@
+from .cancellation import CancellationToken, DeadlineWatchdog, TaskCancelled, \
+    check_cancelled, cancellable_sleep, cancellable_timeout, cancellable_input
 from .hardwarebase import HardwareBase
 from .consoleexceptions import *
 from .consoleengine import ConsoleEngine, ConsoleType, MatchResult
@@ -10,3 +12,4 @@ from .nonblocking import Nonblocking
 from .locking import Locking
 from .singleton import Singleton
 from .logging import Logger, LogMode, LogLevel
+from .logsink import JsonLogSink
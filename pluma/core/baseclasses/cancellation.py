@@ -0,0 +1,224 @@
+import heapq
+import itertools
+import os
+import select
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+""" Longest wait between two checks of a cancellation token, for waits which
+cannot be woken up by the token """
+CANCELLATION_POLL_INTERVAL_S = 0.5
+
+""" Maximum number of bytes read from the standard input at once """
+INPUT_READ_SIZE = 4096
+
+_local = threading.local()
+
+# Data read from each standard input file descriptor by cancellable_input,
+# after the last line returned
+_pending_input: Dict[int, bytes] = {}
+
+
+class TaskCancelled(Exception):
+    '''Raised by cooperative code when its cancellation token is cancelled'''
+
+
+class CancellationToken:
+    '''Cooperative cancellation of a task, cancelled explicitly or by its deadline.
+
+    The token is made current for a thread with :meth:`activate`, and code
+    waiting on hardware checks the current token with :func:`check_cancelled`,
+    sleeps with :func:`cancellable_sleep`, and limits its timeouts with
+    :func:`cancellable_timeout`, to abort promptly with TaskCancelled.
+    '''
+
+    def __init__(self, deadline_s: float = None, reason: str = None):
+        self.deadline_s = deadline_s
+        self.deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+        self.reason = reason or 'Task cancelled'
+        self._cancelled = threading.Event()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.reason}]'
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or \
+            (self.deadline is not None and time.monotonic() >= self.deadline)
+
+    def cancel(self, reason: str = None):
+        '''Cancel the token, waking up the threads sleeping on it'''
+        if reason:
+            self.reason = reason
+        self._cancelled.set()
+
+    def check(self):
+        '''Raise TaskCancelled if the token is cancelled'''
+        if self.cancelled:
+            raise TaskCancelled(self.reason)
+
+    def remaining(self) -> Optional[float]:
+        '''Return the seconds left before the deadline, or None without deadline'''
+        if self.deadline is None:
+            return None
+
+        return max(0.0, self.deadline - time.monotonic())
+
+    def sleep(self, duration: float):
+        '''Sleep for "duration", raising TaskCancelled as soon as cancelled'''
+        end = time.monotonic() + duration
+        while True:
+            self.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+
+            remaining = self.remaining()
+            self._cancelled.wait(left if remaining is None else min(left, remaining))
+
+    @contextmanager
+    def activate(self):
+        '''Make this token the current token of the thread in this context'''
+        previous = getattr(_local, 'token', None)
+        _local.token = self
+        try:
+            yield self
+        finally:
+            _local.token = previous
+
+    @staticmethod
+    def current() -> Optional['CancellationToken']:
+        '''Return the current token of the thread, if any'''
+        return getattr(_local, 'token', None)
+
+
+def check_cancelled():
+    '''Raise TaskCancelled if the current cancellation token is cancelled'''
+    token = CancellationToken.current()
+    if token is not None:
+        token.check()
+
+
+def cancellable_sleep(duration: float):
+    '''Sleep for "duration", raising TaskCancelled if the current token is cancelled'''
+    token = CancellationToken.current()
+    if token is None:
+        time.sleep(duration)
+    else:
+        token.sleep(duration)
+
+
+def cancellable_timeout(timeout: Optional[float]) -> Optional[float]:
+    '''Return "timeout", limited to the time left before the deadline of the
+    current token. Raises TaskCancelled if the token is already cancelled.'''
+    token = CancellationToken.current()
+    if token is None:
+        return timeout
+
+    remaining = token.remaining()
+    token.check()
+    if remaining is None or (timeout is not None and timeout <= remaining):
+        return timeout
+
+    return remaining
+
+
+def cancellable_input() -> str:
+    '''Read a line from the standard input, like "input", raising TaskCancelled
+    if the current token is cancelled first.
+
+    The input is read from the standard input file descriptor, as select()
+    does not report data already buffered by "sys.stdin". Data read after
+    the line, such as lines typed ahead, is kept for the next calls.
+    '''
+    token = CancellationToken.current()
+    try:
+        stdin_fd = sys.stdin.fileno()
+    except (AttributeError, OSError, ValueError):
+        stdin_fd = None
+
+    if stdin_fd is None:
+        return input()
+
+    pending = _pending_input.get(stdin_fd, b'')
+    while b'\n' not in pending:
+        if token is not None:
+            remaining = token.remaining()
+            interval = CANCELLATION_POLL_INTERVAL_S if remaining is None \
+                else min(remaining, CANCELLATION_POLL_INTERVAL_S)
+            token.check()
+            if not select.select([stdin_fd], [], [], interval)[0]:
+                continue
+
+        data = os.read(stdin_fd, INPUT_READ_SIZE)
+        if not data:
+            break
+        pending += data
+
+    if not pending:
+        raise EOFError()
+
+    line, __, rest = pending.partition(b'\n')
+    _pending_input[stdin_fd] = rest
+    return line.decode(sys.stdin.encoding or 'utf-8', errors='replace')
+
+
+class DeadlineWatchdog:
+    '''Thread cancelling the tokens watched when their deadline is reached.
+
+    Cancelling the token wakes up the tasks sleeping on it, and the
+    "on_expired" callback is called with the token, to report the task.
+    '''
+
+    def __init__(self, on_expired=None):
+        self.on_expired = on_expired
+        self._deadlines: List[Tuple[float, int, CancellationToken]] = []
+        self._watched = set()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, token: CancellationToken):
+        '''Cancel "token" once its deadline is reached, unless unwatched before'''
+        if token.deadline is None:
+            return
+
+        with self._condition:
+            self._watched.add(id(token))
+            heapq.heappush(self._deadlines, (token.deadline, next(self._counter), token))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name='DeadlineWatchdog')
+                self._thread.start()
+            self._condition.notify()
+
+    def unwatch(self, token: CancellationToken):
+        '''Stop watching "token", typically once its task completed'''
+        with self._condition:
+            self._watched.discard(id(token))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._deadlines and id(self._deadlines[0][2]) not in self._watched:
+                    heapq.heappop(self._deadlines)
+
+                if not self._deadlines:
+                    self._condition.wait()
+                    continue
+
+                deadline, __, token = self._deadlines[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                heapq.heappop(self._deadlines)
+                self._watched.discard(id(token))
+
+            token.cancel()
+            if self.on_expired:
+                self.on_expired(token)
@@ -7,7 +7,9 @@ from abc import ABC, abstractmethod
 from pluma.core.dataclasses import SystemContext
 from pluma.core.baseclasses import ConsoleEngine, PexpectEngine
 
+from .cancellation import check_cancelled, cancellable_sleep, cancellable_timeout
 from .hardwarebase import HardwareBase
+from .hierarchy import hier_property
 from .logging import LogLevel
 from .consoleexceptions import (ConsoleError, ConsoleCannotOpenError,
                                 ConsoleExceptionKeywordReceivedError,
@@ -35,6 +37,7 @@ class ConsoleBase(HardwareBase, ABC):
         '''Executed after the console is opened.'''
 
     @property
+    @hier_property
     def is_open(self):
         '''Return whether the console is opened or not'''
         return self.engine.is_open
@@ -61,7 +64,9 @@ class ConsoleBase(HardwareBase, ABC):
     def wait_for_match(self, match: List[str], timeout=None) -> Optional[str]:
         '''Wait a maximum duration of 'timeout' for a matching regex, and returns matched text'''
         self.require_open()
-        match_result = self.engine.wait_for_match(match=match, timeout=timeout)
+        match_result = self.engine.wait_for_match(match=match,
+                                                  timeout=cancellable_timeout(timeout))
+        check_cancelled()
         return match_result.text_matched
 
     def wait_for_bytes(self, timeout: Optional[float] = None,
@@ -78,6 +83,7 @@ class ConsoleBase(HardwareBase, ABC):
 
         start_time = time.time()
         while(time.time()-start_time < timeout):
+            check_cancelled()
             self.engine.read_all(preserve_read_buffer=True)
             byte_count = self.engine.reception_buffer_size
 
@@ -88,7 +94,7 @@ class ConsoleBase(HardwareBase, ABC):
             if byte_count > initial_byte_count:
                 return True
 
-            time.sleep(sleep_time)
+            cancellable_sleep(sleep_time)
 
         return False
 
@@ -105,7 +111,7 @@ class ConsoleBase(HardwareBase, ABC):
         now = start
         quiet_start = start
         while(now - start < timeout):
-            time.sleep(sleep_time)
+            cancellable_sleep(sleep_time)
 
             self.read_all(preserve_read_buffer=True)
             reception_buffer_size = self.engine.reception_buffer_size
@@ -163,7 +169,9 @@ class ConsoleBase(HardwareBase, ABC):
         self.send_nonblocking(cmd, send_newline=send_newline,
                               flush_before=flush_before)
 
-        result = self.engine.wait_for_match(timeout=timeout, match=watches)
+        result = self.engine.wait_for_match(timeout=cancellable_timeout(timeout),
+                                            match=watches)
+        check_cancelled()
 
         if result.regex_matched:
             debug_match_str = f'<<matched expects={watches}>>{result.regex_matched}<</matched>>'
@@ -276,6 +284,7 @@ class ConsoleBase(HardwareBase, ABC):
         return data
 
     @property
+    @hier_property
     def support_file_copy(self):
         return False
 
@@ -288,6 +297,7 @@ class ConsoleBase(HardwareBase, ABC):
             f'Console type {self} does not support copying from target')
 
     @property
+    @hier_property
     def requires_login(self):
         return self._requires_login
 
@@ -300,6 +310,8 @@ class ConsoleBase(HardwareBase, ABC):
                                'Set a valid prompt regex for the console')
 
         self.log(f'Waiting for prompt "{prompt_regex}" for {timeout}s')
-        match_result = self.engine.wait_for_match(match=prompt_regex, timeout=timeout)
+        match_result = self.engine.wait_for_match(match=prompt_regex,
+                                                  timeout=cancellable_timeout(timeout))
+        check_cancelled()
         if not match_result.regex_matched:
             raise ConsoleError('No prompt detected.')
@@ -40,6 +40,10 @@ class ConsoleEngine(ABC):
         self._console_type = None
         self._reception_buffer = ''
 
+        # Total number of bytes exchanged with the console
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
     @property
     def console_type(self):
         return self._console_type
@@ -1,3 +1,53 @@
+from typing import Dict, Tuple
+
+HIER_PROPERTY_MARKER = '_hier_property'
+
+
+def hier_property(prop):
+    """ Mark a property as safe to read while walking the hierarchy.
+
+    Properties are skipped by `Hierarchy._get_hier` unless marked, as reading
+    them may have side effects or be slow (e.g. querying udev).
+    Can be applied to a property, or to its getter before `@property`.
+    """
+    fget = prop.fget if isinstance(prop, property) else prop
+    setattr(fget, HIER_PROPERTY_MARKER, True)
+    return prop
+
+
+_hier_schema_cache: Dict[type, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+
+
+def hier_schema(cls: type) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """ Return the class members to walk for a Hierarchy class, computed once per class.
+
+    Returns a tuple of (properties, class attributes) names. Properties are
+    only included if marked with `hier_property`, and methods and other
+    descriptors are excluded.
+    """
+    schema = _hier_schema_cache.get(cls)
+    if schema is None:
+        properties = set()
+        class_attrs = set()
+        seen = set()
+        for klass in cls.__mro__:
+            for name, member in vars(klass).items():
+                if name in seen or (name.startswith('__') and name.endswith('__')):
+                    continue
+                seen.add(name)
+
+                if isinstance(member, property):
+                    if getattr(member.fget, HIER_PROPERTY_MARKER, False):
+                        properties.add(name)
+                elif not (callable(member) or hasattr(member, '__get__')):
+                    class_attrs.add(name)
+
+        schema = (tuple(sorted(properties)), tuple(sorted(class_attrs)))
+        _hier_schema_cache[cls] = schema
+
+    return schema
+
+
 class Hierarchy():
     """ This class is inherited in order add Hierarchy to a class """
 
@@ -19,10 +69,17 @@ class Hierarchy():
         self._children_set_attr("_recurse_hier", _recurse_hier)
 
     def _get_hier(self):
+        properties, class_attrs = hier_schema(type(self))
+        instance_attrs = vars(self)
+
         children = {}
         attrs = {}
-        for m in dir(self):
-            member = getattr(self, m)
+        for m in sorted(set(properties).union(class_attrs, instance_attrs)):
+            if m in instance_attrs and m not in properties:
+                member = instance_attrs[m]
+            else:
+                member = getattr(self, m)
+
             if isinstance(member, Hierarchy):
                 children[m] = member
             elif(not m.startswith("_") and
@@ -1,12 +1,17 @@
 import datetime
 import os
+import shutil
+import sys
+import tempfile
 import textwrap
+import threading
 
+from contextlib import contextmanager
 from enum import Enum, IntEnum
-from typing import Iterable, Union, Optional, Type
+from typing import IO, Iterable, List, Union, Optional, Type
 from pluma.utils import datetime_to_timestamp
 
-from .hierarchy import hier_setter
+from .hierarchy import hier_property, hier_setter
 from .singleton import Singleton
 
 """ Enable logging """
@@ -27,6 +32,9 @@ DEFAULT_LOG_TIME = False
 """ Add log name to logs """
 DEFAULT_LOG_NAME = None
 
+""" Maximum characters kept in memory while the log is held, before spilling to a file """
+DEFAULT_LOG_HOLD_MAX_SIZE = 1024 * 1024
+
 STYLE_NORMAL = '\033[0m'
 STYLE_BOLD = '\033[1m'
 COLOR_STYLES = {
@@ -77,6 +85,58 @@ class LogMode(Enum):
             raise Exception(f'Unreachable: unhandled log level {self}')
 
 
+class LogBuffer:
+    '''Buffer for held log output.
+
+    Output is kept in memory as a list of segments, and moved to a temporary
+    file once more than "max_size" characters are buffered.
+    '''
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size if max_size is not None else DEFAULT_LOG_HOLD_MAX_SIZE
+        self.segments: List[str] = []
+        self.size = 0
+        self.spill_file: Optional[IO[str]] = None
+
+    def __bool__(self):
+        return bool(self.segments) or self.spill_file is not None
+
+    def write(self, message: str):
+        '''Append a message to the buffer'''
+        self.segments.append(message)
+        self.size += len(message)
+
+        if self.size > self.max_size:
+            self._spill()
+
+    def flush(self):
+        pass
+
+    def write_to(self, stream):
+        '''Write the buffer content to a stream, and empty the buffer'''
+        if self.spill_file:
+            self._spill()
+            self.spill_file.seek(0)
+            shutil.copyfileobj(self.spill_file, stream)
+            self.spill_file.close()
+            self.spill_file = None
+        elif self.segments:
+            stream.write(''.join(self.segments))
+
+        stream.flush()
+        self.segments = []
+        self.size = 0
+
+    def _spill(self):
+        '''Move the in-memory segments to the temporary spill file'''
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+
+        self.spill_file.write(''.join(self.segments))
+        self.segments = []
+        self.size = 0
+
+
 class Logger(Singleton):
     '''Global log manager for the standard output.
 
@@ -90,8 +150,11 @@ class Logger(Singleton):
 
         self._initialized = True
         self.mode = LogMode.NORMAL
-        self.held = False
-        self.log_buffer = ''
+        self.hold_max_size = DEFAULT_LOG_HOLD_MAX_SIZE
+        self.sinks: list = []
+        self._context = threading.local()
+        self._thread_state = threading.local()
+        self._output_lock = threading.RLock()
 
     def log(self, message: Union[str, Iterable[str]], color: str = None,
             bold: bool = False, newline: bool = True, indent: int = 0,
@@ -99,11 +162,45 @@ class Logger(Singleton):
         if level is None:
             level = LogLevel.NOTICE
 
+        if self.sinks:
+            self._write_sinks(message, level)
+
         if level < self.mode.min_level():
             return
 
         self._log(message, color, bold, newline, indent, bypass_hold)
 
+    @property
+    def context(self) -> dict:
+        '''Board, test and task names attached to structured log records of this thread'''
+        return dict(getattr(self._context, 'fields', {}))
+
+    @context.setter
+    def context(self, context: dict):
+        self._context.fields = dict(context)
+
+    def set_context(self, board: str = None, test: str = None, task: str = None):
+        '''Set the board, test and task names for structured log records of this thread'''
+        self.context = {'board': board, 'test': test, 'task': task}
+
+    def add_sink(self, sink):
+        '''Open a structured log sink (see `JsonLogSink`), and send it all log records'''
+        sink.open()
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        '''Stop sending log records to a sink, and close it'''
+        self.sinks.remove(sink)
+        sink.close()
+
+    def _write_sinks(self, message: Union[str, Iterable[str]], level: LogLevel):
+        if not isinstance(message, str) and isinstance(message, Iterable):
+            message = os.linesep.join(message)
+
+        context = self.context
+        for sink in self.sinks:
+            sink.write(level, message, **context)
+
     def debug(self, message: Union[str, Iterable[str]], **kwargs):
         self.log(message, level=LogLevel.DEBUG, **kwargs)
 
@@ -150,9 +247,32 @@ class Logger(Singleton):
             message += os.linesep
 
         if self.held and not bypass_hold:
-            self.log_buffer += message
+            self.log_buffer.write(message)
+        elif self._group_buffer is not None:
+            self._group_buffer.write(message)
         else:
-            print(message, end='', flush=not newline)
+            with self._output_lock:
+                print(message, end='', flush=not newline)
+
+    @property
+    def held(self) -> bool:
+        '''Whether the log output of the current thread is held'''
+        return getattr(self._thread_state, 'held', False)
+
+    @held.setter
+    def held(self, held: bool):
+        self._thread_state.held = held
+
+    @property
+    def log_buffer(self) -> LogBuffer:
+        '''Output held for the current thread'''
+        if getattr(self._thread_state, 'log_buffer', None) is None:
+            self._thread_state.log_buffer = LogBuffer(self.hold_max_size)
+        return self._thread_state.log_buffer
+
+    @property
+    def _group_buffer(self) -> Optional[LogBuffer]:
+        return getattr(self._thread_state, 'group_buffer', None)
 
     def hold(self):
         '''Hold the log output until `release` is called.'''
@@ -161,9 +281,32 @@ class Logger(Singleton):
     def release(self):
         '''Flush the log, and restore log output to normal.'''
         self.held = False
-        if self.log_buffer:
-            self._log(self.log_buffer)
-        self.log_buffer = ''
+
+        log_buffer = self.log_buffer
+        self._thread_state.log_buffer = None
+        if log_buffer:
+            log_buffer.write(os.linesep)
+            if self._group_buffer is not None:
+                log_buffer.write_to(self._group_buffer)
+            else:
+                with self._output_lock:
+                    log_buffer.write_to(sys.stdout)
+
+    @contextmanager
+    def group(self):
+        '''Buffer all the output of the current thread, and write it as one block.
+
+        Unlike `hold`, messages bypassing the hold are also buffered. This keeps
+        the output of a test coherent when several tests run concurrently.
+        '''
+        self._thread_state.group_buffer = LogBuffer(self.hold_max_size)
+        try:
+            yield
+        finally:
+            group_buffer = self._group_buffer
+            self._thread_state.group_buffer = None
+            with self._output_lock:
+                group_buffer.write_to(sys.stdout)
 
 
 class Logging():
@@ -173,6 +316,7 @@ class Logging():
                 'This is a base class, and must be inherited')
 
     @property
+    @hier_property
     def log_on(self):
         log = Logger()
         return log.mode != LogMode.SILENT
@@ -185,6 +329,7 @@ class Logging():
             log.mode = LogMode.SILENT
 
     @property
+    @hier_property
     def log_name(self) -> Optional[str]:
         if hasattr(self, "_log_name"):
             return self._log_name
@@ -197,6 +342,7 @@ class Logging():
         self._log_name = log_name
 
     @property
+    @hier_property
     def log_time(self) -> bool:
         if hasattr(self, "_log_time"):
             return self._log_time
@@ -209,6 +355,7 @@ class Logging():
         self._log_time = log_time
 
     @property
+    @hier_property
     def log_time_format(self):
         if hasattr(self, "_log_time_format"):
             return self._log_time_format
@@ -221,6 +368,7 @@ class Logging():
         self._log_time_format = log_time_format
 
     @property
+    @hier_property
     def log_file(self) -> str:
         if not hasattr(self, "_log_file"):
             # Default logfile for all hardwarebasees lives in /tmp
@@ -234,6 +382,7 @@ class Logging():
         self._log_file = log_file
 
     @property
+    @hier_property
     def log_echo(self) -> bool:
         if hasattr(self, "_log_echo"):
             return self._log_echo
@@ -246,6 +395,7 @@ class Logging():
         self._log_echo = log_echo
 
     @property
+    @hier_property
     def log_hier_path(self):
         if hasattr(self, "_log_hier_path"):
             return self._log_hier_path
@@ -0,0 +1,109 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+from .logging import LogLevel
+
+""" Interval between two fsync of the structured log file """
+DEFAULT_LOG_SINK_FSYNC_INTERVAL_S = 1.0
+
+
+class JsonLogSink:
+    '''Structured log sink writing newline-delimited JSON records.
+
+    Records are queued by the logging thread and written by a background
+    thread, so logging never blocks on disk. The file is flushed and synced
+    to disk every "fsync_interval_s" seconds, and when the sink is closed.
+
+    Each record contains the wall clock and monotonic time, the log level,
+    the board, test and task names (when known), and the message.
+    '''
+
+    _STOP = object()
+
+    def __init__(self, file: str, level: LogLevel = None,
+                 fsync_interval_s: float = None):
+        self.file = file
+        self.level = level if level is not None else LogLevel.DEBUG
+        self.fsync_interval_s = fsync_interval_s if fsync_interval_s is not None \
+            else DEFAULT_LOG_SINK_FSYNC_INTERVAL_S
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.file}]'
+
+    @property
+    def is_open(self) -> bool:
+        return self._thread is not None
+
+    def open(self):
+        '''Start the background writer thread'''
+        if self.is_open:
+            return
+
+        logdir = os.path.dirname(self.file)
+        if logdir and not os.path.exists(logdir):
+            os.makedirs(logdir)
+
+        self._thread = threading.Thread(target=self._writer, name=str(self), daemon=True)
+        self._thread.start()
+
+    def close(self):
+        '''Write all pending records, sync the file, and stop the writer thread'''
+        if not self.is_open:
+            return
+
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+    def write(self, level: LogLevel, message: str, board: str = None,
+              test: str = None, task: str = None):
+        '''Queue a record to be written. Never blocks on disk.'''
+        if level < self.level or not self.is_open:
+            return
+
+        self._queue.put({
+            'time': time.time(),
+            'monotonic': time.monotonic(),
+            'level': level.name,
+            'board': board,
+            'test': test,
+            'task': task,
+            'message': message
+        })
+
+    def _writer(self):
+        with open(self.file, 'a', encoding='utf-8') as f:
+            last_sync = time.monotonic()
+            unsynced = False
+            while True:
+                try:
+                    record = self._queue.get(timeout=self.fsync_interval_s)
+                except queue.Empty:
+                    record = None
+
+                if record is self._STOP:
+                    break
+
+                if record is not None:
+                    f.write(json.dumps(record, default=str))
+                    f.write('\n')
+                    unsynced = True
+
+                if unsynced and time.monotonic() - last_sync >= self.fsync_interval_s:
+                    self._sync(f)
+                    last_sync = time.monotonic()
+                    unsynced = False
+
+            self._sync(f)
+
+    @staticmethod
+    def _sync(f):
+        f.flush()
+        os.fsync(f.fileno())
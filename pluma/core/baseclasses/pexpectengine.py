@@ -38,7 +38,7 @@ class PexpectEngine(ConsoleEngine):
 
     def send(self, data: str):
         assert self.is_open
-        self._pex.send(data)
+        self.bytes_sent += self._pex.send(data)
 
     def send_control(self, char: str):
         assert self.is_open
@@ -51,14 +51,15 @@ class PexpectEngine(ConsoleEngine):
             raise AttributeError('Control character must be A-Z')
 
         code = bytes([code_ascii_value])
-        self._pex.send(code)
+        self.bytes_sent += self._pex.send(code)
 
     def _read_from_console(self) -> str:
         received = ''
         try:
             while 1:
-                received += self.decode(
-                    self._pex.read_nonblocking(1, 0.01))
+                data = self._pex.read_nonblocking(1, 0.01)
+                self.bytes_received += len(data)
+                received += self.decode(data)
         except pexpect.TIMEOUT:
             pass
         except pexpect.EOF:
@@ -79,13 +80,16 @@ class PexpectEngine(ConsoleEngine):
         log.debug(f'Waiting up to {timeout}s for patterns: {match}...')
 
         matched_regex = None
+        consumed = True
         try:
             index = self._pex.expect(match, timeout)
             matched_regex = match[index]
         except pexpect.EOF:
             pass
         except pexpect.TIMEOUT:
-            pass
+            # Received data stays in the pexpect buffer, and is counted once
+            # consumed by a later match
+            consumed = False
 
         if matched_regex:
             log.debug(f'Matched {matched_regex}')
@@ -102,6 +106,8 @@ class PexpectEngine(ConsoleEngine):
             matched_regex = None
             matched_text = None
 
+        if consumed:
+            self.bytes_received += len(received)
         text_matched = self.decode(matched_text) if matched_text else None
         text_received = self.decode(received)
 
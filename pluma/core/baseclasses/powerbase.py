@@ -1,6 +1,6 @@
-import time
 from abc import ABC, abstractmethod
 
+from .cancellation import cancellable_sleep
 from .hardwarebase import HardwareBase
 
 
@@ -29,5 +29,5 @@ class PowerBase(HardwareBase, ABC):
     def reboot(self):
         self.off()
         self.log(f'{str(self)}: Waiting {self.reboot_delay}s to power on...')
-        time.sleep(self.reboot_delay)
+        cancellable_sleep(self.reboot_delay)
         self.on()
@@ -1,11 +1,20 @@
+import re
 import time
 from typing import Dict, Optional, Union
 
-from pluma.core.dataclasses import SystemContext
-from pluma.core.baseclasses import ConsoleBase, HardwareBase, PowerBase, StorageBase
+from pluma.core.dataclasses import SystemContext, BoardState
+from pluma.core.baseclasses import ConsoleBase, ConsoleError, HardwareBase, PowerBase, \
+    StorageBase
+from pluma.core.baseclasses.hierarchy import hier_property
 from pluma.core import ConsoleExceptionKeywordReceivedError, \
     BoardFieldInstanceIsNoneError, BoardBootValidationError
 
+""" Token printed by the command probing the state of the board """
+STATE_PROBE_TOKEN = 'pluma-state='
+
+""" Default timeout of the command probing the state of the board """
+DEFAULT_STATE_PROBE_TIMEOUT_S = 2
+
 
 class Board(HardwareBase):
     def __init__(self, name: str, power: PowerBase = None, hub=None,
@@ -32,12 +41,17 @@ class Board(HardwareBase):
         self.last_boot_len: Optional[float] = None
         self.booted_to_prompt = False
 
+        # Last state known, checked by probing the board before skipping a reboot or login
+        self.state: Optional[BoardState] = None
+        self.state_probe_timeout_s = DEFAULT_STATE_PROBE_TIMEOUT_S
+
         self.log_recurse = True
 
     def __repr__(self):
         return 'Board[{}]'.format(self.name)
 
     @property
+    @hier_property
     def console(self) -> Optional[ConsoleBase]:
         if self._current_console_name:
             return self.consoles[self._current_console_name]
@@ -57,6 +71,7 @@ class Board(HardwareBase):
             raise Exception('Unreachable: Failed to find expected console')
 
     @property
+    @hier_property
     def consoles(self) -> Dict[str, ConsoleBase]:
         return self._consoles
 
@@ -117,6 +132,7 @@ class Board(HardwareBase):
 
         self.booted_to_prompt = False
         self.last_boot_len = None
+        self.forget_state()
         self.power.reboot()
         start_time = time.time()
         try:
@@ -142,7 +158,24 @@ class Board(HardwareBase):
 
         return self.last_boot_len
 
-    def login(self):
+    def reboot(self, force: bool = False) -> bool:
+        '''Reboot the board, unless "force" is False and probing the board shows
+        that it is still in the last state known. Returns True if rebooted.'''
+        if self.power is None:
+            raise BoardFieldInstanceIsNoneError('"power" instance is not set')
+
+        if not force and self.verify_state():
+            self.log('Board state unchanged. No need to reboot')
+            return False
+
+        self.booted_to_prompt = False
+        self.forget_state()
+        self.power.reboot()
+        return True
+
+    def login(self, force: bool = False):
+        '''Log in on the console, unless "force" is False and probing the board
+        shows that the user is still logged in on it'''
         if self.console is None:
             raise BoardFieldInstanceIsNoneError(
                 '"console" instance is not set')
@@ -151,6 +184,11 @@ class Board(HardwareBase):
             self.log('Booted to prompt. Not need to log in')
             return
 
+        if not force and self.verify_state(user=self.system.credentials.login):
+            self.log('Already logged in. No need to log in')
+            return
+
+        self.forget_state()
         self.console.login(
             username=self.system.credentials.login,
             password=self.system.credentials.password,
@@ -159,6 +197,56 @@ class Board(HardwareBase):
             success_match=self.system.prompt_regex
         )
 
+        self.state = self.probe_state()
+
+    def probe_state(self) -> Optional[BoardState]:
+        '''Return the state of the board, from a single command printing its boot
+        ID and user on the console, or None if it did not respond in a shell or
+        either of them is unknown'''
+        console = self.console
+        if console is None:
+            return None
+
+        command = (f'echo {STATE_PROBE_TOKEN}$(cat /proc/sys/kernel/random/boot_id '
+                   '2>/dev/null):$(id -un 2>/dev/null)')
+        try:
+            __, matched = console.send_and_expect(
+                command, match=STATE_PROBE_TOKEN + r'[0-9a-f-]*:\S*\s',
+                timeout=self.state_probe_timeout_s)
+        except ConsoleError as e:
+            self.log(f'Failed to probe board state: {e}')
+            return None
+
+        # Without boot ID or user, a reboot or login cannot be ruled out
+        state_match = re.search(STATE_PROBE_TOKEN + r'([0-9a-f-]*):(\S*)', matched or '')
+        if not state_match or not state_match.group(1) or not state_match.group(2):
+            return None
+
+        return BoardState(boot_id=state_match.group(1), user=state_match.group(2),
+                          console=self._current_console_name, time=time.time())
+
+    def verify_state(self, user: str = None) -> bool:
+        '''Return True if the board is still in the last state known, on the same
+        console, with "user" logged in if set. The state is forgotten otherwise.'''
+        if self.state is None or self.state.console != self._current_console_name or \
+                (user is not None and self.state.user != user):
+            return False
+
+        state = self.probe_state()
+        if state is None or state.boot_id != self.state.boot_id or \
+                state.user != self.state.user:
+            self.log(f'Board state changed from {self.state} to {state}')
+            self.forget_state()
+            return False
+
+        self.state = state
+        return True
+
+    def forget_state(self):
+        '''Forget the last state known, for example after a power cycle, so that
+        the next reboot or login is not skipped'''
+        self.state = None
+
 
 def get_board_by_name(boards, name):
     invalid_boards = [b for b in boards if not isinstance(b, Board)]
@@ -1 +1,2 @@
 from .context import SystemContext, Credentials
+from .boardstate import BoardState
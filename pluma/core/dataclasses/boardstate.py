@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class BoardState:
+    '''Data class holding the fingerprint of the state of a board'''
+    boot_id: str
+    user: str
+    console: Optional[str] = None
+    time: Optional[float] = None
@@ -9,6 +9,7 @@ import json
 from .telnetconsole import TelnetConsole
 from .exceptions import ConsoleCannotOpenError, ConsoleLoginFailedError
 from .baseclasses import PowerBase
+from .baseclasses.hierarchy import hier_property
 
 
 class PDUError(Exception):
@@ -102,6 +103,7 @@ class EnergeniePDU(PowerBase, PDUReqestsBase):
         PDUReqestsBase.__init__(self, interface, interface_ip)
 
     @property
+    @hier_property
     def endpoint(self):
         return f'socket/{self.socket}'
 
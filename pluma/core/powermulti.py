@@ -1,7 +1,7 @@
-import time
 import re
 
-from .baseclasses import PowerBase
+from .baseclasses import PowerBase, check_cancelled, cancellable_sleep
+from .baseclasses.hierarchy import hier_property
 
 
 class PowerMulti(PowerBase):
@@ -19,6 +19,7 @@ class PowerMulti(PowerBase):
         self.off_seq = self._build_sequence('off')
 
     @property
+    @hier_property
     def reboot_delay(self):
         return max(
             [p.reboot_delay for p in self.power_seq if isinstance(p, PowerBase)])
@@ -40,13 +41,14 @@ class PowerMulti(PowerBase):
 
     def _do_sequence(self, seq):
         for action in seq:
+            check_cancelled()
             if callable(action):
                 action()
             if isinstance(action, str):
                 if action.endswith('ms'):
-                    time.sleep(float(action[:-2])/1000)
+                    cancellable_sleep(float(action[:-2])/1000)
                 elif action.endswith('s'):
-                    time.sleep(float(action[:-1]))
+                    cancellable_sleep(float(action[:-1]))
 
     def _handle_power_on(self):
         self._do_sequence(self.on_seq)
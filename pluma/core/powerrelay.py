@@ -1,6 +1,4 @@
-import time
-
-from .baseclasses import PowerBase, RelayBase
+from .baseclasses import PowerBase, RelayBase, check_cancelled, cancellable_sleep
 
 
 class PowerRelay(PowerBase):
@@ -16,14 +14,15 @@ class PowerRelay(PowerBase):
 
     def _do_sequence(self, seq):
         for action in seq:
+            check_cancelled()
             if isinstance(action, tuple):
                 # FIXME: This does not match the abstract class method
                 self.relay.toggle(action[0], action[1])  # type: ignore
             if isinstance(action, str):
                 if action.endswith('ms'):
-                    time.sleep(float(action[:-2])/1000)
+                    cancellable_sleep(float(action[:-2])/1000)
                 elif action.endswith('s'):
-                    time.sleep(float(action[:-1]))
+                    cancellable_sleep(float(action[:-1]))
 
     def _handle_power_on(self):
         self._do_sequence(self.on_seq)
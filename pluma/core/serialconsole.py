@@ -2,6 +2,7 @@ from serial import Serial
 from nanocom import Nanocom
 
 from .baseclasses import ConsoleBase, LogLevel
+from .baseclasses.hierarchy import hier_property
 from .dataclasses import SystemContext
 
 
@@ -19,6 +20,7 @@ class SerialConsole(ConsoleBase):
         return "SerialConsole[{}]".format(self.port)
 
     @property
+    @hier_property
     def is_open(self):
         return super().is_open and self._ser and self._ser.isOpen()
 
@@ -1,6 +1,7 @@
 import subprocess
 
 from pluma.core.baseclasses import ConsoleCannotOpenError
+from pluma.core.baseclasses.hierarchy import hier_property
 from .hostconsole import HostConsole
 from .dataclasses import SystemContext
 
@@ -37,6 +38,7 @@ class SSHConsole(HostConsole):
             raise ConsoleCannotOpenError
 
     @property
+    @hier_property
     def support_file_copy(self):
         return True
 
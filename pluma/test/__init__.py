@@ -1,10 +1,19 @@
 from .exceptions import TestingException, TaskFailed, AbortTesting
 from .testbase import TestBase
+from .fixtures import Fixture, FixtureRegistry, FixtureManager, FIXTURE_SCOPES
 from .testgroup import TestList, TestGroup, GroupedTest
+from .profiling import Profiler
+from .testhistory import TestHistory
+from .resultcache import TestResultCache
 from .session import Session
 from .plan import Plan
-from .testrunner import TestRunner
+from .testrunner import TestRunnerBase, TestRunner, TestRunnerParallel
+from .sharding import TestRunnerSharded, IterationPool, copy_test_for_board, \
+    merge_iteration_results
 from .unittest import deferred_function
+from .resultsjournal import ResultsJournal
+from .resultsanalysis import ResultsAnalyser, load_results_files
+from .earlystopping import EarlyStopping, wilson_interval
 from .testcontroller import TestController
 from .commandrunner import CommandRunner
 from .shelltest import ShellTest
@@ -7,6 +7,8 @@ from pluma.test import TestingException, TaskFailed
 
 log = Logger()
 
+DEFAULT_COMMAND_TIMEOUT_S = 10
+
 
 class CommandRunner():
     @staticmethod
@@ -16,8 +18,9 @@ class CommandRunner():
         retcode_token = 'pluma-retcode='
         base_command = command
         command += f' ; echo {retcode_token}$?'
+        timeout = timeout if timeout is not None else DEFAULT_COMMAND_TIMEOUT_S
         output, matched = console.send_and_expect(
-            command, timeout=10, match=retcode_token+r'-?\d+')
+            command, timeout=timeout, match=retcode_token+r'-?\d+')
 
         if not matched:
             CommandRunner.log_error(test_name=test_name, sent=command, output=output,
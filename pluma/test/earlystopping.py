@@ -0,0 +1,186 @@
+import math
+from typing import Optional, Tuple
+
+""" Default confidence level of the intervals used to stop early """
+DEFAULT_CONFIDENCE = 0.95
+
+""" Default number of iterations to run before stopping early """
+DEFAULT_MIN_ITERATIONS = 10
+
+
+def normal_quantile(p: float) -> float:
+    '''Return the quantile "p" of the standard normal distribution'''
+    if not 0 < p < 1:
+        raise ValueError(f'Quantile must be between 0 and 1, but got {p}')
+
+    low, high = -40.0, 40.0
+    for __ in range(100):
+        middle = (low + high) / 2
+        if (1 + math.erf(middle / math.sqrt(2))) / 2 < p:
+            low = middle
+        else:
+            high = middle
+
+    return (low + high) / 2
+
+
+def wilson_interval(successes: int, n: int, z: float) -> Tuple[float, float]:
+    '''Return the Wilson score interval of a proportion of "successes" out of "n"'''
+    if n == 0:
+        return 0.0, 1.0
+
+    p = successes / n
+    denominator = 1 + z**2 / n
+    centre = (p + z**2 / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+class EarlyStopping:
+    '''Sequential test deciding when an iteration-based run can stop.
+
+    After each iteration, the pass rate of the iterations is bounded with a
+    Wilson score interval, and the mean of the numeric data "field" saved by
+    the test "test" with a normal confidence interval. The run stops once every
+    interval requested is narrower than its precision (half-width), or as soon
+    as the failures cross "max_failures" or "max_failure_rate", the latter when
+    the failure rate is above it with the confidence level.
+    Stopping for precision waits for "min_iterations", and "max_iterations"
+    stops the run in any case.
+    '''
+
+    def __init__(self, confidence: float = None, min_iterations: int = None,
+                 max_iterations: int = None, pass_rate_precision: float = None,
+                 max_failures: int = None, max_failure_rate: float = None,
+                 test: str = None, field: str = None, field_precision: float = None):
+        self.confidence = confidence if confidence is not None else DEFAULT_CONFIDENCE
+        self.min_iterations = min_iterations if min_iterations is not None \
+            else DEFAULT_MIN_ITERATIONS
+        self.max_iterations = max_iterations
+        self.pass_rate_precision = pass_rate_precision
+        self.max_failures = max_failures
+        self.max_failure_rate = max_failure_rate
+        self.test = test
+        self.field = field
+        self.field_precision = field_precision
+
+        if not 0 < self.confidence < 1:
+            raise ValueError(f'"confidence" must be between 0 and 1, but got {self.confidence}')
+        if (field is None) != (field_precision is None) or (field and not test):
+            raise ValueError('"field" and "field_precision" must be set together, with "test"')
+        if pass_rate_precision is None and field_precision is None and \
+                max_failures is None and max_failure_rate is None:
+            raise ValueError('At least one of "pass_rate_precision", "field_precision", '
+                             '"max_failures" or "max_failure_rate" is required')
+        for name in ['pass_rate_precision', 'field_precision', 'max_failure_rate']:
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f'"{name}" must be more than 0, but got {value}')
+        if max_failures is not None and max_failures < 1:
+            raise ValueError(f'"max_failures" must be at least 1, but got {max_failures}')
+
+        # Two-sided intervals for precision, one-sided bound for the failure rate
+        self.z = normal_quantile(1 - (1 - self.confidence) / 2)
+        self.z_one_sided = normal_quantile(self.confidence)
+
+        self.iterations = 0
+        self.passes = 0
+
+        # Mean and sum of squared deviations of the field values (Welford)
+        self.field_count = 0
+        self._field_mean = 0.0
+        self._field_m2 = 0.0
+
+        self.reason: Optional[str] = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.summary()}]'
+
+    @property
+    def failures(self) -> int:
+        return self.iterations - self.passes
+
+    def add(self, result: dict):
+        '''Add the result of an iteration, as saved by the TestController'''
+        self.iterations += 1
+        if result.get('success'):
+            self.passes += 1
+
+        if self.field:
+            test_data = result['TestRunner'].get(self.test)
+            value = test_data.get('data', {}).get(self.field) \
+                if isinstance(test_data, dict) else None
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.field_count += 1
+                delta = value - self._field_mean
+                self._field_mean += delta / self.field_count
+                self._field_m2 += delta * (value - self._field_mean)
+
+    def pass_rate_interval(self) -> Tuple[float, float]:
+        '''Interval of the pass rate of the iterations, at the confidence level'''
+        return wilson_interval(self.passes, self.iterations, self.z)
+
+    def field_interval(self) -> Optional[Tuple[float, float]]:
+        '''Interval of the mean of the field, at the confidence level, or None
+        with less than 2 values'''
+        if self.field_count < 2:
+            return None
+
+        half_width = self.z * math.sqrt(self._field_m2 / (self.field_count - 1) /
+                                        self.field_count)
+        return self._field_mean - half_width, self._field_mean + half_width
+
+    def should_stop(self) -> bool:
+        '''Return True if the run can stop, with the reason in "reason"'''
+        self.reason = self._stop_reason()
+        return self.reason is not None
+
+    def summary(self) -> dict:
+        '''Return the state of the test, saved with the results'''
+        summary = {
+            'iterations': self.iterations,
+            'passes': self.passes,
+            'pass_rate_interval': [round(v, 4) for v in self.pass_rate_interval()],
+            'stop_reason': self.reason
+        }
+
+        field_interval = self.field_interval()
+        if self.field:
+            summary['field'] = f'{self.test}:{self.field}'
+            summary['field_interval'] = [round(v, 4) for v in field_interval] \
+                if field_interval else None
+
+        return summary
+
+    def _stop_reason(self) -> Optional[str]:
+        if self.max_failures is not None and self.failures >= self.max_failures:
+            return f'{self.failures} failed iterations, reaching "max_failures"'
+
+        if self.max_failure_rate is not None and self.iterations:
+            failure_rate_low = 1 - wilson_interval(self.passes, self.iterations,
+                                                   self.z_one_sided)[1]
+            if failure_rate_low > self.max_failure_rate:
+                return (f'failure rate above {self.max_failure_rate} with confidence '
+                        f'{self.confidence} ({self.failures}/{self.iterations} failed)')
+
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            return f'{self.iterations} iterations, reaching "max_iterations"'
+
+        if self.iterations < self.min_iterations or \
+                (self.pass_rate_precision is None and self.field_precision is None):
+            return None
+
+        reasons = []
+        if self.pass_rate_precision is not None:
+            low, high = self.pass_rate_interval()
+            if (high - low) / 2 > self.pass_rate_precision:
+                return None
+            reasons.append(f'pass rate in [{low:.4f}, {high:.4f}]')
+
+        if self.field_precision is not None:
+            interval = self.field_interval()
+            if interval is None or (interval[1] - interval[0]) / 2 > self.field_precision:
+                return None
+            reasons.append(f'{self.field} mean in [{interval[0]:.4g}, {interval[1]:.4g}]')
+
+        return f'{", ".join(reasons)} with confidence {self.confidence}'
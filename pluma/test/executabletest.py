@@ -1,6 +1,6 @@
 import os
 from pluma.core.board import Board
-from typing import Tuple
+from typing import List, Tuple
 
 from pluma.test import TestBase, CommandRunner
 from pluma.core.baseclasses import ConsoleBase
@@ -23,7 +23,9 @@ class ExecutableTest(TestBase):
         self.executable_file = os.path.abspath(executable_file)
         self.host_file = host_file
         self.run_on_host = run_on_host
-        self.timeout = timeout if timeout is not None else 5
+        self.timeout = timeout
+        self.resources = [] if self.run_on_host else ['console']
+        self.cacheable = self.run_on_host
 
         if self.host_file and not os.path.isfile(abs_path):
             raise ValueError(
@@ -44,6 +46,9 @@ class ExecutableTest(TestBase):
 
             self.check_console_supports_copy(console)
 
+    def cache_files(self) -> List[str]:
+        return [self.executable_file] if self.host_file else []
+
     @staticmethod
     def check_console_supports_copy(console: ConsoleBase):
         if not console:
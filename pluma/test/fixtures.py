@@ -0,0 +1,292 @@
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from pluma.core import Board
+from pluma.core.baseclasses import Logger, LogLevel
+from pluma.test import TestBase, TaskFailed
+
+log = Logger()
+
+""" Scopes of fixtures: shared by all tests run, by the tests run on each
+board, or by the tests of each group of tests (such as a Session) """
+FIXTURE_SCOPES = ['run', 'board', 'group']
+
+_local = threading.local()
+
+
+class Fixture(ABC):
+    '''A resource shared by the tests which request it by name.
+
+    The fixture is set up before the first test requesting it, and torn down
+    after the last one, once per "scope" (see FIXTURE_SCOPES). Tests read the
+    value returned by :meth:`setup` with `TestBase.fixture`.
+    '''
+
+    scope = 'run'
+
+    def __init__(self, scope: str = None):
+        if scope is not None:
+            self.scope = scope
+
+        if self.scope not in FIXTURE_SCOPES:
+            raise ValueError(f'Invalid fixture scope "{self.scope}", '
+                             f'must be one of {FIXTURE_SCOPES}')
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.scope}]'
+
+    @abstractmethod
+    def setup(self, board: Board) -> Any:
+        '''Set up the fixture on "board", and return its value'''
+
+    def teardown(self, board: Board, value: Any):
+        '''Tear down the fixture set up on "board"'''
+
+
+class FixtureRegistry():
+    fixture_classes_dict: Dict[str, Type[Fixture]] = {}
+
+    @classmethod
+    def register(cls, fixture_name: str):
+        def decorator(fixture_class: Type[Fixture]):
+            cls.register_class(fixture_class=fixture_class, fixture_name=fixture_name)
+            return fixture_class
+        return decorator
+
+    @classmethod
+    def register_class(cls, fixture_class: Type[Fixture], fixture_name: str):
+        '''Register a class as Fixture, which tests can request by name.'''
+        if not issubclass(fixture_class, Fixture):
+            raise Exception(
+                f'Error trying to register Fixture class "{fixture_class.__name__}" '
+                'which does not inherit Fixture')
+
+        if fixture_name in cls.fixture_classes_dict:
+            raise Exception(
+                f'Error registering Fixture subclass "{fixture_class}": '
+                f'Fixture name {fixture_name} is already'
+                f' registered for {cls.fixture_classes_dict[fixture_name].__name__}')
+
+        cls.fixture_classes_dict[fixture_name] = fixture_class
+
+    @classmethod
+    def all_fixtures(cls) -> List[str]:
+        return list(cls.fixture_classes_dict.keys())
+
+    @classmethod
+    def fixture_class(cls, fixture_name: str) -> Type[Fixture]:
+        '''Return the class registered for a fixture name'''
+        fixture_class = cls.fixture_classes_dict.get(fixture_name)
+        if not fixture_class:
+            raise ValueError(f'Unknown fixture "{fixture_name}". '
+                             f'Supported fixtures: {cls.all_fixtures()}')
+
+        return fixture_class
+
+    @classmethod
+    def create(cls, fixture_name: str, args: Optional[dict] = None) -> Fixture:
+        return cls.fixture_class(fixture_name)(**(args or {}))
+
+
+class FixtureManager:
+    '''Set up the fixtures requested by tests, and tear them down after their last consumer.
+
+    Fixtures are taken from "fixtures" by name, or created from the
+    FixtureRegistry with their default settings.
+    '''
+
+    def __init__(self, fixtures: Dict[str, Fixture] = None, board: Board = None):
+        self.fixtures = dict(fixtures or {})
+        self.board = board
+
+        # Number of tests which will still use each fixture, in "run" and "board" scopes
+        self._consumers: Dict[str, int] = {}
+        # Value and board of each fixture set up, by fixture name and scope key
+        self._instances: Dict[Tuple[str, Any], Tuple[Board, Any]] = {}
+        self._setup_locks: Dict[Tuple[str, Any], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def fixture(self, name: str) -> Fixture:
+        '''Return the fixture for a name'''
+        with self._lock:
+            if name not in self.fixtures:
+                self.fixtures[name] = FixtureRegistry.create(name)
+            return self.fixtures[name]
+
+    def prepare(self, tests: Iterable[TestBase]):
+        '''Count the tests, and tests of their groups, which will use each fixture'''
+        with self._lock:
+            self._consumers = {}
+            for test in self._all_tests(tests):
+                for name in test.fixtures or []:
+                    self._consumers[name] = self._consumers.get(name, 0) + 1
+
+    def acquire(self, test: TestBase, group: TestBase = None):
+        '''Set up the fixtures requested by a test, if not already, and give their
+        values to the test'''
+        for name in test.fixtures or []:
+            fixture = self.fixture(name)
+            key = (name, self._scope_key(fixture, test, group))
+            with self._lock:
+                setup_lock = self._setup_locks.setdefault(key, threading.Lock())
+
+            with setup_lock:
+                if key not in self._instances:
+                    board = self._board(test)
+                    log.log(f'Setting up fixture "{name}"', level=LogLevel.DEBUG)
+                    try:
+                        value = fixture.setup(board)
+                    except Exception as e:
+                        raise TaskFailed(f'Failed to set up fixture "{name}": {e}')
+                    self._instances[key] = (board, value)
+
+                test.fixture_values[name] = self._instances[key][1]
+
+    def release(self, test: TestBase):
+        '''Release the fixtures of a test which completed or was skipped, and tear
+        down those without consumer left'''
+        for name in test.fixtures or []:
+            fixture = self.fixture(name)
+            if fixture.scope == 'group':
+                self._teardown(lambda key: key == (name, str(test)))
+                continue
+
+            with self._lock:
+                self._consumers[name] = self._consumers.get(name, 1) - 1
+                done = self._consumers[name] <= 0
+
+            if done:
+                self._teardown(lambda key: key[0] == name)
+
+    @contextmanager
+    def group(self, group: TestBase):
+        '''Share the "group" scope fixtures between the tests run in this context'''
+        try:
+            yield
+        finally:
+            self._teardown(lambda key: key[1] == id(group))
+
+    def teardown_all(self):
+        '''Tear down all the fixtures still set up'''
+        self._teardown(lambda key: True)
+
+    @contextmanager
+    def activate(self):
+        '''Make this manager the current manager of the thread in this context,
+        used by groups of tests to set up the fixtures of their tests'''
+        previous = getattr(_local, 'manager', None)
+        _local.manager = self
+        try:
+            yield self
+        finally:
+            _local.manager = previous
+
+    @staticmethod
+    def current() -> Optional['FixtureManager']:
+        '''Return the current manager of the thread, if any'''
+        return getattr(_local, 'manager', None)
+
+    def _scope_key(self, fixture: Fixture, test: TestBase, group: Optional[TestBase]):
+        if fixture.scope == 'board':
+            board = self._board(test)
+            return board.name if board else None
+        if fixture.scope == 'group':
+            return id(group) if group is not None else str(test)
+        return None
+
+    def _board(self, test: TestBase) -> Board:
+        return getattr(test, 'board', None) or self.board
+
+    def _teardown(self, selected):
+        with self._lock:
+            keys = [key for key in self._instances if selected(key)]
+            instances = [(key, self._instances.pop(key)) for key in keys]
+
+        for (name, __), (board, value) in instances:
+            log.log(f'Tearing down fixture "{name}"', level=LogLevel.DEBUG)
+            try:
+                self.fixtures[name].teardown(board, value)
+            except Exception as e:
+                log.log(f'Failed to tear down fixture "{name}": {e}',
+                        level=LogLevel.WARNING)
+
+    @staticmethod
+    def _all_tests(tests: Iterable[TestBase]) -> Iterable[TestBase]:
+        for test in tests:
+            yield test
+            test_group = getattr(test, 'test_group', None)
+            if test_group is not None:
+                yield from FixtureManager._all_tests(test_group.tests)
+
+
+@FixtureRegistry.register('booted_board')
+class BootedBoard(Fixture):
+    '''Board rebooted before its first consumer, and powered off after its last.
+
+    The reboot is skipped if the board is still in the last state known (see
+    `Board.reboot`), unless "force_reboot" is set. With "power_off" set to
+    False, the board is left running, so that the next setup can skip it.
+    '''
+
+    scope = 'board'
+
+    def __init__(self, force_reboot: bool = False, power_off: bool = True,
+                 scope: str = None):
+        super().__init__(scope=scope)
+        self.force_reboot = force_reboot
+        self.power_off = power_off
+
+    def setup(self, board: Board) -> Board:
+        board.reboot(force=self.force_reboot)
+        return board
+
+    def teardown(self, board: Board, value: Board):
+        if self.power_off:
+            board.forget_state()
+            board.power.off()
+
+
+@FixtureRegistry.register('logged_in_console')
+class LoggedInConsole(Fixture):
+    '''Console of the board, logged in once for all its consumers'''
+
+    scope = 'board'
+
+    def __init__(self, force_login: bool = False, scope: str = None):
+        super().__init__(scope=scope)
+        self.force_login = force_login
+
+    def setup(self, board: Board):
+        board.login(force=self.force_login)
+        return board.console
+
+
+@FixtureRegistry.register('deployed_bundle')
+class DeployedBundle(Fixture):
+    '''Files deployed once to the target, in "destination", for all their consumers'''
+
+    def __init__(self, files: List[str] = None, destination: str = None,
+                 timeout: float = None, scope: str = None):
+        super().__init__(scope=scope)
+        if not files or not isinstance(files, list) or not destination:
+            raise ValueError('The "deployed_bundle" fixture requires a list of "files", '
+                             'and a "destination"')
+
+        self.files = files
+        self.destination = destination
+        self.timeout = timeout if timeout is not None else 15
+
+    def setup(self, board: Board) -> str:
+        console = board.console
+        if not console or not console.support_file_copy:
+            raise TaskFailed('Cannot deploy files, current console does not support file copy')
+
+        for file in self.files:
+            log.log(f'Copying {file} to target device destination {self.destination}',
+                    level=LogLevel.DEBUG)
+            console.copy_to_target(source=file, destination=self.destination,
+                                   timeout=self.timeout)
+
+        return self.destination
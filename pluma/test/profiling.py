@@ -0,0 +1,212 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SAMPLE_INTERVAL_S = 0.005
+HOTSPOTS_FILE = 'hotspots.txt'
+HOTSPOTS_COUNT = 25
+
+""" Whether cProfile profiles the whole process, through sys.monitoring, so that
+only one profile can be enabled at a time (Python 3.12 and later) """
+CPROFILE_PROCESS_WIDE = sys.version_info >= (3, 12)
+
+
+class Profiler:
+    '''Profile named scopes of code, merging the statistics of each name.
+
+    Each scope is profiled with cProfile, and sampled by a background thread
+    to build the call stacks in which the time was spent. Scopes can be nested
+    in a thread: the outer scope is paused while the inner scope runs, so
+    time is only counted once. Scopes in different threads are profiled
+    independently. Where cProfile can only profile one thread at a time
+    (see CPROFILE_PROCESS_WIDE), or another profiler is active, scopes which
+    cannot use cProfile are only sampled.
+
+    :meth:`write` saves, for each scope name, the merged cProfile statistics
+    as a ".pstats" file, and the sampled stacks as a ".collapsed" file, in
+    the "folded" format read by flamegraph tools.
+    '''
+
+    def __init__(self, sample_interval_s: float = None):
+        self.sample_interval_s = sample_interval_s if sample_interval_s is not None \
+            else DEFAULT_SAMPLE_INTERVAL_S
+
+        self.stats: Dict[str, pstats.Stats] = {}
+        self.stacks: Dict[str, Counter] = {}
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sampled_threads: Dict[int, str] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+
+        # Thread using cProfile, if it can only profile one thread at a time
+        self._cprofile_thread: Optional[int] = None
+
+    @contextmanager
+    def profile(self, name: str):
+        '''Profile the code run in this context, under "name"'''
+        scopes = self._scopes()
+        if scopes and scopes[-1][1]:
+            scopes[-1][1].disable()
+
+        profile = self._enable_cprofile()
+        scopes.append((name, profile))
+        self._sample_thread(name)
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            scopes.pop()
+            if profile:
+                self._add_stats(name, profile)
+
+            if scopes:
+                self._sample_thread(scopes[-1][0])
+                if scopes[-1][1]:
+                    scopes[-1][1].enable()
+            else:
+                self._sample_thread(None)
+
+            self._release_cprofile()
+
+    def stop(self):
+        '''Stop the sampling thread, which is started again by the next scope'''
+        self._stop_sampling.set()
+        if self._sampler:
+            self._sampler.join()
+            self._sampler = None
+
+    def write(self, output_dir: str) -> List[str]:
+        '''Write the profiles of all scopes to "output_dir", and return the files'''
+        self.stop()
+        os.makedirs(output_dir, exist_ok=True)
+
+        files = []
+        with self._lock:
+            for name, stats in self.stats.items():
+                pstats_file = os.path.join(output_dir, f'{self.file_name(name)}.pstats')
+                stats.dump_stats(pstats_file)
+                files.append(pstats_file)
+
+            for name, stacks in self.stacks.items():
+                collapsed_file = os.path.join(output_dir, f'{self.file_name(name)}.collapsed')
+                with open(collapsed_file, 'w') as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f'{stack} {count}\n')
+                files.append(collapsed_file)
+
+            hotspots_file = os.path.join(output_dir, HOTSPOTS_FILE)
+            with open(hotspots_file, 'w') as f:
+                f.write(self.hotspots_report())
+            files.append(hotspots_file)
+
+        return files
+
+    def hotspots_report(self, count: int = HOTSPOTS_COUNT) -> str:
+        '''Return the functions with the highest internal time, over all scopes
+        and for each scope'''
+        report = io.StringIO()
+        profiles = list(self.stats.items())
+        if len(profiles) > 1:
+            merged = pstats.Stats(stream=report)
+            for __, stats in profiles:
+                merged.add(stats)
+            profiles.insert(0, ('All scopes', merged))
+
+        for name, stats in profiles:
+            report.write(f'==== {name} ====\n')
+            stats.stream = report
+            stats.sort_stats('tottime').print_stats(count)
+
+        return report.getvalue()
+
+    @staticmethod
+    def file_name(name: str) -> str:
+        '''Return a file name for a scope name'''
+        return re.sub(r'[^\w.-]+', '_', name).strip('_') or 'profile'
+
+    def _scopes(self) -> List[Tuple[str, Optional[cProfile.Profile]]]:
+        '''Return the scopes being profiled in the current thread, innermost last'''
+        if not hasattr(self._local, 'scopes'):
+            self._local.scopes = []
+        return self._local.scopes
+
+    def _enable_cprofile(self) -> Optional[cProfile.Profile]:
+        '''Return an enabled cProfile profile for a new scope of the current thread,
+        or None if cProfile is used by another thread or profiling tool'''
+        if CPROFILE_PROCESS_WIDE:
+            with self._lock:
+                if self._cprofile_thread not in (None, threading.get_ident()):
+                    return None
+                self._cprofile_thread = threading.get_ident()
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is already active
+            self._release_cprofile()
+            return None
+
+        return profile
+
+    def _release_cprofile(self):
+        '''Let other threads use cProfile, once the current thread no longer does'''
+        if any(profile for __, profile in self._scopes()):
+            return
+
+        with self._lock:
+            if self._cprofile_thread == threading.get_ident():
+                self._cprofile_thread = None
+
+    def _add_stats(self, name: str, profile: cProfile.Profile):
+        stats = pstats.Stats(profile)
+        with self._lock:
+            if name in self.stats:
+                self.stats[name].add(stats)
+            else:
+                self.stats[name] = stats
+
+    def _sample_thread(self, name: Optional[str]):
+        '''Sample the current thread under "name", or stop sampling it if None'''
+        with self._lock:
+            if name is None:
+                self._sampled_threads.pop(threading.get_ident(), None)
+                return
+
+            self._sampled_threads[threading.get_ident()] = name
+            if self._sampler is None:
+                self._stop_sampling.clear()
+                self._sampler = threading.Thread(target=self._sample, daemon=True,
+                                                 name='ProfilerSampler')
+                self._sampler.start()
+
+    def _sample(self):
+        while not self._stop_sampling.wait(self.sample_interval_s):
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, name in self._sampled_threads.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self.stacks.setdefault(name, Counter())[self.collapse(frame)] += 1
+
+    @staticmethod
+    def collapse(frame) -> str:
+        '''Return the stack of a frame as a collapsed stack, outermost call first'''
+        calls = []
+        while frame is not None:
+            code = frame.f_code
+            calls.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:'
+                         f'{code.co_firstlineno})')
+            frame = frame.f_back
+
+        return ';'.join(reversed(calls))
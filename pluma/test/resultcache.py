@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+from pluma.utils import json_load, json_dump_atomic
+from .testbase import TestBase
+
+""" Size of the blocks read to hash files """
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class TestResultCache:
+    '''Cache of passing test results, persisted across runs in a JSON file.
+
+    Only tests which are "cacheable" are cached (see `TestBase.cacheable`).
+    Results are keyed by a hash of the test class, its settings, the content
+    of its "cache_files", and the board "fingerprint", a string declaring the
+    state of the board (such as its firmware version). While none of them
+    change, a passing result is reused instead of running the test again,
+    until it is older than "expiry_s" seconds. Tests run on the target
+    ("run_on_host" False) are only cached with a fingerprint, as their result
+    depends on the board.
+    '''
+
+    def __init__(self, file: str, expiry_s: float = None, fingerprint: str = None):
+        self.file = file
+        self.expiry_s = expiry_s
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.file}]'
+
+    def load(self):
+        '''Load the cache from the file. A missing or invalid file gives an empty cache'''
+        content = json_load(self.file)
+        entries = content.get('entries') if isinstance(content, dict) else None
+
+        with self._lock:
+            self.entries = entries if isinstance(entries, dict) else {}
+
+    def save(self):
+        '''Save the unexpired entries to the file, replacing it atomically'''
+        with self._lock:
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if not self._expired(entry)}
+            json_dump_atomic({'entries': self.entries}, self.file, default=str)
+
+    def key(self, test: TestBase) -> Optional[str]:
+        '''Return the cache key of a test, or None if it is not cacheable'''
+        if not test.cacheable:
+            return None
+
+        if self.fingerprint is None and not getattr(test, 'run_on_host', True):
+            return None
+
+        inputs = {
+            'class': f'{test.__class__.__module__}.{test.__class__.__qualname__}',
+            'settings': test.settings,
+            'files': {file: self.file_hash(file) for file in test.cache_files()},
+            'fingerprint': self.fingerprint
+        }
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, test: TestBase) -> Optional[dict]:
+        '''Return the cached result of a test, or None if missing or expired'''
+        key = self.key(test)
+        with self._lock:
+            entry = self.entries.get(key) if key else None
+            if entry is None or self._expired(entry):
+                return None
+
+            return entry
+
+    def put(self, test: TestBase, test_data: dict):
+        '''Cache the TestRunner data of a test, if it is cacheable and passed'''
+        key = self.key(test)
+        tasks = test_data['tasks']
+        if not key or not tasks['ran'] or tasks['failed'] or 'skipped' in tasks:
+            return
+
+        with self._lock:
+            self.entries[key] = {
+                'time': time.time(),
+                'test': test.base_name,
+                'ran': list(tasks['ran']),
+                'data': test_data['data']
+            }
+
+    def _expired(self, entry: dict) -> bool:
+        return self.expiry_s is not None and time.time() - entry['time'] > self.expiry_s
+
+    @staticmethod
+    def file_hash(file: str) -> Optional[str]:
+        '''Return the SHA-256 of the content of a file, or None if it cannot be read'''
+        file_hash = hashlib.sha256()
+        try:
+            with open(file, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    file_hash.update(block)
+        except OSError:
+            return None
+
+        return file_hash.hexdigest()
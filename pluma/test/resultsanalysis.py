@@ -0,0 +1,181 @@
+import json
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .resultsprocessor import CHUNKED_MEAN_CHUNKS
+
+DEFAULT_PERCENTILES = [50, 90, 99]
+DEFAULT_ROLLING_WINDOW = 10
+
+
+def load_results_files(files: Iterable[str]) -> Iterator[dict]:
+    '''Load results files saved by a run, yielding the results of each board'''
+    for file in files:
+        with open(file, 'r') as f:
+            results = json.load(f)
+
+        if 'boards' in results:
+            yield from results['boards'].values()
+        else:
+            yield results
+
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ResultsAnalyser:
+    '''Offline analysis of the data saved by tests, over one or more runs.
+
+    Data values are collected per test and data field, and numerical values
+    are analysed with NumPy. This gives the same statistics as
+    DefaultResultsProcessor, plus percentiles and rolling window statistics.
+    With "group_by", data fields are also analysed per value of these test
+    settings, over all tests with the setting.
+    '''
+
+    def __init__(self, percentiles: List[float] = None, rolling_window: int = None,
+                 group_by: List[str] = None):
+        self.percentiles = percentiles if percentiles is not None else DEFAULT_PERCENTILES
+        self.rolling_window = rolling_window if rolling_window is not None \
+            else DEFAULT_ROLLING_WINDOW
+        self.group_by = group_by or []
+
+        if self.rolling_window < 1:
+            raise ValueError(f'The rolling window must be at least 1, but got {rolling_window}')
+
+        self.values: Dict[str, Dict[str, list]] = {}
+        self.group_values: Dict[str, Dict[str, Dict[str, list]]] = {
+            setting: {} for setting in self.group_by}
+
+    def add_results(self, results: dict):
+        '''Add the results of a run, as saved in the results file'''
+        for iteration in results.get('results', []):
+            for test_name, test_result in iteration['TestRunner'].items():
+                if not isinstance(test_result, dict):
+                    continue
+
+                data = test_result.get('data') or {}
+                test_values = self.values.setdefault(test_name, {})
+                for field, value in data.items():
+                    test_values.setdefault(field, []).append(value)
+
+                settings = test_result.get('settings') or {}
+                for setting in (s for s in self.group_by if s in settings):
+                    group = self.group_values[setting].setdefault(str(settings[setting]), {})
+                    for field, value in data.items():
+                        group.setdefault(field, []).append(value)
+
+    def analyse(self) -> dict:
+        '''Return the statistics of all data fields, per test and per setting group'''
+        analysis: dict = {
+            'tests': {
+                test_name: {field: self.field_statistics(values)
+                            for field, values in fields.items()}
+                for test_name, fields in self.values.items() if fields
+            }
+        }
+
+        if self.group_by:
+            analysis['groups'] = {
+                setting: {
+                    setting_value: {field: self.field_statistics(values)
+                                    for field, values in fields.items()}
+                    for setting_value, fields in groups.items()
+                } for setting, groups in self.group_values.items()
+            }
+
+        return analysis
+
+    def field_statistics(self, values: list) -> dict:
+        '''Return the statistics of the values of a data field'''
+        if values and all(is_number(v) for v in values):
+            return self.numeric_statistics(np.asarray(values))
+
+        statistics: dict = {'count': dict(Counter(str(v) for v in values))}
+        if len(values) >= 2 and all(is_number(v) or isinstance(v, bool) for v in values):
+            statistics['chunked_mean'] = self.chunked_mean(np.asarray(values, dtype=float))
+
+        return statistics
+
+    def numeric_statistics(self, values: np.ndarray) -> dict:
+        '''Return the statistics of numerical values'''
+        unique, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+        statistics: dict = {
+            'count': {str(v): c for v, c in zip(unique.tolist(), counts.tolist())}
+        }
+
+        # Can't generate statistics from a single data point
+        if len(values) < 2:
+            return statistics
+
+        # Mode is the first value seen among the most common ones
+        most_common = np.flatnonzero(counts == counts.max())
+        mode = unique[most_common[np.argmin(first_index[most_common])]]
+
+        variance = values.var(ddof=1)
+        statistics.update({
+            'max': values.max().item(),
+            'min': values.min().item(),
+            'mode': mode.item(),
+            'mean': round(values.mean().item(), 2),
+            'median': round(self.median_grouped(values), 2),
+            'stdev': round(np.sqrt(variance).item(), 2),
+            'variance': round(variance.item(), 2),
+            'chunked_mean': self.chunked_mean(values),
+            'percentiles': {
+                f'p{p:g}': round(v, 2) for p, v in
+                zip(self.percentiles, np.percentile(values, self.percentiles).tolist())
+            }
+        })
+
+        rolling = self.rolling_statistics(values)
+        if rolling:
+            statistics['rolling'] = rolling
+
+        return statistics
+
+    @staticmethod
+    def median_grouped(values: np.ndarray, interval: float = 1) -> float:
+        '''Same as statistics.median_grouped'''
+        values = np.sort(values)
+        n = len(values)
+        median = values[n // 2]
+        lower_count = np.searchsorted(values, median, side='left')
+        median_count = np.searchsorted(values, median, side='right') - lower_count
+        return (median - interval / 2 + interval * (n / 2 - lower_count) / median_count).item()
+
+    @staticmethod
+    def chunked_mean(values: np.ndarray, n_chunks: int = CHUNKED_MEAN_CHUNKS,
+                     sigfig: int = 2) -> List[float]:
+        '''Mean of the values, in at most "n_chunks" chunks of equal size'''
+        n = len(values)
+        chunk_size = min(round(n / n_chunks) or 1, n)
+        starts = np.arange(0, n, chunk_size)[:n_chunks]
+        ends = np.minimum(starts + chunk_size, n)
+        sums = np.concatenate(([0], np.cumsum(values, dtype=float)))
+        return np.round((sums[ends] - sums[starts]) / (ends - starts), sigfig).tolist()
+
+    def rolling_statistics(self, values: np.ndarray) -> Optional[dict]:
+        '''Mean and standard deviation over a rolling window of values'''
+        window = self.rolling_window
+        if len(values) < window:
+            return None
+
+        values = values.astype(float)
+        sums = np.concatenate(([0], np.cumsum(values)))
+        squares = np.concatenate(([0], np.cumsum(values * values)))
+        means = (sums[window:] - sums[:-window]) / window
+        variances = np.maximum((squares[window:] - squares[:-window]) / window - means ** 2, 0)
+        stdevs = np.sqrt(variances)
+
+        return {
+            'window': window,
+            'min_mean': round(means.min().item(), 2),
+            'max_mean': round(means.max().item(), 2),
+            'last_mean': round(means[-1].item(), 2),
+            'max_stdev': round(stdevs.max().item(), 2),
+            'last_stdev': round(stdevs[-1].item(), 2)
+        }
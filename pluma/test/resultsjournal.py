@@ -0,0 +1,126 @@
+import json
+import os
+import time
+from typing import IO, Iterator, Optional
+
+""" Interval between two fsync of the results journal """
+DEFAULT_RESULTS_JOURNAL_FSYNC_INTERVAL_S = 5.0
+
+
+class ResultsJournal:
+    '''Append-only journal of iteration results, as newline-delimited JSON.
+
+    Each finalised iteration is written as one line and flushed, and the file
+    is synced to disk at most every "fsync_interval_s" seconds (0 syncs every
+    iteration), so that a crash loses at most that much of the results.
+
+    A new journal replaces any existing file the first time it is opened,
+    unless "resume" is set, in which case results are appended to it.
+    '''
+
+    def __init__(self, file: str, fsync_interval_s: float = None, resume: bool = False):
+        self.file = file
+        self.fsync_interval_s = fsync_interval_s if fsync_interval_s is not None \
+            else DEFAULT_RESULTS_JOURNAL_FSYNC_INTERVAL_S
+        self.resume = resume
+
+        self._file: Optional[IO[str]] = None
+        self._last_sync = 0.0
+        self._length: Optional[int] = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.file}]'
+
+    def __len__(self) -> int:
+        '''Number of results in the journal'''
+        if self._length is None:
+            self._length = sum(1 for __ in self.read())
+        return self._length
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def open(self):
+        '''Open the journal for writing'''
+        if self.is_open:
+            return
+
+        journal_dir = os.path.dirname(self.file)
+        if journal_dir and not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+
+        if not self.resume and self._length is None:
+            self._length = 0
+            mode = 'w'
+        else:
+            self._truncate_incomplete_line()
+            mode = 'a'
+
+        self._file = open(self.file, mode, encoding='utf-8')
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        '''Sync and close the journal'''
+        if not self.is_open:
+            return
+
+        self._sync()
+        self._file.close()
+        self._file = None
+
+    def append(self, result: dict):
+        '''Append an iteration result to the journal'''
+        if not self.is_open:
+            self.open()
+
+        length = len(self)
+        self._file.write(json.dumps(result, default=str))
+        self._file.write('\n')
+        self._file.flush()
+        self._length = length + 1
+
+        if time.monotonic() - self._last_sync >= self.fsync_interval_s:
+            self._sync()
+
+    def read(self) -> Iterator[dict]:
+        '''Read the results from the journal, one at a time.
+
+        An incomplete last line, left by a crash while writing, is ignored.
+        '''
+        if self.is_open:
+            self._file.flush()
+
+        if not os.path.isfile(self.file):
+            return
+
+        with open(self.file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                yield json.loads(line)
+
+    def _truncate_incomplete_line(self):
+        '''Remove an incomplete last line, left by a crash while writing'''
+        if not os.path.isfile(self.file):
+            return
+
+        with open(self.file, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                start = max(end - 4096, 0)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+
+            if end != size:
+                f.truncate(end)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
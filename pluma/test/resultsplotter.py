@@ -1,6 +1,117 @@
+import hashlib
+import json
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 import pygal
 
+DOWNSAMPLING_METHODS = ['lttb', 'minmax']
+
+
+def downsample_lttb(points: list, max_points: int) -> list:
+    '''Downsample points to "max_points" with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept, and one point per bucket in between,
+    which keeps the visual shape of the series.
+    '''
+    n = len(points)
+    if n <= max_points or max_points < 3:
+        return points
+
+    data = np.asarray(points, dtype=float)
+    x, y = data[:, 0], data[:, 1]
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+
+    selected = [0]
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        a = selected[-1]
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) -
+                       (x[a] - x[start:end]) * (next_y - y[a]))
+        selected.append(start + int(areas.argmax()))
+
+    selected.append(n - 1)
+    return [points[i] for i in selected]
+
+
+def downsample_minmax(points: list, max_points: int) -> list:
+    '''Downsample points to at most "max_points", keeping the minimum and
+    maximum value of each bucket, in their original order'''
+    n = len(points)
+    if n <= max_points or max_points < 2:
+        return points
+
+    y = np.asarray([p[1] for p in points], dtype=float)
+    edges = np.linspace(0, n, max_points // 2 + 1).astype(int)
+
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        selected.extend(sorted({start + int(bucket.argmin()), start + int(bucket.argmax())}))
+
+    return [points[i] for i in selected]
+
+
+def is_numeric_series(points: list) -> bool:
+    return all(isinstance(v, (int, float)) for point in points for v in point)
+
+
+def render_chart(file: str, series: Dict[str, list], title: str, output_format: str,
+                 config: Optional[pygal.Config] = None):
+    '''Render the series of points to a chart file'''
+    chart = pygal.XY(truncate_legend=-1)
+    chart.title = title
+
+    # Default style to fix svg black background rendering issue
+    chart.config.style = pygal.style.Style(
+        background='#FFFFFF',
+        plot_background='#FFFFFF'
+    )
+
+    if config:
+        chart.config = config
+
+    # Add points to chart
+    for k, v in series.items():
+        chart.add(k, v)
+
+    if output_format == 'svg':
+        chart.render_to_file(file)
+    elif output_format == 'png':
+        chart.render_to_png(file)
+
+
+def chart_hash(series: Dict[str, list], title: str, output_format: str,
+               config: Optional[pygal.Config] = None) -> Optional[str]:
+    '''Return a hash of the content of a chart, or None if it cannot be described
+    reliably, such as with a config holding functions'''
+    config_description = {}
+    if config:
+        defaults = vars(pygal.Config())
+        for key, value in vars(config).items():
+            if value is defaults.get(key):
+                continue
+            if isinstance(value, type):
+                value = f'{value.__module__}.{value.__qualname__}'
+            elif callable(value):
+                return None
+            config_description[key] = value
+
+    try:
+        description = json.dumps([series, title, output_format, config_description],
+                                 sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+    return hashlib.sha1(description.encode()).hexdigest()
+
 
 class ResultsPlotter(ABC):
     @abstractmethod
@@ -8,10 +119,44 @@ class ResultsPlotter(ABC):
              title=None, output_format=None, config=None):
         '''Create a graph of test results passed in'''
 
+    def plot_many(self, plots: List[dict]):
+        '''Create a graph for each dict of "plot" arguments in "plots"'''
+        for plot_args in plots:
+            self.plot(**plot_args)
+
 
 class DefaultResultsPlotter(ResultsPlotter):
+    '''Plotter graphing test results data with pygal.
+
+    Args:
+        downsample (str): Downsampling method applied to each series of
+            more than "max_points" points before rendering.
+            Options: "lttb" (Largest-Triangle-Three-Buckets) or "minmax"
+            (minimum and maximum of each bucket).
+            Default: None, all points are rendered.
+        max_points (int): Maximum number of points per series when downsampling.
+            Default: 1000
+        max_workers (int): Maximum number of processes rendering charts
+            concurrently in :meth:`plot_many`.
+            Default: None, the number of processors.
+
+    A chart is not rendered again if its file exists and its points, title,
+    format and config have not changed since it was last rendered.
+    '''
+
+    def __init__(self, downsample: str = None, max_points: int = 1000, max_workers: int = None):
+        if downsample and downsample not in DOWNSAMPLING_METHODS:
+            raise AttributeError(f'downsample must be in {DOWNSAMPLING_METHODS}')
+        if max_points < 3:
+            raise AttributeError(f'max_points must be at least 3, but got {max_points}')
+
+        self.downsample = downsample
+        self.max_points = max_points
+        self.max_workers = max_workers
+        self._rendered_hashes: Dict[str, str] = {}
+
     def plot(self, file, results: list, test_names=None, fields=None, vs_type=None,
-             title=None, output_format=None, config=None):
+             title=None, output_format=None, config=None) -> bool:
         """Create a graph of data fields from the test results data.
         Args:
             file (str): Output file path.
@@ -33,7 +178,56 @@ class DefaultResultsPlotter(ResultsPlotter):
                 Default: "svg"
             config (pygal.Config): Optionally supply a option.
                 This allows rendering with custom configuration and styles.
+
+        Returns:
+            bool: False if the chart was already rendered with the same data,
+                and was not rendered again.
         """
+        chart = self.prepare_chart(file, results, test_names=test_names, fields=fields,
+                                   vs_type=vs_type, title=title, output_format=output_format,
+                                   config=config)
+        if not chart:
+            return False
+
+        chart_args, content_hash = chart
+        render_chart(*chart_args)
+        self._save_hash(file, content_hash)
+        return True
+
+    def plot_many(self, plots: List[dict]):
+        '''Create a graph for each dict of "plot" arguments in "plots".
+
+        The charts which changed are rendered concurrently, in a process pool.
+        Charts which cannot be hashed, such as those with a config holding
+        functions, cannot be sent to the pool either, and are rendered in-process.
+        '''
+        charts = [chart for chart in (self.prepare_chart(**plot_args) for plot_args in plots)
+                  if chart]
+        local_charts = [chart for chart in charts if chart[1] is None]
+        pool_charts = [chart for chart in charts if chart[1] is not None]
+        if len(pool_charts) < 2 or self.max_workers == 1:
+            local_charts, pool_charts = charts, []
+
+        for chart_args, content_hash in local_charts:
+            render_chart(*chart_args)
+            self._save_hash(chart_args[0], content_hash)
+
+        if not pool_charts:
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [(executor.submit(render_chart, *chart_args), chart_args[0], content_hash)
+                       for chart_args, content_hash in pool_charts]
+            for future, file, content_hash in futures:
+                future.result()
+                self._save_hash(file, content_hash)
+
+    def prepare_chart(self, file, results: list, test_names=None, fields=None, vs_type=None,
+                      title=None, output_format=None,
+                      config=None) -> Optional[Tuple[tuple, Optional[str]]]:
+        '''Return the "render_chart" arguments of a graph, and the hash of its
+        content (None if it cannot be hashed), or None if it is unchanged since
+        it was last rendered'''
         vs_type = vs_type or 'iteration'
         output_format = output_format or 'svg'
 
@@ -78,19 +272,8 @@ class DefaultResultsPlotter(ResultsPlotter):
             raise RuntimeError(
                 f'No results found for test{plural_or_not}{test_names}, fields{fields}')
 
-        chart = pygal.XY(truncate_legend=-1)
-        chart.title = title
-
-        # Default style to fix svg black background rendering issue
-        chart.config.style = pygal.style.Style(
-            background='#FFFFFF',
-            plot_background='#FFFFFF'
-        )
-
-        if config:
-            if not isinstance(config, pygal.Config):
-                raise AttributeError('config must be of type pygal.Config')
-            chart.config = config
+        if config and not isinstance(config, pygal.Config):
+            raise AttributeError('config must be of type pygal.Config')
 
         points = {}
         if vs_type in ['iteration', 'cumulative']:
@@ -124,7 +307,7 @@ class DefaultResultsPlotter(ResultsPlotter):
                 points[tf] = {
                     tf: [(r[tf][fields[0]], r[tf][fields[1]]) for r in results]}
 
-        chart.title = chart.title or '{} for{} {}'.format(
+        title = title or '{} for{} {}'.format(
             vs_str,
             ' tests:' if len(tests_found) > 1 else '',
             ', '.join(tests_found))
@@ -142,11 +325,23 @@ class DefaultResultsPlotter(ResultsPlotter):
             for k, v in points_v.items():
                 points_combined[k] = v
 
-        # Add points to chart
-        for k, v in points_combined.items():
-            chart.add(k, v)
+        if self.downsample:
+            downsample = downsample_lttb if self.downsample == 'lttb' else downsample_minmax
+            points_combined = {
+                k: downsample(v, self.max_points) if is_numeric_series(v) else v
+                for k, v in points_combined.items()
+            }
+
+        chart_args = (file, points_combined, title, output_format, config)
+        content_hash = chart_hash(points_combined, title, output_format, config)
+        if content_hash is not None and self._rendered_hashes.get(file) == content_hash \
+                and os.path.isfile(file):
+            return None
 
-        if output_format == 'svg':
-            chart.render_to_file(file)
-        elif output_format == 'png':
-            chart.render_to_png(file)
+        return chart_args, content_hash
+
+    def _save_hash(self, file: str, content_hash: Optional[str]):
+        if content_hash is None:
+            self._rendered_hashes.pop(file, None)
+        else:
+            self._rendered_hashes[file] = content_hash
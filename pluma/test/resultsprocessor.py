@@ -1,9 +1,13 @@
+import heapq
+import math
+import sys
 from abc import ABC, abstractmethod
-from typing import List
+from collections import Counter
+from typing import Dict, List
 from pluma.test.testbase import TestBase
 
-from statistics import mean, median_grouped, mode, stdev, variance,\
-    StatisticsError
+""" Number of chunks used for the "chunked_mean" of a data value """
+CHUNKED_MEAN_CHUNKS = 10
 
 
 class ResultsProcessor(ABC):
@@ -11,101 +15,267 @@ class ResultsProcessor(ABC):
     def generate_summary(self, tests: list, results: list) -> dict:
         '''Generate a summary of the test results passed in.'''
 
+    def summary_builder(self) -> 'ResultsSummaryBuilder':
+        '''Return a builder to update the summary one iteration result at a time'''
+        return RecomputedResultsSummary(self)
+
+
+class ResultsSummaryBuilder(ABC):
+    @abstractmethod
+    def add(self, result: dict):
+        '''Add the result of an iteration to the summary'''
+
+    @abstractmethod
+    def summary(self, tests: list) -> dict:
+        '''Return the summary of all results added so far'''
+
+    def tasks_summary(self, tests: list) -> dict:
+        '''Return the summary of the time and resources used by each task'''
+        return {}
+
+
+class RecomputedResultsSummary(ResultsSummaryBuilder):
+    '''Summary builder generating the whole summary again from all results'''
+
+    def __init__(self, processor: ResultsProcessor):
+        self.processor = processor
+        self.results: list = []
+
+    def add(self, result: dict):
+        self.results.append(result)
+
+    def summary(self, tests: list) -> dict:
+        return self.processor.generate_summary(tests, self.results)
+
+    def tasks_summary(self, tests: list) -> dict:
+        tasks_usage = TaskUsageSummary()
+        for result in self.results:
+            tasks_usage.add(result)
+
+        return tasks_usage.summary(tests)
+
+
+class TaskUsageSummary:
+    '''Total, mean and maximum of the time and resources used by each task,
+    as saved by the TestRunner under "tasks"/"usage" for each test'''
+
+    def __init__(self):
+        # Count, total and max of each measure, per test and task
+        self.usage: Dict[str, Dict[str, Dict[str, List[float]]]] = {}
+
+    def add(self, result: dict):
+        for test_name, test_result in result['TestRunner'].items():
+            if not isinstance(test_result, dict):
+                continue
+
+            task_usages = test_result.get('tasks', {}).get('usage', {})
+            for task_name, task_usage in task_usages.items():
+                task_totals = self.usage.setdefault(test_name, {}).setdefault(task_name, {})
+                for measure, value in task_usage.items():
+                    totals = task_totals.setdefault(measure, [0, 0, value])
+                    totals[0] += 1
+                    totals[1] += value
+                    totals[2] = max(totals[2], value)
+
+    def summary(self, tests: list) -> dict:
+        return {
+            str(test): {
+                task_name: {
+                    measure: {
+                        'total': round(total, 6),
+                        'mean': round(total / count, 6),
+                        'max': max_value
+                    } for measure, (count, total, max_value) in task_totals.items()
+                } for task_name, task_totals in self.usage[str(test)].items()
+            } for test in tests if str(test) in self.usage
+        }
+
+
+class StreamingStatistics:
+    '''Statistics of a data value, updated with each new value.
+
+    Produces the same summary as computing the statistics over all values:
+    mean and variance use Welford's algorithm, the grouped median uses two
+    heaps, and the chunked mean uses prefix sums. Numerical statistics are
+    dropped as soon as a value is not a number.
+
+    Adding a value takes O(log n) time, but the heaps and prefix sums keep
+    every value, so memory is O(n). Building the summary takes time in the
+    number of distinct values, so it is best built only when needed.
+    '''
+
+    def __init__(self):
+        self.n = 0
+        self.count: Dict[str, int] = {}
+
+        self.numeric = True
+        self.numeric_or_bool = True
+
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Mode, as the first value seen among the most common ones
+        self._value_counts: Counter = Counter()
+        self._value_order: Dict[object, int] = {}
+        self._mode = None
+        self._mode_count = 0
+        self._mode_ties = 0
+
+        # Lowest n//2 values (max-heap of negated values), and highest values
+        self._low: List[float] = []
+        self._high: List[float] = []
+        self._low_counts: Counter = Counter()
+
+        self._prefix_sums: List[float] = [0.0]
+
+    def update(self, value):
+        '''Add a value to the statistics'''
+        self.n += 1
+        self.count[str(value)] = self.count.get(str(value), 0) + 1
+
+        is_bool = isinstance(value, bool)
+        is_number = isinstance(value, (int, float))
+        if self.numeric and (is_bool or not is_number):
+            self._drop_numeric()
+        if self.numeric_or_bool and not is_number:
+            self.numeric_or_bool = False
+            self._prefix_sums = []
+
+        if self.numeric:
+            self._update_numeric(value)
+        if self.numeric_or_bool:
+            self._prefix_sums.append(self._prefix_sums[-1] + value)
+
+    def summary(self) -> dict:
+        '''Return the summary of the values, as generated by DefaultResultsProcessor'''
+        summary: dict = {'count': dict(self.count)}
+
+        # Can't generate statistics from a single data point
+        if self.n < 2:
+            return summary
+
+        if self.numeric:
+            variance = self._m2 / (self.n - 1)
+            summary['max'] = self.max
+            summary['min'] = self.min
+            summary['mode'] = self._mode if self._mode_ties == 1 or \
+                sys.version_info >= (3, 8) else None
+            summary['mean'] = round(self._mean, 2)
+            summary['median'] = round(self._median_grouped(), 2)
+            summary['stdev'] = round(math.sqrt(variance), 2)
+            summary['variance'] = round(variance, 2)
+
+        if self.numeric_or_bool:
+            summary['chunked_mean'] = self._chunked_mean(CHUNKED_MEAN_CHUNKS)
+
+        return summary
+
+    def _drop_numeric(self):
+        self.numeric = False
+        self._value_counts = Counter()
+        self._value_order = {}
+        self._low, self._high = [], []
+        self._low_counts = Counter()
+
+    def _update_numeric(self, value):
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        delta = value - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (value - self._mean)
+
+        self._value_order.setdefault(value, len(self._value_order))
+        self._value_counts[value] += 1
+        value_count = self._value_counts[value]
+        if value_count > self._mode_count:
+            self._mode, self._mode_count, self._mode_ties = value, value_count, 1
+        elif value_count == self._mode_count:
+            self._mode_ties += 1
+            if self._value_order[value] < self._value_order[self._mode]:
+                self._mode = value
+
+        if self._low and value <= -self._low[0]:
+            self._push_low(value)
+        else:
+            heapq.heappush(self._high, value)
+
+        while len(self._low) > self.n // 2:
+            heapq.heappush(self._high, self._pop_low())
+        while len(self._low) < self.n // 2:
+            self._push_low(heapq.heappop(self._high))
+
+    def _push_low(self, value):
+        heapq.heappush(self._low, -value)
+        self._low_counts[value] += 1
+
+    def _pop_low(self):
+        value = -heapq.heappop(self._low)
+        self._low_counts[value] -= 1
+        return value
+
+    def _median_grouped(self, interval: float = 1) -> float:
+        '''Same as statistics.median_grouped, from the heaps'''
+        median = self._high[0]
+        lower_count = len(self._low) - self._low_counts[median]
+        return median - interval / 2 + \
+            interval * (self.n / 2 - lower_count) / self._value_counts[median]
+
+    def _chunked_mean(self, n_chunks: int, sigfig: int = 2) -> List[float]:
+        '''Mean of the values, in at most "n_chunks" chunks of equal size'''
+        chunk_size = min(round(self.n / n_chunks) or 1, self.n)
+        chunk_means = []
+        for start in range(0, self.n, chunk_size):
+            end = min(start + chunk_size, self.n)
+            chunk_sum = self._prefix_sums[end] - self._prefix_sums[start]
+            chunk_means.append(round(chunk_sum / (end - start), sigfig))
+            if len(chunk_means) == n_chunks:
+                break
+
+        return chunk_means
+
+
+class StreamingResultsSummary(ResultsSummaryBuilder):
+    '''Summary builder updating the statistics of each value with every new result'''
+
+    def __init__(self):
+        self.statistics: Dict[str, Dict[str, StreamingStatistics]] = {}
+        self.tasks_usage = TaskUsageSummary()
+
+    def add(self, result: dict):
+        self.tasks_usage.add(result)
+        for test_name, test_result in result['TestRunner'].items():
+            if not isinstance(test_result, dict):
+                continue
+
+            test_statistics = self.statistics.setdefault(test_name, {})
+            for data_key, data_value in test_result.get('data', {}).items():
+                if data_key not in test_statistics:
+                    test_statistics[data_key] = StreamingStatistics()
+                test_statistics[data_key].update(data_value)
+
+    def summary(self, tests: list) -> dict:
+        return {
+            str(test): {
+                data_key: statistics.summary()
+                for data_key, statistics in self.statistics.get(str(test), {}).items()
+            } for test in tests if test.data
+        }
+
+    def tasks_summary(self, tests: list) -> dict:
+        return self.tasks_usage.summary(tests)
+
 
 class DefaultResultsProcessor(ResultsProcessor):
     def generate_summary(self, tests: List[TestBase], results: list) -> dict:
         """Get a summary of test results data values, with some numerical analysis"""
-        def chunks(results_list, n):
-            """Yield successive n-sized chunks from results_list"""
-            for i in range(0, len(results_list), n):
-                yield results_list[i:i + n]
-
-        def chunked_mean(results_list, n, sigfig=2):
-            """Chunk the list results_list into n equal chunks, and calculate the mean of
-            each chunk. If n > length of results_list, then the length of results_list is
-            used instead. This gives the mean for first x values, then next x values etc."""
-            chunked_list = chunks(results_list, min(
-                round(len(results_list)/n) or 1, len(results_list)))
-            chunked_mean_list = list(map(
-                lambda x: round(mean(x), sigfig),
-                chunked_list
-            ))
-            if len(chunked_mean_list) > n:
-                chunked_mean_list = chunked_mean_list[0: n]
-            return chunked_mean_list
-
-        results_summary = {}
-        for test in (t for t in tests if t.data):
-            testname = str(test)
-            # Collect data
-            if testname not in results_summary:
-                results_summary[testname] = {}
-
-            for iteration, _ in enumerate(results):
-                for data_key in results[iteration]['TestRunner'][testname]['data']:
-                    if data_key not in results_summary[testname]:
-                        results_summary[testname][data_key] = {}
-                    data_value = results[iteration]['TestRunner'][testname]['data'][data_key]
-
-                    # Collect values in list
-                    if 'values' not in results_summary[testname][data_key]:
-                        results_summary[testname][data_key]['values'] = []
-                    results_summary[testname][data_key]['values'].append(
-                        data_value)
-
-                    # Count of data value
-                    if 'count' not in results_summary[testname][data_key]:
-                        results_summary[testname][data_key]['count'] = {}
-                    if str(data_value) not in results_summary[testname][data_key]['count']:
-                        results_summary[testname][data_key]['count'][str(
-                            data_value)] = 0
-                    results_summary[testname][data_key]['count'][str(
-                        data_value)] += 1
-
-            # Calculate statistical data
-            for data_key in results_summary[testname]:
-                n_values = len(results_summary[testname][data_key]['values'])
-                # Can't generate statistics from a single data point
-                if n_values >= 2:
-                    # Statistics calculated for numbers only
-                    if all((isinstance(d, int) or isinstance(d, float))
-                            and not isinstance(d, bool)
-                            for d in results_summary[testname][data_key]['values']):
-                        results_summary[testname][data_key]['max'] = max(
-                            results_summary[testname][data_key]['values'])
-
-                        results_summary[testname][data_key]['min'] = min(
-                            results_summary[testname][data_key]['values'])
-
-                        try:
-                            results_summary[testname][data_key]['mode'] = mode(
-                                results_summary[testname][data_key]['values'])
-                        except StatisticsError:
-                            # This happens when there is no unique mode
-                            results_summary[testname][data_key]['mode'] = None
-
-                        results_summary[testname][data_key]['mean'] = round(mean(
-                            results_summary[testname][data_key]['values']), 2)
-
-                        results_summary[testname][data_key]['median'] = round(median_grouped(
-                            results_summary[testname][data_key]['values']), 2)
-
-                        results_summary[testname][data_key]['stdev'] = round(stdev(
-                            results_summary[testname][data_key]['values']), 2)
-
-                        results_summary[testname][data_key]['variance'] = round(variance(
-                            results_summary[testname][data_key]['values']), 2)
-
-                    # Statistics calculated for numbers or booleans
-                    if all(isinstance(d, int) or isinstance(d, float)
-                            or isinstance(d, bool)
-                            for d in results_summary[testname][data_key]['values']):
-                        # Chunk the data into equal chunks, and calculate the chunks mean
-                        # This gives the mean for first x values, then next x values etc.
-                        # Number of chunks is lowest of 10 and the length of the dataset
-                        results_summary[testname][data_key]['chunked_mean'] = chunked_mean(
-                            results_summary[testname][data_key]['values'], 10)
-                # We do not want all the data duplicated in the summary
-                del(results_summary[testname][data_key]['values'])
-
-        return results_summary
+        builder = self.summary_builder()
+        for result in results:
+            builder.add(result)
+
+        return builder.summary(tests)
+
+    def summary_builder(self) -> ResultsSummaryBuilder:
+        return StreamingResultsSummary()
@@ -3,14 +3,14 @@ from pluma.test import GroupedTest, TestList
 
 
 class Session(GroupedTest):
-    '''A group of tests organized as a session'''
+    '''A group of tests organized as a session.
+
+    The board is rebooted before the first session, and powered off after
+    the last one, with the "booted_board" fixture.
+    '''
+
+    fixtures = ['booted_board']
 
     def __init__(self, board: Board = None, test_name: str = None,
                  tests: TestList = None):
         super().__init__(board=board, test_name=test_name, tests=tests)
-
-    def setup(self):
-        self.board.power.reboot()
-
-    def teardown(self):
-        self.board.power.off()
@@ -0,0 +1,163 @@
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from typing import Dict, Iterable, Iterator, List, Set, Union
+
+from pluma.core.board import Board
+from pluma.core.baseclasses import LogLevel, Logger
+from pluma.test import TestBase, TestRunnerBase
+
+global_logger = Logger()
+
+
+def copy_test_for_board(test: TestBase, board: Board) -> TestBase:
+    '''Return a copy of a test, with the same name, running on another board'''
+    board_test = copy(test)
+    board_test.board = board
+    return board_test
+
+
+class TestRunnerSharded(TestRunnerBase):
+    '''Run a set of tests across a pool of identical boards.
+
+    Tests are queued, and each board takes the next test from the queue as
+    soon as it is idle. Tests are created for the first board, and run on the
+    other boards as copies using that board instead, so tests must only access
+    their board through "self.board" once running.
+    The data collected is the same as for a single board, with the name of the
+    board which ran each test saved under "board".
+
+    If the duration of tests is known, from "durations" (test base name to
+    seconds) or from a previous run, the longest tests are queued first to
+    balance the load between boards.
+
+    Tests are always queued after their prerequisites (see `TestBase.depends_on`).
+    A board taking a test waits for its prerequisites to complete on other
+    boards, and skips it if one of them failed.
+    '''
+
+    def __init__(self, boards: List[Board], tests: Union[TestBase, Iterable[TestBase]] = None,
+                 email_on_fail: bool = None, continue_on_fail: bool = None,
+                 durations: Dict[str, float] = None):
+        if not boards:
+            raise ValueError('At least one board is required to shard tests')
+
+        super().__init__(board=boards[0], tests=tests, email_on_fail=email_on_fail,
+                         continue_on_fail=continue_on_fail)
+        self.boards = list(boards)
+        self.durations: Dict[str, float] = dict(durations or {})
+        self._durations_lock = threading.Lock()
+        self._finished: Set[str] = set()
+        self._finished_condition = threading.Condition()
+
+    def _run(self, tests: Iterable[TestBase]):
+        self.log(f'== TESTING MODE: SHARDED ({len(self.boards)} boards) ==', color='blue',
+                 bold=True, level=LogLevel.DEBUG)
+
+        self._finished = set()
+        work: queue.SimpleQueue = queue.SimpleQueue()
+        for test in self.queue_order(tests):
+            work.put(test)
+
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(self.boards)) as executor:
+            futures = [executor.submit(self._run_board, board, work, stop)
+                       for board in self.boards]
+
+        errors = [future.exception() for future in futures if future.exception()]
+        if errors:
+            raise errors[0]
+
+    def queue_order(self, tests: Iterable[TestBase]) -> List[TestBase]:
+        '''Return the tests in the order to queue them, longest known duration first'''
+        tests = list(tests)
+        if not self.durations:
+            return tests
+
+        # Unknown durations are queued last, in their original order
+        tests = sorted(tests, key=lambda test: -self.durations.get(test.base_name, 0))
+        return self.dependency_order(tests, self.prerequisites)
+
+    def _run_board(self, board: Board, work: queue.SimpleQueue, stop: threading.Event):
+        '''Run tests from the queue on a board, until it is empty or testing stops'''
+        while not stop.is_set():
+            try:
+                test = work.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                if self._wait_for_prerequisites(test, stop) and \
+                        not self._skip_if_prerequisite_failed(test):
+                    self._run_test(test, board)
+            except BaseException:
+                stop.set()
+                raise
+            finally:
+                with self._finished_condition:
+                    self._finished.add(str(test))
+                    self._finished_condition.notify_all()
+
+    def _wait_for_prerequisites(self, test: TestBase, stop: threading.Event) -> bool:
+        '''Wait until the prerequisites of a test are finished, or testing stops.
+        Return whether the test can run.'''
+        prerequisites = [str(p) for p in self.prerequisites.get(str(test), [])]
+        with self._finished_condition:
+            self._finished_condition.wait_for(
+                lambda: stop.is_set() or all(p in self._finished for p in prerequisites))
+
+        return not stop.is_set()
+
+    def _run_test(self, test: TestBase, board: Board):
+        '''Run all tasks of a test on a board, keeping its output together'''
+        self.data[str(test)]['board'] = board.name
+
+        start = time.monotonic()
+        try:
+            with global_logger.group():
+                self._run_test_tasks(copy_test_for_board(test, board))
+        finally:
+            with self._durations_lock:
+                self.durations[test.base_name] = time.monotonic() - start
+
+
+class IterationPool:
+    '''Thread-safe count of iterations, shared by the TestControllers of several boards.
+
+    Used as run condition (see `sc_run_shared_iterations`), each board runs
+    the next iteration as soon as it is idle, until all iterations are taken.
+    '''
+
+    def __init__(self, iterations: int):
+        self.remaining = iterations
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        '''Take an iteration from the pool. Returns False if none are left.'''
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+
+            self.remaining -= 1
+            return True
+
+
+def merge_iteration_results(controllers: list) -> Iterator[dict]:
+    '''Merge the results of several TestControllers sharing iterations.
+
+    Iterations are merged by start time and renumbered, as if run by a single
+    controller, with the name of the board which ran each of them under "board".
+    '''
+    def board_results(controller):
+        board = controller.testrunner.board
+        for result in controller.all_results():
+            yield dict(result, board=board.name if board else None)
+
+    merged = heapq.merge(*(board_results(controller) for controller in controllers),
+                         key=lambda result: result['start'])
+    for iteration, result in enumerate(merged):
+        result['iteration'] = iteration
+        yield result
@@ -1,3 +1,4 @@
+import os
 from typing import List, Optional, Union
 
 from pluma.core.baseclasses import Logger
@@ -14,15 +15,23 @@ class ShellTest(TestBase):
     def __init__(self, board: Board, script: Union[str, List[str]], name: str = None,
                  should_match_regex: List[str] = None,  should_not_match_regex: List[str] = None,
                  run_on_host: bool = False, timeout: int = None,  runs_in_shell: bool = True,
-                 login_automatically: bool = False):
+                 login_automatically: bool = False, cache_files: List[str] = None):
         super().__init__(board, test_name=name)
         self.should_match_regex = should_match_regex
         self.should_not_match_regex = should_not_match_regex
         self.run_on_host = run_on_host
-        self.timeout = timeout if timeout is not None else 5
+        # None uses the CommandRunner default in a shell, and 5s otherwise
+        self.timeout = timeout
         self.runs_in_shell = runs_in_shell
         self.login_automatically = login_automatically
 
+        self.resources = [] if self.run_on_host else ['console']
+
+        # Host files used by the script. Only a host test declaring them is
+        # cached by default, as the cache cannot tell what else a script reads.
+        self._cache_files = [os.path.abspath(f) for f in cache_files or []]
+        self.cacheable = self.run_on_host and bool(self._cache_files)
+
         if isinstance(script, str):
             self.scripts = [script]
         else:
@@ -34,6 +43,9 @@ class ShellTest(TestBase):
                 ' was defined. Define a console in "pluma-target.yml", or use '
                 ' "run_on_host" test attribute to run on the host instead.')
 
+    def cache_files(self) -> List[str]:
+        return self._cache_files
+
     def test_body(self):
         self.run_commands()
 
@@ -69,7 +81,8 @@ class ShellTest(TestBase):
                                        command=script, timeout=timeout)
         else:
             output = CommandRunner.run_raw(test_name=self._test_name, console=console,
-                                           command=script, timeout=timeout)
+                                           command=script,
+                                           timeout=timeout if timeout is not None else 5)
 
         if self.should_match_regex or self.should_not_match_regex:
             CommandRunner.check_output(test_name=self._test_name, command=script, output=output,
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import islice
 import json
 import time
 
@@ -67,6 +68,7 @@ def sr_log_test_results(TestController, board):
 def write_global_data(TestController, output_file, log_func=print):
     log_func('Writing testing summary data to {}...'.format(
         output_file))
+    TestController.update_summaries()
     with open(output_file, 'w') as f:
         json_data = json.dumps(TestController.data, indent=4)
         f.write(json_data)
@@ -105,12 +107,50 @@ def sc_run_n_iterations(TestController, ntimes):
     return TestController.stats['num_iterations_run'] < ntimes
 
 
+@deferred_function
+def sc_run_until_confident(TestController, early_stopping):
+    data_key = 'sc_run_until_confident:early_stopping'
+
+    # Add the iterations run since the last check, read back from the
+    # results journal when resuming a run
+    new_results = TestController.num_results - early_stopping.iterations
+    if new_results > len(TestController.results):
+        results = islice(TestController.all_results(), early_stopping.iterations, None)
+    else:
+        results = TestController.results[len(TestController.results) - new_results:]
+    for result in results:
+        early_stopping.add(result)
+
+    stop = early_stopping.should_stop()
+    TestController.data[data_key] = early_stopping.summary()
+    if stop:
+        TestController.log(f'Stopping after {early_stopping.iterations} iterations: '
+                           f'{early_stopping.reason}')
+
+    return not stop
+
+
+@deferred_function
+def sc_run_shared_iterations(pool):
+    return pool.take()
+
+
 @deferred_function
 def sc_time_in_range(start_hour, end_hour):
     now = datetime.now()
     return (start_hour <= now.hour and now.hour < end_hour)
 
 
+@sc_time_in_range.next_run_function
+def _sc_time_in_range_next_run(start_hour, end_hour):
+    now = datetime.now()
+    if start_hour <= now.hour < end_hour:
+        return now
+
+    start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    return start if now < start else start + timedelta(days=1)
+
+
 @deferred_function
 def sc_run_daily_at_hour(TestController, start_hour):
     data_key = 'sc_run_daily_at_hour:run_dates'
@@ -130,6 +170,18 @@ def sc_run_daily_at_hour(TestController, start_hour):
     return False
 
 
+@sc_run_daily_at_hour.next_run_function
+def _sc_run_daily_at_hour_next_run(TestController, start_hour):
+    now = datetime.now()
+    start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    run_dates = TestController.data.get('sc_run_daily_at_hour:run_dates', [])
+
+    if now.strftime("%Y/%m/%d") in run_dates:
+        return start + timedelta(days=1)
+
+    return max(start, now)
+
+
 @deferred_function
 def sc_run_in_datetime_range(datetime_start, datetime_end):
     if (not isinstance(datetime_start, datetime) or
@@ -144,3 +196,12 @@ def sc_run_in_datetime_range(datetime_start, datetime_end):
         return True
     else:
         return False
+
+
+@sc_run_in_datetime_range.next_run_function
+def _sc_run_in_datetime_range_next_run(datetime_start, datetime_end):
+    now = datetime.now()
+    if now > datetime_end:
+        return None
+
+    return max(datetime_start, now)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Any, List, Optional
 
 from pluma.core import Board
 
@@ -9,6 +10,30 @@ class TestBase(ABC):
     test_count = 0
     task_hooks = ['setup', 'test_body', 'teardown']
 
+    # Names of the board resources used by the test, such as "console",
+    # "console:ssh" or "power". Tests using different resources can run
+    # concurrently. None requires exclusive use of the board, and an empty
+    # list means the test only uses the host.
+    resources: Optional[List[str]] = None
+
+    # Names of the tests which must pass before this test runs, as accepted
+    # by "matches_name". The test is skipped if any of them fails.
+    depends_on: Optional[List[str]] = None
+
+    # Whether the result of the test only depends on its class, settings,
+    # "cache_files" and the state of the board, so that a passing result
+    # can be reused while they are unchanged (see TestResultCache).
+    cacheable = False
+
+    # Maximum duration of each task of the test, in seconds. The task is
+    # cancelled once exceeded (see CancellationToken). None uses the default
+    # deadline of the TestRunner.
+    task_deadline_s: Optional[float] = None
+
+    # Names of the fixtures used by the test, such as "logged_in_console",
+    # set up before the test runs (see FixtureRegistry).
+    fixtures: Optional[List[str]] = None
+
     def __init__(self, board: Board = None, test_name: str = None):
         """Construct a TestBase with a board, and test suffix"""
         self.board = board
@@ -29,6 +54,9 @@ class TestBase(ABC):
         # Output data to be saved during the test
         self.data = {}
 
+        # Values of the fixtures used by the test, by name
+        self.fixture_values = {}
+
     def setup(self):
         '''Setup before the actual test runs'''
 
@@ -46,10 +74,34 @@ class TestBase(ABC):
         if data_kwargs:
             self.data.update(data_kwargs)
 
+    def fixture(self, name: str) -> Any:
+        '''Return the value of a fixture used by the test'''
+        if name not in self.fixture_values:
+            raise KeyError(f'Fixture "{name}" is not set up for test {self}, '
+                           'add it to the "fixtures" of the test')
+
+        return self.fixture_values[name]
+
+    def cache_files(self) -> List[str]:
+        '''Return the files which the result of the test depends on'''
+        return []
+
     def __repr__(self):
         """Return a human-readable name for the test"""
         return self._test_name
 
+    @property
+    def base_name(self) -> str:
+        """Return the test name without its instance number, stable between runs"""
+        return self._test_name.rsplit('#', 1)[0]
+
+    def matches_name(self, name: str) -> bool:
+        """Return whether "name" designates this test: its base name, with or
+        without its module, or the name given to the test instance"""
+        class_name, __, instance_name = self.base_name.partition('[')
+        return name in (self.base_name, class_name, instance_name[:-1]) or \
+            class_name.endswith(f'.{name}')
+
     @classmethod
     def description(cls):
         return cls.__doc__
@@ -1,17 +1,24 @@
-import time
-import json
+import csv
+import io
+import threading
 from datetime import datetime
 from copy import deepcopy
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from pluma.utils import send_exception_email, datetime_to_timestamp, \
-    regex_filter_list
+    RegexFilter, json_dump_streamed, json_load, json_dump_atomic
 
 from .unittest import deferred_function
-from pluma.test import TestRunner
+from pluma.test import TestRunnerBase, ResultsJournal, Profiler
 
 from .resultsplotter import DefaultResultsPlotter
 from .resultsprocessor import DefaultResultsProcessor
 
+# Longest single sleep until the next run, after which the remaining time is
+# measured again against the wall clock
+MAX_SLEEP_S = 60 * 60
+
 
 class TestController():
     ''' Runs a TestRunner over multiple iterations and processes test data.
@@ -58,7 +65,8 @@ class TestController():
             Saved to :attr:`settings`
             Default: False
         condition_check_interval_s (int): Number of seconds to wait before
-            rechecking the :meth:`run_condition` function.
+            rechecking the :meth:`run_condition` function, if it cannot tell
+            when it will next be True.
             Saved to :attr:`settings`
             Default: 0 seconds, retry immediately
         setup_n_iterations (int): Run setup function every N iterations.
@@ -81,6 +89,21 @@ class TestController():
         results_processor (:class:`~pluma.test.resultsprocessor.ResultsProcessor`): Processor to
             be used to format test results.
             Defaults to :class:`~pluma.test.resultsprocessor.DefaultResultsProcessor`
+        results_journal (:class:`~pluma.test.resultsjournal.ResultsJournal`): Journal
+            to which each iteration result is appended once finalised.
+            Default: None, results are only kept in memory.
+        results_in_memory (int): Number of latest iteration results kept in
+            memory when a results journal is used. Older results are read
+            back from the journal when needed.
+            Saved to :attr:`settings`
+            Default: None, keep all results in memory.
+        checkpoint_file (str): File to which the runtime statistics and settings
+            are saved after each iteration journaled, to allow resuming the run.
+            See :meth:`resume`
+            Default: None, no checkpoint.
+        profiler (:class:`~pluma.test.profiling.Profiler`): Profiler of the
+            TestController loop, and of the tasks of each test run by the TestRunner.
+            Default: None, no profiling.
 
     Attributes:
         settings (dict): Controls the behaviour of the TestController.
@@ -88,7 +111,7 @@ class TestController():
             Items:
                 run_forever, report_n_iterations, continue_on_fail,
                 condition_check_interval_s, setup_n_iterations, force_initial_run,
-                email_on_except
+                email_on_except, results_in_memory
         stats (dict): Contains TestController's runtime statistics.
             num_iterations_run: Total number of iterations run.
             num_iterations_pass: Number of iterations with no test failures.
@@ -104,6 +127,7 @@ class TestController():
                             'stats': {},
                             'results': {},
                             'results_summary': {},
+                            'tasks_summary': {},
                             'test_settings': {}
                         }
                     }
@@ -114,8 +138,14 @@ class TestController():
                  continue_on_fail=True, run_forever=False, condition_check_interval_s=0,
                  setup_n_iterations=None, force_initial_run=False, email_on_except=True,
                  log_func=None, verbose_log_func=None, debug_log_func=None,
-                 results_plotter=None, results_processor=None):
-        assert isinstance(testrunner, TestRunner)
+                 results_plotter=None, results_processor=None, results_journal=None,
+                 results_in_memory=None, checkpoint_file=None, profiler=None):
+        assert isinstance(testrunner, TestRunnerBase)
+        assert results_journal is None or isinstance(results_journal, ResultsJournal)
+
+        if results_in_memory is not None and results_in_memory < 1:
+            raise ValueError('At least one iteration result must be kept in memory, '
+                             f'but got {results_in_memory}')
 
         self.testrunner = testrunner
         self.setup = setup
@@ -130,6 +160,9 @@ class TestController():
 
         self.results_plotter = results_plotter or DefaultResultsPlotter()
         self.results_processor = results_processor or DefaultResultsProcessor()
+        self.results_journal = results_journal
+        self.checkpoint_file = checkpoint_file
+        self.profiler = profiler
 
         # Global data to be used by tests
         # Save TestController data here too
@@ -139,6 +172,7 @@ class TestController():
                 'stats': {},
                 'results': [],
                 'results_summary': {},
+                'tasks_summary': {},
                 'test_settings': {}
             }
         }
@@ -152,6 +186,24 @@ class TestController():
         self.settings['setup_n_iterations'] = setup_n_iterations
         self.settings['force_initial_run'] = force_initial_run
         self.settings['email_on_except'] = email_on_except
+        self.settings['results_in_memory'] = results_in_memory
+
+        # Copy of the settings of each test, shared by all iteration results
+        self._test_settings_snapshots = {}
+
+        # Results summary, updated with each iteration, and whether the
+        # summaries in "data" are behind it
+        self._summary_builder = None
+        self._summaries_outdated = False
+
+        # Number of results only available from the journal
+        self._journal_only_results = 0
+
+        # Continue from the restored statistics on the next run
+        self._resumed = False
+
+        # Set to end the wait for the next run early
+        self._wakeup = threading.Event()
 
         # Runtime statistics
         self.stats = {}
@@ -185,12 +237,40 @@ class TestController():
 
         ll the data values saved to the "data" dicts of
         the tests in the TestRunner, over all iterations that have been run.
+        If the "results_in_memory" setting is used, only the latest iterations
+        are kept, see :meth:`all_results`.
         '''
         return self.data['TestController']['results']
 
     @results.setter
     def results(self, results: list):
         self.data['TestController']['results'] = results
+        self._summary_builder = None
+        self._journal_only_results = 0
+
+    def all_results(self) -> Iterator[dict]:
+        ''' Iterate over the results of all iterations.
+
+        Results no longer kept in memory are read back from the results journal.
+        '''
+        if self._journal_only_results:
+            yield from islice(self.results_journal.read(), self._journal_only_results)
+        yield from self.results
+
+    @property
+    def num_results(self) -> int:
+        ''' Number of iteration results, including those only in the journal '''
+        return self._journal_only_results + len(self.results)
+
+    @property
+    def profiler(self) -> Optional[Profiler]:
+        ''' Profiler of the TestController loop, also used by the TestRunner for tasks '''
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler: Optional[Profiler]):
+        self._profiler = profiler
+        self.testrunner.profiler = profiler
 
     @property
     def results_summary(self):
@@ -198,13 +278,29 @@ class TestController():
 
         A summary of all the data values saved to the "data" dicts of
         the tests in the TestRunner, over all iterations that have been run.
+        Built when read, from the statistics updated with each iteration.
         '''
+        self.update_summaries()
         return self.data['TestController']['results_summary']
 
     @results_summary.setter
     def results_summary(self, results_summary):
         self.data['TestController']['results_summary'] = results_summary
 
+    @property
+    def tasks_summary(self):
+        ''' Summary of the time and resources used by each task of each test.
+
+        Wall time, CPU time, peak RSS increase and console bytes exchanged,
+        over all iterations that have been run.
+        '''
+        self.update_summaries()
+        return self.data['TestController']['tasks_summary']
+
+    @tasks_summary.setter
+    def tasks_summary(self, tasks_summary):
+        self.data['TestController']['tasks_summary'] = tasks_summary
+
     @property
     def test_settings(self):
         ''' Dictionary summarising the test settings.
@@ -255,9 +351,11 @@ class TestController():
         If if it returns True, another iteration is run, and False causes the
         TestController to exit.
         The TestController will not exit if the "run_forever" setting is set. If so
-        the TestController will sleep for a number of seconds (as determined by the
-        "condition_check_interval_s" setting) and the run condition function will
-        be checked again. And so on.
+        the TestController will sleep until the time returned by the
+        :meth:`~pluma.test.unittest.deferred_function.next_run` function of the run
+        condition, or for a number of seconds (as determined by the
+        "condition_check_interval_s" setting) if it is unknown, and the run condition
+        function will be checked again. And so on.
         '''
         return self._run_condition
 
@@ -265,6 +363,30 @@ class TestController():
     def run_condition(self, f):
         self._run_condition = None if f is None else deferred_function(f)
 
+    def sleep_until(self, when: datetime) -> bool:
+        ''' Sleep until the local time "when", or until :meth:`wake` is called.
+
+        The sleep is timed with the monotonic clock, and the remaining time
+        is measured again against the wall clock at least every MAX_SLEEP_S, so
+        that the sleep ends on time even if the system clock is adjusted.
+        Signals are handled while sleeping, and an exception raised by a signal
+        handler (such as KeyboardInterrupt) ends the sleep.
+        Returns False if woken up before "when".
+        '''
+        while True:
+            remaining = (when - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return True
+
+            if self._wakeup.wait(min(remaining, MAX_SLEEP_S)):
+                self._wakeup.clear()
+                return False
+
+    def wake(self):
+        ''' End the current or next sleep between runs early, so that the run
+        condition is checked immediately. Can be called from any thread. '''
+        self._wakeup.set()
+
     def log(self, message):
         ''' Basic logging function wrapper
 
@@ -286,7 +408,19 @@ class TestController():
 
     def get_test_data_summary(self):
         ''' Get a summary of test results data values, with some numerical analysis '''
-        return self.results_processor.generate_summary(self.testrunner.tests, self.results)
+        builder = self.results_processor.summary_builder()
+        for result in self.all_results():
+            builder.add(result)
+
+        return builder.summary(self.testrunner.tests)
+
+    def get_tasks_summary(self):
+        ''' Get a summary of the time and resources used by each task '''
+        builder = self.results_processor.summary_builder()
+        for result in self.all_results():
+            builder.add(result)
+
+        return builder.tasks_summary(self.testrunner.tests)
 
     def collect_test_settings(self):
         ''' Get a summary of the settings for tests in the TestRunner '''
@@ -304,7 +438,7 @@ class TestController():
         return settings
 
     def get_test_data(self, test_names=None, fields=None, output_format=None,
-                      settings=None):
+                      settings=None, header=None):
         '''Get test data from the global data dictionary.
 
         Args:
@@ -330,8 +464,56 @@ class TestController():
                     Default: return data is a generator to create a list of dicts
                     E.g.
                         >>> field1_data = list(returned)[iteration_number]['test_name']['field1']
+            header (list(str)): Optional. Data fields used as CSV columns.
+                Default: all the fields found in the data, which requires
+                reading the data twice.
         '''
+        if not output_format:
+            return self._test_data_gen(test_names=test_names, fields=fields, settings=settings)
+
+        output = io.StringIO()
+        self.write_test_data(output, test_names=test_names, fields=fields,
+                             output_format=output_format, settings=settings, header=header)
+        return output.getvalue()
+
+    def write_test_data(self, file, test_names=None, fields=None, output_format='csv',
+                        settings=None, header=None):
+        '''Write test data to a file object, one iteration at a time.
 
+        Takes the same arguments as :meth:`get_test_data`, with an output
+        format of "csv" or "json".
+        '''
+        if output_format not in ['json', 'csv']:
+            raise RuntimeError(
+                f'Invalid format: {output_format}. Options: "json", "csv", None')
+
+        def data_gen():
+            return self._test_data_gen(test_names=test_names, fields=fields, settings=settings)
+
+        if output_format == 'json':
+            json_dump_streamed(data_gen(), file, indent=4)
+            return
+
+        if header is None:
+            header = sorted(set(key for it_data in data_gen()
+                                for test, data in it_data.items() for key in data))
+
+        def csv_value(value):
+            return str(value).replace('\n', ' ').replace('\r', '')
+
+        writer = csv.writer(file, lineterminator='\n')
+        empty_csv = True
+        for iteration, tests_data in enumerate(data_gen()):
+            for test_name, data in tests_data.items():
+                if empty_csv:
+                    writer.writerow(['iteration', 'test_name'] + [csv_value(h) for h in header])
+                    empty_csv = False
+
+                writer.writerow([iteration, test_name] +
+                                [csv_value(data[h]) if h in data else '' for h in header])
+
+    def _test_data_gen(self, test_names=None, fields=None, settings=None):
+        '''Generate the test data of each iteration, see :meth:`get_test_data`'''
         test_names = test_names or '.*'
         if not isinstance(test_names, list):
             test_names = [test_names]
@@ -339,52 +521,49 @@ class TestController():
         # Add a $ to the end of every regex to make it less greedy
         test_names = [f'{t}$' for t in test_names]
 
-        def data_gen():
-            for r in (result['TestRunner'] for result in self.results):
-                yield {
-                    name: {
-                        f: v for f, v in r[name]['data'].items() if 'data' in r[name] and
-                        not fields or f in fields
-                    } for name in regex_filter_list(test_names, r, unique=True)
-                    if not settings or
-                    all(key in r[name]['settings'] and
-                        r[name]['settings'][key] == val
-                        for key, val in settings.items())
-                }
-
-        if output_format == 'json':
-            return json.dumps(list(data_gen()), indent=4)
-        elif output_format == 'csv':
-            newline = '\n'
-            header = sorted(list(set(key for it_data in data_gen()
-                                     for test, data in it_data.items() for key in data)))
-            csv_str = 'iteration,test_name,' + \
-                ','.join(header).replace('\n', ' ').replace('\r', '') + newline
-            empty_csv = True
-            for iteration, tests_data in enumerate(data_gen()):
-                for test_name, data in tests_data.items():
-                    empty_csv = False
-                    csv_str += f'{iteration},{test_name}'
-                    for h in header:
-                        csv_str += ','
-                        if h in data:
-                            csv_str += str(data[h]).replace('\n',
-                                                            ' ').replace('\r', '')
-                    csv_str += newline
-            return csv_str if not empty_csv else ''
-        elif not output_format:
-            return data_gen()
-        else:
-            raise RuntimeError(
-                f'Invalid format: {output_format}. Options: "json", "csv", None')
+        # Tests selected for each set of test names found in the results,
+        # assuming test settings never change between iterations
+        names_filter = RegexFilter(test_names)
+        selected_names: Dict[Tuple[str, ...], List[str]] = {}
+
+        for r in (result['TestRunner'] for result in self.all_results()):
+            names_key = tuple(r)
+            names = selected_names.get(names_key)
+            if names is None:
+                names = [name for name in names_filter.filter(names_key)
+                         if not settings or
+                         all(key in r[name]['settings'] and
+                             r[name]['settings'][key] == val
+                             for key, val in settings.items())]
+                selected_names[names_key] = names
+
+            yield {
+                name: {
+                    f: v for f, v in r[name]['data'].items() if 'data' in r[name] and
+                    not fields or f in fields
+                } for name in names
+            }
 
     def graph_test_results(self, file, test_names=None, fields=None, vs_type=None,
                            title=None, output_format=None, config=None):
         '''Create a graph of data fields from the test results data'''
         results = list(self.get_test_data(test_names=test_names, fields=fields))
-        self.results_plotter.plot(file, results=results, test_names=test_names, fields=fields,
-                                  vs_type=vs_type, title=title, output_format=output_format,
-                                  config=config)
+        return self.results_plotter.plot(file, results=results, test_names=test_names,
+                                         fields=fields, vs_type=vs_type, title=title,
+                                         output_format=output_format, config=config)
+
+    def graph_test_results_many(self, graphs: List[dict]):
+        '''Create a graph for each dict of :meth:`graph_test_results` arguments in "graphs".
+
+        Independent graphs can be rendered concurrently by the results plotter.
+        '''
+        plots = []
+        for graph in graphs:
+            results = list(self.get_test_data(test_names=graph.get('test_names'),
+                                              fields=graph.get('fields')))
+            plots.append(dict(graph, results=results))
+
+        self.results_plotter.plot_many(plots)
 
     def run_iteration(self):
         ''' Run all tests in TestRunner '''
@@ -414,6 +593,10 @@ class TestController():
     def run(self):
         ''' Run the test suite with saved settings '''
         try:
+            if self.profiler:
+                with self.profiler.profile('TestController'):
+                    return self._run()
+
             return self._run()
         # If exception is one we deliberately caused, don't handle it
         except KeyboardInterrupt as e:
@@ -424,13 +607,16 @@ class TestController():
             if self.settings['email_on_except']:
                 send_exception_email(e)
             raise e
+        finally:
+            if self.results_journal is not None:
+                self.results_journal.close()
 
     def _run(self):
-        self.stats['num_iterations_run'] = 0
-        self.stats['num_iterations_pass'] = 0
-        self.stats['num_tests_run'] = 0
-        self.stats['num_tests_pass'] = 0
-        self.stats['num_tests_total'] = 0
+        if self._resumed:
+            self._resumed = False
+            self.log(f'Resuming from iteration #{self.stats["num_iterations_run"] + 1}')
+        else:
+            self._reset_stats()
 
         self.debug_log(f'Starting TestController with settings: {self.settings}')
         self.debug_log(f'Test settings: {self.test_settings}')
@@ -481,10 +667,15 @@ class TestController():
                 self.report.run(self)
 
             if self.settings['run_forever']:
+                next_run = self.run_condition.next_run(self) if self.run_condition else None
                 check_interval = self.settings['condition_check_interval_s']
-                if check_interval:
+                if next_run is not None:
+                    self.log(f'Sleeping until {next_run:%Y-%m-%d %H:%M:%S}...')
+                    self.sleep_until(next_run)
+                elif check_interval:
                     self.log(f'Sleeping for {check_interval} seconds...')
-                    time.sleep(check_interval)
+                    if self._wakeup.wait(check_interval):
+                        self._wakeup.clear()
             else:
                 return success
 
@@ -502,29 +693,154 @@ class TestController():
         return self.results[-1]
 
     def _finalise_iteration(self, success):
-        # Create copies of all TestRunner data
-        self.results[-1]['TestRunner'] = deepcopy(self.testrunner.data)
+        self.results[-1]['TestRunner'] = self._snapshot_testrunner_data()
 
         # Update stats
         self.results[-1]['end'] = datetime_to_timestamp(datetime.now())
         self.results[-1]['success'] = success
         self.results[-1]['ran'] = True
 
-        num_tests_run = len([
-            k for k, v in self.testrunner.data.items()
-            if v['tasks']['ran']])
-        num_tests_pass = len([
-            k for k, v in self.testrunner.data.items()
-            if v['tasks']['ran'] and not v['tasks']['failed']])
+        self._update_stats(self.results[-1])
 
-        if success:
+        self._add_to_summary(self.results[-1])
+        self.test_settings = self.collect_test_settings()
+
+        if self.results_journal is not None:
+            self.results_journal.append(self.results[-1])
+            self._trim_results()
+
+            if self.checkpoint_file:
+                self.save_checkpoint()
+
+    def _reset_stats(self):
+        self.stats['num_iterations_run'] = 0
+        self.stats['num_iterations_pass'] = 0
+        self.stats['num_tests_run'] = 0
+        self.stats['num_tests_pass'] = 0
+        self.stats['num_tests_total'] = 0
+
+    def _update_stats(self, result: dict):
+        '''Update the runtime statistics with the result of an iteration'''
+        tests_data = [v for v in result['TestRunner'].values()
+                      if isinstance(v, dict) and 'tasks' in v]
+        num_tests_run = len([v for v in tests_data if v['tasks']['ran']])
+        num_tests_pass = len([v for v in tests_data
+                              if v['tasks']['ran'] and not v['tasks']['failed']])
+
+        if result['success']:
             self.stats['num_iterations_pass'] += 1
 
         self.stats['num_tests_run'] += num_tests_run
         self.stats['num_tests_pass'] += num_tests_pass
-        self.stats['num_tests_total'] += len(self.testrunner.tests)
+        self.stats['num_tests_total'] += len(tests_data)
 
         self.stats['num_iterations_run'] += 1
 
-        self.results_summary = self.get_test_data_summary()
-        self.test_settings = self.collect_test_settings()
+    def save_checkpoint(self):
+        ''' Save the runtime statistics and settings to the checkpoint file.
+
+        The checkpoint is replaced atomically, and refers to the number of
+        iterations in the results journal it accounts for.
+        '''
+        checkpoint = {
+            'iterations': self.num_results,
+            'stats': self.stats,
+            'settings': self.settings,
+            'test_settings': self.test_settings
+        }
+
+        json_dump_atomic(checkpoint, self.checkpoint_file, default=str)
+
+    def resume(self):
+        ''' Restore the state of an interrupted run, to continue it on the next run.
+
+        Iteration results are read from the results journal, which must be
+        created with "resume" set, and new iterations are appended to it.
+        Statistics and settings are restored from the checkpoint file, and
+        updated with any iteration journaled after it, or rebuilt from the whole
+        journal if the checkpoint is missing or invalid. The results summary is
+        rebuilt from the journal.
+        '''
+        if self.results_journal is None:
+            raise ValueError('A results journal is required to resume a run')
+
+        checkpoint = json_load(self.checkpoint_file) if self.checkpoint_file else None
+
+        num_journaled = len(self.results_journal)
+        self.results = []
+        self._journal_only_results = num_journaled
+        self._reset_stats()
+
+        checkpointed = 0
+        if checkpoint and checkpoint['iterations'] <= num_journaled:
+            checkpointed = checkpoint['iterations']
+            self.stats.update(checkpoint['stats'])
+            self.settings.update(checkpoint['settings'])
+
+        for result in islice(self.results_journal.read(), checkpointed, None):
+            self._update_stats(result)
+
+        if checkpoint:
+            self.test_settings = checkpoint['test_settings']
+        if num_journaled:
+            self._add_to_summary()
+
+        self._resumed = True
+        self.log(f'Restored {num_journaled} iterations from {self.results_journal}')
+
+    def _snapshot_testrunner_data(self) -> dict:
+        '''Return a snapshot of the TestRunner data for the iteration just run.
+
+        The TestRunner creates new data for each iteration, so only the values
+        saved by tests are copied. Test settings never change between
+        iterations, so they are copied once per test and shared by all results.
+        '''
+        snapshot = {}
+        for test_name, test_data in self.testrunner.data.items():
+            if not isinstance(test_data, dict) or 'data' not in test_data:
+                snapshot[test_name] = deepcopy(test_data)
+                continue
+
+            test_snapshot = dict(test_data)
+            test_snapshot['data'] = deepcopy(test_data['data'])
+            if 'settings' in test_data:
+                if test_name not in self._test_settings_snapshots:
+                    self._test_settings_snapshots[test_name] = deepcopy(test_data['settings'])
+                test_snapshot['settings'] = self._test_settings_snapshots[test_name]
+
+            snapshot[test_name] = test_snapshot
+
+        return snapshot
+
+    def _add_to_summary(self, result: dict = None):
+        '''Add an iteration result to the summary builder, or all of them if
+        the builder is new. The summaries are only built when read.'''
+        if self._summary_builder is None:
+            self._summary_builder = self.results_processor.summary_builder()
+            for result in self.all_results():
+                self._summary_builder.add(result)
+        else:
+            self._summary_builder.add(result)
+
+        self._summaries_outdated = True
+
+    def update_summaries(self):
+        ''' Build "results_summary" and "tasks_summary" from the results added
+        since they were last built, as needed before saving "data". '''
+        if not self._summaries_outdated:
+            return
+
+        self._summaries_outdated = False
+        tests = self.testrunner.tests
+        self.results_summary = self._summary_builder.summary(tests)
+        self.tasks_summary = self._summary_builder.tasks_summary(tests)
+
+    def _trim_results(self):
+        '''Drop the oldest results from memory, keeping "results_in_memory" of them'''
+        results_in_memory = self.settings['results_in_memory']
+        if results_in_memory is None or len(self.results) <= results_in_memory:
+            return
+
+        num_dropped = len(self.results) - results_in_memory
+        del self.results[:num_dropped]
+        self._journal_only_results += num_dropped
@@ -1,7 +1,6 @@
-from copy import copy
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from pluma.test import TestBase
+from pluma.test import TestBase, FixtureManager
 from pluma.core import Board
 from pluma.core.baseclasses import Logger
 
@@ -11,11 +10,12 @@ log = Logger()
 
 
 class TestGroup:
-    '''A named set of tests'''
+    '''A named set of tests, indexed by test name'''
 
-    def __init__(self, name: str = None, tests: List[TestBase] = None):
+    def __init__(self, name: str = None, tests: Iterable[TestBase] = None):
         self.name = name
         self._tests: List[TestBase] = []
+        self._positions: Dict[str, int] = {}
         self.tests = tests if tests is not None else []
 
     def __str__(self):
@@ -32,11 +32,12 @@ class TestGroup:
         return self._tests
 
     @tests.setter
-    def tests(self, tests: List[TestBase]):
-        if not isinstance(tests, list):
-            raise TypeError(f'Expected a List[Testbase], but got {tests}')
+    def tests(self, tests: Iterable[TestBase]):
+        if isinstance(tests, (str, TestBase)) or not isinstance(tests, Iterable):
+            raise TypeError(f'Expected an Iterable[Testbase], but got {tests}')
 
         self._tests = []
+        self._positions = {}
         for test in tests:
             self.add_test(test)
 
@@ -46,23 +47,26 @@ class TestGroup:
             raise TypeError('The test must be a TestBase instance, '
                             f'but got {test} instead.')
 
-        if self.get_test_by_name(str(test)) is not None:
+        if str(test) in self._positions:
             raise RuntimeError(f'Found duplicate test name {str(test)}!'
                                'This is a bug, please report it to the pluma '
                                'development team.')
 
-        test = copy(test)
-
         log.debug(f'Appending test: {test}')
+        self._positions[str(test)] = len(self._tests)
         self._tests.append(test)
 
     def get_test_by_name(self, test_name: str) -> Optional[TestBase]:
-        tests_with_name = [t for t in self.tests if str(t) == test_name]
-        if len(tests_with_name) > 1:
-            raise RuntimeError(f'Found multiple tests with name {test_name}, '
-                               'this should not happen')
+        position = self._positions.get(test_name)
+        return None if position is None else self._tests[position]
+
+    def index(self, test: TestBase) -> int:
+        '''Return the position of a test in the group'''
+        position = self._positions.get(str(test))
+        if position is None:
+            raise ValueError(f'Test {test} is not in {self}')
 
-        return None if not tests_with_name else tests_with_name[0]
+        return position
 
 
 class GroupedTest(TestBase):
@@ -75,7 +79,17 @@ class GroupedTest(TestBase):
         self.test_group = TestGroup(tests=tests)
 
     def test_body(self):
-        for test in self.test_group.tests:
-            test.setup()
-            test.test_body()
-            test.teardown()
+        fixture_manager = FixtureManager.current()
+        if fixture_manager is None:
+            fixture_manager = FixtureManager(board=self.board)
+            fixture_manager.prepare(self.test_group.tests)
+
+        with fixture_manager.group(self):
+            for test in self.test_group.tests:
+                fixture_manager.acquire(test, group=self)
+                try:
+                    test.setup()
+                    test.test_body()
+                    test.teardown()
+                finally:
+                    fixture_manager.release(test)
@@ -0,0 +1,83 @@
+import threading
+from typing import Dict, List
+
+from pluma.utils import json_load, json_dump_atomic
+from .testbase import TestBase
+
+""" Number of latest outcomes kept for each test """
+DEFAULT_HISTORY_SIZE = 20
+
+""" Weight of each outcome relative to the next, more recent one """
+HISTORY_DECAY = 0.5
+
+""" Weight of the latest duration in the moving average of durations """
+DURATION_SMOOTHING = 0.3
+
+
+class TestHistory:
+    '''Pass/fail history and duration of tests, persisted across runs in a JSON file.
+
+    Tests are identified by their base name, which is stable between runs.
+    For each test, the latest "history_size" outcomes are kept, along with
+    a moving average of the duration of the test.
+
+    :meth:`order` sorts tests to fail fast: tests most likely to fail first,
+    based on their recent outcomes, then the shortest tests first.
+    '''
+
+    def __init__(self, file: str, history_size: int = None):
+        self.file = file
+        self.history_size = history_size if history_size is not None else DEFAULT_HISTORY_SIZE
+        self.tests: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.file}]'
+
+    def load(self):
+        '''Load the history from the file. A missing or invalid file gives an empty history'''
+        content = json_load(self.file)
+        tests = content.get('tests') if isinstance(content, dict) else None
+
+        with self._lock:
+            self.tests = tests if isinstance(tests, dict) else {}
+
+    def save(self):
+        '''Save the history to the file, replacing it atomically'''
+        with self._lock:
+            json_dump_atomic({'tests': self.tests}, self.file)
+
+    def record(self, test: TestBase, passed: bool, duration_s: float = None):
+        '''Record the outcome of a test, and its duration if known'''
+        with self._lock:
+            history = self.tests.setdefault(test.base_name, {'outcomes': []})
+            history['outcomes'] = (history['outcomes'] + [passed])[-self.history_size:]
+
+            if duration_s is not None:
+                average = history.get('duration_s', duration_s)
+                history['duration_s'] = average + DURATION_SMOOTHING * (duration_s - average)
+
+    def failure_score(self, test: TestBase) -> float:
+        '''Return the share of recent failures of a test, weighing the latest most.
+        Tests without history have a score of 0.'''
+        outcomes = self.tests.get(test.base_name, {}).get('outcomes', [])
+        weights = [HISTORY_DECAY ** age for age in range(len(outcomes))]
+        total = sum(weights)
+        if not total:
+            return 0.0
+
+        failures = sum(weight for weight, passed in zip(weights, reversed(outcomes))
+                       if not passed)
+        return failures / total
+
+    def duration(self, test: TestBase) -> float:
+        '''Return the average duration of a test, or 0 if unknown'''
+        return self.tests.get(test.base_name, {}).get('duration_s', 0.0)
+
+    def order(self, tests: List[TestBase]) -> List[TestBase]:
+        '''Return the tests most likely to fail first, then the shortest first'''
+        with self._lock:
+            return sorted(tests, key=lambda test: (-self.failure_score(test),
+                                                   self.duration(test)))
@@ -1,15 +1,65 @@
 from pluma.core.board import Board
+import heapq
+import resource
 import traceback
 import time
 from abc import ABC, abstractmethod
-from typing import Iterable, List, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from pluma import utils
-from pluma.core.baseclasses import LogLevel, Logger
-from pluma.test import TestBase, TestGroup, AbortTesting
+from pluma.core.baseclasses import LogLevel, Logger, CancellationToken, DeadlineWatchdog
+from pluma.test import TestBase, TestGroup, AbortTesting, Profiler, TestHistory, \
+    TestResultCache, Fixture, FixtureManager
 
 global_logger = Logger()
 
+DEFAULT_PARALLEL_JOBS = 4
+
+# CPU time of the calling thread only, where supported
+RUSAGE_TASK = getattr(resource, 'RUSAGE_THREAD', resource.RUSAGE_SELF)
+
+
+class TaskUsage:
+    '''Wall time, host resources and console traffic used while running a task.
+
+    CPU time is measured for the thread running the task where supported.
+    Peak RSS and console bytes are shared by all tasks running concurrently.
+    '''
+
+    def __init__(self, board: Optional[Board] = None):
+        self.engines = [console.engine for console in (board.consoles.values() if board else [])
+                        if getattr(console, 'engine', None) is not None]
+        self.start_wall_time = time.monotonic()
+        self.start_cpu_time = self.cpu_time()
+        self.start_max_rss = self.max_rss()
+        self.start_bytes_sent, self.start_bytes_received = self.console_bytes()
+
+    def result(self) -> dict:
+        '''Return the usage since this object was created'''
+        bytes_sent, bytes_received = self.console_bytes()
+        return {
+            'wall_time_s': round(time.monotonic() - self.start_wall_time, 6),
+            'cpu_time_s': round(self.cpu_time() - self.start_cpu_time, 6),
+            'peak_rss_delta_kb': self.max_rss() - self.start_max_rss,
+            'console_bytes_sent': bytes_sent - self.start_bytes_sent,
+            'console_bytes_received': bytes_received - self.start_bytes_received
+        }
+
+    @staticmethod
+    def cpu_time() -> float:
+        usage = resource.getrusage(RUSAGE_TASK)
+        return usage.ru_utime + usage.ru_stime
+
+    @staticmethod
+    def max_rss() -> int:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def console_bytes(self) -> Tuple[int, int]:
+        return (sum(getattr(engine, 'bytes_sent', 0) for engine in self.engines),
+                sum(getattr(engine, 'bytes_received', 0) for engine in self.engines))
+
 
 class TestRunnerBase(ABC):
     '''Run a set of tests a single time and collect their settings and saved data'''
@@ -42,6 +92,26 @@ class TestRunnerBase(ABC):
         # General purpose data for use globally between tests
         self.data = {}
 
+        # Profiler of the tasks run, merging the profiles of each test
+        self.profiler: Optional[Profiler] = None
+
+        # Prerequisites of each test by name, from their "depends_on"
+        self.prerequisites: Dict[str, List[TestBase]] = {}
+
+        # History of the tests across runs, used to run tests likely to fail first
+        self.history: Optional[TestHistory] = None
+
+        # Cache of passing results, reused instead of running cacheable tests again
+        self.result_cache: Optional[TestResultCache] = None
+
+        # Default maximum duration of each task, in seconds (see `TestBase.task_deadline_s`)
+        self.task_deadline_s: Optional[float] = None
+        self.watchdog = DeadlineWatchdog(on_expired=self._on_task_deadline_expired)
+
+        # Fixtures by name, overriding the default fixtures of the FixtureRegistry
+        self.fixtures: Dict[str, Fixture] = {}
+        self.fixture_manager = FixtureManager(board=board)
+
     @abstractmethod
     def _run(self, tests: Iterable[TestBase]) -> bool:
         '''Run the tests'''
@@ -58,11 +128,20 @@ class TestRunnerBase(ABC):
         for test in self.tests:
             self._init_test_data(test)
 
-        self.log(f'Running tests: {list(map(str, self.tests))}', level=LogLevel.DEBUG)
+        # Prerequisites run first, and a test is skipped if one of them fails
+        self.prerequisites = self.dependency_graph(self.tests)
+        tests = self.history.order(self.tests) if self.history else self.tests
+        tests = self.dependency_order(tests, self.prerequisites)
+
+        self.log(f'Running tests: {list(map(str, tests))}', level=LogLevel.DEBUG)
+
+        # Fixtures are shared by all the tests of the run
+        self.fixture_manager = FixtureManager(self.fixtures, board=self.board)
+        self.fixture_manager.prepare(tests)
 
         try:
             # Defer the actual test running to classes that inherit this base
-            self._run(self.tests)
+            self._run(tests)
         except Exception as e:
             # Prevent exceptions from leaving test runner
             self.log('\n== TESTING ABORTED EARLY ==', color='red', bold=True,
@@ -71,6 +150,14 @@ class TestRunnerBase(ABC):
         else:
             self.log('\n== ALL TESTS COMPLETED ==', color='blue', bold=True,
                      level=LogLevel.DEBUG)
+        finally:
+            self.fixture_manager.teardown_all()
+
+        if self.history:
+            self._record_history(tests)
+
+        if self.result_cache:
+            self._save_result_cache()
 
         # Check if any tasks failed
         if self.test_fails:
@@ -90,17 +177,165 @@ class TestRunnerBase(ABC):
         self.data[str(test)] = {
             'tasks': {
                 'ran': [],
-                'failed': {}
+                'failed': {},
+                'usage': {}
             },
             'data': test.data,
             'settings': test.settings,
-            'order': self.tests.index(test)
+            'order': self._test_group.index(test)
         }
 
     @property
     def tests(self) -> List[TestBase]:
         return self._test_group.tests
 
+    @staticmethod
+    def dependency_graph(tests: List[TestBase]) -> Dict[str, List[TestBase]]:
+        '''Return the prerequisites of each test by name, from their "depends_on".
+
+        A dependency name matching several tests depends on all of them.
+        '''
+        graph = {}
+        for test in tests:
+            prerequisites: List[TestBase] = []
+            for name in test.depends_on or []:
+                matches = [other for other in tests
+                           if other is not test and other.matches_name(name)]
+                if not matches:
+                    raise ValueError(f'Test "{test}" depends on "{name}", which is not run')
+
+                prerequisites.extend(other for other in matches if other not in prerequisites)
+            graph[str(test)] = prerequisites
+
+        return graph
+
+    @staticmethod
+    def dependency_order(tests: List[TestBase],
+                         prerequisites: Dict[str, List[TestBase]]) -> List[TestBase]:
+        '''Return the tests with their prerequisites first, otherwise in order'''
+        blocking = {}
+        dependents: Dict[str, List[int]] = {}
+        for position, test in enumerate(tests):
+            test_prerequisites = prerequisites.get(str(test), [])
+            blocking[position] = len(test_prerequisites)
+            for prerequisite in test_prerequisites:
+                dependents.setdefault(str(prerequisite), []).append(position)
+
+        # Always take the first test in order which is ready
+        ready = [position for position, count in blocking.items() if not count]
+        heapq.heapify(ready)
+        ordered: List[TestBase] = []
+        while ready:
+            test = tests[heapq.heappop(ready)]
+            ordered.append(test)
+            for dependent in dependents.get(str(test), []):
+                blocking[dependent] -= 1
+                if not blocking[dependent]:
+                    heapq.heappush(ready, dependent)
+
+        if len(ordered) < len(tests):
+            done = {str(test) for test in ordered}
+            raise ValueError('Circular dependency between tests: '
+                             f'{[str(t) for t in tests if str(t) not in done]}')
+
+        return ordered
+
+    def _record_history(self, tests: List[TestBase]):
+        '''Record the outcome and duration of the tests which ran, and save the history'''
+        for test in tests:
+            tasks = self.data[str(test)]['tasks']
+            if not tasks['ran'] or 'skipped' in tasks or 'cached' in tasks:
+                continue
+
+            duration_s = sum(usage['wall_time_s'] for usage in tasks['usage'].values())
+            self.history.record(test, passed=not tasks['failed'], duration_s=duration_s)
+
+        try:
+            self.history.save()
+        except OSError as e:
+            self.log(f'Failed to save the tests history to {self.history.file}: {e}',
+                     level=LogLevel.WARNING)
+
+    def _save_result_cache(self):
+        try:
+            self.result_cache.save()
+        except OSError as e:
+            self.log(f'Failed to save the result cache to {self.result_cache.file}: {e}',
+                     level=LogLevel.WARNING)
+
+    def _restore_cached_result(self, test: TestBase) -> bool:
+        '''Restore the result of a test from the result cache, and return whether
+        it was found'''
+        entry = self.result_cache.get(test)
+        if entry is None:
+            return False
+
+        test_data = self.data[str(test)]
+        test_data['tasks']['ran'].extend(entry['ran'])
+        test_data['tasks']['cached'] = {'time': entry['time']}
+        test.data.update(entry['data'])
+
+        cached_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time']))
+        self.log(f'{str(test)} - CACHED: Reusing the result from {cached_time}',
+                 color='green', level=LogLevel.IMPORTANT)
+        return True
+
+    def _run_test_tasks(self, test: TestBase):
+        '''Run all tasks of a test, unless its result can be restored from the result cache'''
+        if self.result_cache and self._restore_cached_result(test):
+            self.fixture_manager.release(test)
+            return
+
+        try:
+            with self.fixture_manager.activate():
+                if self._acquire_fixtures(test):
+                    self._run_tasks(test, self.known_tasks)
+        finally:
+            self.fixture_manager.release(test)
+
+        if self.result_cache:
+            self.result_cache.put(test, self.data[str(test)])
+
+    def _acquire_fixtures(self, test: TestBase) -> bool:
+        '''Set up the fixtures of a test, and return whether they are ready'''
+        if not test.fixtures:
+            return True
+
+        try:
+            with self._task_deadline(test, 'fixtures'):
+                self.fixture_manager.acquire(test)
+        except KeyboardInterrupt as e:
+            raise e
+        except InterruptedError as e:
+            raise e
+        except Exception as e:
+            self.data[str(test)]['tasks']['failed']['fixtures'] = str(e)
+            self.log(f'{str(test)} - fixtures: FAIL', color='red', level=LogLevel.IMPORTANT)
+            self._handle_failed_task(test, 'fixtures', e)
+
+            if not self.continue_on_fail:
+                raise e
+            return False
+
+        return True
+
+    def _test_failed(self, test: TestBase) -> bool:
+        '''Return whether a test failed or was skipped during this run'''
+        tasks = self.data[str(test)]['tasks']
+        return bool(tasks['failed']) or 'skipped' in tasks
+
+    def _skip_if_prerequisite_failed(self, test: TestBase) -> bool:
+        '''Skip a test if any of its prerequisites failed, and return whether it was skipped'''
+        failed = [str(p) for p in self.prerequisites.get(str(test), []) if self._test_failed(p)]
+        if not failed:
+            return False
+
+        reason = f'Prerequisite failed: {", ".join(failed)}'
+        self.data[str(test)]['tasks']['skipped'] = reason
+        self.fixture_manager.release(test)
+        self.log(f'{str(test)} - SKIPPED: {reason}', color='yellow', level=LogLevel.IMPORTANT)
+        return True
+
     @tests.setter
     def tests(self, tests: List[TestBase]):
         self._test_group.tests = tests
@@ -129,6 +364,12 @@ class TestRunnerBase(ABC):
 
         self.data[str(test)]['tasks']['ran'].append(task_name)
 
+        # Tag structured log records with the current test and task
+        log_context = global_logger.context
+        board = getattr(test, 'board', None) or self.board
+        global_logger.set_context(board=board.name if board else None,
+                                  test=str(test), task=task_name)
+
         # Print test message
         test_message = f'{str(test)} - {task_name}'
 
@@ -141,7 +382,9 @@ class TestRunnerBase(ABC):
         self.hold_log()
 
         try:
-            task_func()
+            with self._measure_task(test, task_name, board), \
+                    self._task_deadline(test, task_name):
+                task_func()
         # If exception is one we deliberately caused, don't handle it
         except KeyboardInterrupt as e:
             raise e
@@ -174,6 +417,49 @@ class TestRunnerBase(ABC):
             self.log('PASS', color='green', level=LogLevel.IMPORTANT, bypass_hold=True)
         finally:
             self.release_log()
+            global_logger.context = log_context
+
+    @contextmanager
+    def _measure_task(self, test: TestBase, task_name: str, board: Optional[Board]):
+        '''Save the time and resources used by a task, even if it fails.
+
+        The task is also profiled, if a profiler is set.
+        '''
+        usage = TaskUsage(board)
+        try:
+            if self.profiler:
+                with self.profiler.profile(str(test)):
+                    yield
+            else:
+                yield
+        finally:
+            self.data[str(test)]['tasks']['usage'][task_name] = usage.result()
+
+    @contextmanager
+    def _task_deadline(self, test: TestBase, task_name: str):
+        '''Cancel the task if it runs past its deadline.
+
+        The cancellation is cooperative: hardware waits check the cancellation
+        token of the task, and raise TaskCancelled once it is cancelled.
+        '''
+        deadline_s = test.task_deadline_s if test.task_deadline_s is not None \
+            else self.task_deadline_s
+        if deadline_s is None:
+            yield
+            return
+
+        token = CancellationToken(
+            deadline_s=deadline_s,
+            reason=f'Task {str(test)} - {task_name} exceeded its deadline of {deadline_s}s')
+        self.watchdog.watch(token)
+        try:
+            with token.activate():
+                yield
+        finally:
+            self.watchdog.unwatch(token)
+
+    def _on_task_deadline_expired(self, token: CancellationToken):
+        self.log(f'{token.reason}, cancelling it', color='red', level=LogLevel.WARNING)
 
     def _handle_failed_task(self, test: TestBase, task_name: str, exception: Exception):
         '''Run any side effects for a task failure, such as writing logs or sending emails'''
@@ -226,14 +512,94 @@ class TestRunner(TestRunnerBase):
                  level=LogLevel.DEBUG)
 
         for test in tests:
-            for task_name in self.known_tasks:
-                self._run_tasks(test, task_name)
+            if self._skip_if_prerequisite_failed(test):
+                continue
+
+            self._run_test_tasks(test)
 
 
 class TestRunnerParallel(TestRunnerBase):
-    '''Run a set of tests in parallel'''
+    '''Run a set of tests in parallel.
+
+    Tests are run concurrently by a pool of "jobs" worker threads, as long as
+    they do not use the same board resources (see `TestBase.resources`).
+    Tests are started in order, and never before an earlier test using the same
+    resources. The output of each test is written in one block once it completes.
+
+    A test waits for its prerequisites (see `TestBase.depends_on`) without
+    reserving its resources, and is skipped as soon as one of them fails.
+    '''
+
+    def __init__(self, board: Board = None, tests: Union[TestBase, Iterable[TestBase]] = None,
+                 email_on_fail: bool = None, continue_on_fail: bool = None, jobs: int = None):
+        super().__init__(board=board, tests=tests, email_on_fail=email_on_fail,
+                         continue_on_fail=continue_on_fail)
+        self.jobs = jobs if jobs is not None else DEFAULT_PARALLEL_JOBS
+
+        if self.jobs < 1:
+            raise ValueError(f'The number of jobs must be at least 1, but got {self.jobs}')
 
     def _run(self, tests: Iterable[TestBase]):
-        self.log('== TESTING MODE: PARALLEL ==', color='blue', bold=True,
+        self.log(f'== TESTING MODE: PARALLEL ({self.jobs} jobs) ==', color='blue', bold=True,
                  level=LogLevel.DEBUG)
-        self._run_tasks(tests, self.known_tasks)
+
+        pending = list(tests)
+        running: Dict[Future, TestBase] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while running or (pending and error is None):
+                if error is None:
+                    for test in [t for t in pending if self._skip_if_prerequisite_failed(t)]:
+                        pending.remove(test)
+
+                    for test in self._ready_tests(pending, list(running.values())):
+                        pending.remove(test)
+                        running[executor.submit(self._run_test, test)] = test
+
+                if not running:
+                    break
+
+                done, __ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    if error is None:
+                        error = future.exception()
+
+        if error is not None:
+            raise error
+
+    def _run_test(self, test: TestBase):
+        '''Run all tasks of a test, keeping its output together'''
+        with global_logger.group():
+            self._run_test_tasks(test)
+
+    def _ready_tests(self, pending: List[TestBase], running: List[TestBase]) -> List[TestBase]:
+        '''Return the pending tests which can start now, with their prerequisites
+        finished and without resource conflicts'''
+        ready = []
+        busy = [test.resources for test in running]
+        unfinished = {str(test) for test in pending + running}
+        for test in pending:
+            if len(running) + len(ready) >= self.jobs:
+                break
+
+            if any(str(p) in unfinished for p in self.prerequisites.get(str(test), [])):
+                continue
+
+            if not any(self.resources_conflict(test.resources, other) for other in busy):
+                ready.append(test)
+
+            # Pending tests also reserve their resources, to keep the test order
+            busy.append(test.resources)
+
+        return ready
+
+    @staticmethod
+    def resources_conflict(resources: Optional[List[str]],
+                           other_resources: Optional[List[str]]) -> bool:
+        '''Return whether two tests using these resources cannot run concurrently'''
+        if resources is None or other_resources is None:
+            return True
+
+        return bool(set(resources) & set(other_resources))
@@ -10,12 +10,14 @@ class deferred_function():
             self.f = copy(f.f)
             self.args = copy(f.args)
             self.kwargs = copy(f.kwargs)
+            self.next_run_f = f.next_run_f
         else:
             if not callable(f):
                 raise AttributeError("Function must be callable")
             self.f = f
             self.args = args
             self.kwargs = kwargs
+            self.next_run_f = None
 
     def __call__(self, *args, **kwargs):
         self.args = args
@@ -40,15 +42,32 @@ class deferred_function():
         return "{}({}{}{})".format(
             name, args_str, ', ' if args_str and kwargs_str else '', kwargs_str)
 
+    def next_run_function(self, f):
+        '''Decorator setting the function returning when this function will next
+        return True, as a datetime, or None if unknown. It takes the same arguments.'''
+        self.next_run_f = f
+        return f
+
     def run(self, TestController=None):
+        return self._call(self.f, TestController)
+
+    def next_run(self, TestController=None):
+        '''Return the next datetime at which the function will return True, or None
+        if unknown'''
+        if self.next_run_f is None:
+            return None
+
+        return self._call(self.next_run_f, TestController)
+
+    def _call(self, f, TestController=None):
         # Check if first argument to function is 'TestController'
-        expects_controller = next(iter(inspect.getargspec(self.f).args)) == 'TestController'
+        expects_controller = next(iter(inspect.getargspec(f).args)) == 'TestController'
 
         args = self.args or []
         if expects_controller:
             args = [TestController] + list(args)
 
         if self.kwargs:
-            return self.f(*args, **self.kwargs)
+            return f(*args, **self.kwargs)
         else:
-            return self.f(*args)
+            return f(*args)
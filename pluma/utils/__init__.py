@@ -3,7 +3,8 @@ from .email import Email, send_exception_email
 from .git import reset_repos, get_latest_tag, get_tag_list, \
     version_is_valid, filter_versions, compile_version_list
 from .helpers import run_host_cmd, timestamp_to_datetime, \
-    datetime_to_timestamp, regex_filter_list
+    datetime_to_timestamp, regex_filter_list, RegexFilter, json_dump_streamed, \
+    json_load, json_dump_atomic
 from .interactive import getch, seech
 from .asynchronous import AsyncSampler
 from .graphing import boot_graph
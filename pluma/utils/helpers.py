@@ -1,9 +1,12 @@
 import subprocess
+import os
 import re
 import inspect
+import json
+from functools import lru_cache
 from pathlib import PurePath
 from datetime import datetime
-from typing import Tuple, Optional, Type, Any
+from typing import IO, Dict, Iterable, Iterator, List, Pattern, Tuple, Optional, Type, Any
 
 ROOT_PROJECT_DIRECTORY = PurePath(__file__).parents[2]
 
@@ -51,6 +54,91 @@ def regex_filter_list(patterns, items, unique=None):
     return sorted(gen)
 
 
+@lru_cache(maxsize=1024)
+def compile_regex(pattern: str) -> Pattern:
+    '''Compile a regular expression, caching the compiled patterns'''
+    return re.compile(pattern)
+
+
+class RegexFilter:
+    '''
+    Filter matching items against any of the regular expressions @patterns,
+    as regex_filter_list does with @unique set. The filtered list is cached
+    for each set of items, so filtering the same items again is a lookup.
+    '''
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = [compile_regex(p) for p in patterns]
+        self._filtered: Dict[Tuple[str, ...], List[str]] = {}
+
+    def match(self, item: str) -> bool:
+        return any(p.match(item) for p in self.patterns)
+
+    def filter(self, items: Iterable[str]) -> List[str]:
+        items = tuple(items)
+        filtered = self._filtered.get(items)
+        if filtered is None:
+            filtered = sorted(set(i for i in items if self.match(i)))
+            self._filtered[items] = filtered
+
+        return filtered
+
+
+def json_dump_streamed(obj: Any, file: IO[str], indent: int = 4, level: int = 0):
+    '''
+    Write @obj to @file, as json.dump(obj, file, indent=indent) would.
+    Iterators in @obj, such as generators, are written as lists one item
+    at a time, without building them in memory.
+    '''
+    padding = ' ' * indent
+
+    if isinstance(obj, dict) and obj:
+        file.write('{')
+        for index, (key, value) in enumerate(obj.items()):
+            if not isinstance(key, str):
+                key = json.dumps(key)
+            file.write(f'{"," if index else ""}\n{padding * (level + 1)}{json.dumps(key)}: ')
+            json_dump_streamed(value, file, indent=indent, level=level + 1)
+        file.write(f'\n{padding * level}}}')
+    elif isinstance(obj, Iterator):
+        empty = True
+        for item in obj:
+            file.write(f'{"[" if empty else ","}\n{padding * (level + 1)}')
+            json_dump_streamed(item, file, indent=indent, level=level + 1)
+            empty = False
+        file.write('[]' if empty else f'\n{padding * level}]')
+    else:
+        file.write(json.dumps(obj, indent=indent).replace('\n', f'\n{padding * level}'))
+
+
+def json_load(file: str) -> Any:
+    '''
+    Return the content of the JSON file @file, or None if it is missing
+    or invalid.
+    '''
+    try:
+        with open(file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def json_dump_atomic(obj: Any, file: str, **kwargs):
+    '''
+    Write @obj to the JSON file @file, replacing it atomically, so that
+    readers never see a partial file. Missing directories are created, and
+    @kwargs are passed to json.dump.
+    '''
+    directory = os.path.dirname(file)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    temp_file = f'{file}.tmp'
+    with open(temp_file, 'w') as f:
+        json.dump(obj, f, **kwargs)
+    os.replace(temp_file, file)
+
+
 FileAndLine = Tuple[Optional[PurePath], Optional[int]]
 
 
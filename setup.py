@@ -49,6 +49,7 @@ requires = [
     'pyftdi',
     'pyroute2',
     'pandas',
+    'numpy',
     'pygal',
     'cairosvg',
     'graphviz',
@@ -37,7 +37,7 @@ def test_DeviceActionRegistry_create_should_register_class(mock_board):
 def test_LoginAction_should_call_login(mock_board):
     action = LoginAction(mock_board)
     action.execute()
-    mock_board.login.assert_called_once()
+    mock_board.login.assert_called_once_with(force=False)
 
 
 def test_WaitAction_should_wait(mock_board):
@@ -187,3 +187,32 @@ def test_TargetFactory_SoftPower_parameters_can_be_specified(mock_console):
     assert power.off_cmd == off_cmd
     assert power.reboot_cmd == reboot_cmd
     assert power.reboot_delay == reboot_delay
+
+
+def test_TargetConfig_create_context_should_create_all_boards(serial_config):
+    config = Configuration({
+        'system': {'prompt_regex': 'default'},
+        'boards': {
+            'board1': {'console': {'serial': serial_config}},
+            'board2': {'system': {'prompt_regex': 'override'}}
+        }
+    })
+
+    context = TargetConfig.create_context(config)
+
+    assert [board.name for board in context.boards] == ['board1', 'board2']
+    assert context.board is context.boards[0]
+    assert context.boards[0].get_console('serial') is not None
+    assert context.boards[0].system.prompt_regex == 'default'
+    assert context.boards[1].system.prompt_regex == 'override'
+
+
+def test_TargetConfig_create_context_should_error_on_unconsumed_board_attribute():
+    config = Configuration({
+        'boards': {
+            'board1': {'abc': 'value'}
+        }
+    })
+
+    with pytest.raises(TargetConfigError):
+        TargetConfig.create_context(config)
@@ -3,7 +3,9 @@ import pytest
 from pytest import fixture
 from unittest.mock import MagicMock
 
-from pluma.cli import TestsConfig, Configuration, TestsProvider, TestsConfigError
+from pluma.cli import TestsConfig, Configuration, TestsProvider, TestsConfigError, \
+    TestDefinition
+from pluma.test import TestBase
 
 MINIMAL_CONFIG = {
     'sequence': []
@@ -102,3 +104,59 @@ def test_TestsConfig_tests_from_action_should_return_all_tests():
 def test_TestsConfig_tests_from_action_should_error_if_action_unsupported():
     with pytest.raises(TestsConfigError):
         TestsConfig.tests_from_action('abc', {'some': 'settings'}, {'def': MockTestsProvider})
+
+
+class ParametersTest(TestBase):
+    def __init__(self, board, **parameters):
+        super().__init__(board)
+        self.parameters = parameters
+
+    def test_body(self):
+        pass
+
+
+def test_TestsConfig_create_tests_should_expand_parameter_sweeps():
+    definition = TestDefinition('ParametersTest', testclass=ParametersTest,
+                                test_provider=MockTestsProvider(), parameter_sets=[
+                                    {'fixed': 0, 'sweep': {'a': [1, 2], 'b': ['x', 'y']}},
+                                    {'fixed': 1}])
+
+    tests = TestsConfig.create_tests([definition], board=None)
+
+    assert [test.settings for test in tests] == [
+        {'fixed': 0, 'a': 1, 'b': 'x'}, {'fixed': 0, 'a': 1, 'b': 'y'},
+        {'fixed': 0, 'a': 2, 'b': 'x'}, {'fixed': 0, 'a': 2, 'b': 'y'},
+        {'fixed': 1}]
+
+
+def test_TestsConfig_create_tests_should_error_on_invalid_sweep():
+    definition = TestDefinition('ParametersTest', testclass=ParametersTest,
+                                test_provider=MockTestsProvider(),
+                                parameter_sets=[{'sweep': {'a': 1}}])
+
+    with pytest.raises(TestsConfigError):
+        TestsConfig.create_tests([definition], board=None)
+
+
+def test_TestsConfig_early_stopping_should_stop_after_iterations():
+    early_stopping = TestsConfig._early_stopping(
+        Configuration({'pass_rate_precision': 0.05, 'field': {
+            'test': 'MyTest', 'name': 'latency', 'precision': '0.5'}}), iterations=100)
+
+    assert early_stopping.max_iterations == 100
+    assert early_stopping.field == 'latency'
+    assert early_stopping.field_precision == 0.5
+
+
+def test_TestsConfig_early_stopping_should_error_on_invalid_settings():
+    with pytest.raises(TestsConfigError):
+        TestsConfig._early_stopping(Configuration({'confidence': 0.95}), iterations=100)
+
+    with pytest.raises(TestsConfigError):
+        TestsConfig._early_stopping(Configuration({'max_failures': 1, 'field': {
+            'name': 'latency', 'precision': 0.5}}), iterations=100)
+
+
+def test_TestsConfig_early_stopping_should_require_iterations():
+    with pytest.raises(TestsConfigError):
+        TestsConfig._early_stopping(Configuration({'max_failures': 1}), iterations=None)
@@ -1,6 +1,7 @@
 import os
 import pytest
 import json
+from unittest.mock import ANY
 
 from pluma.cli.plugins import load_plugin_modules
 from pluma import plugins
@@ -182,7 +183,8 @@ def test_cli_should_create_results_file_with_correct_testrunner_data(pluma_cli,
                     "test_body",
                     "teardown"
                 ],
-                "failed": {}
+                "failed": {},
+                "usage": ANY
             },
             "data": {
                 "x_square": 1.0,
@@ -236,3 +238,194 @@ def test_cli_should_create_results_file_with_correct_settings(pluma_cli,
     finally:
         if os.path.isfile(results_file):
             os.remove(results_file)
+
+
+def test_cli_should_run_tests_with_jobs_option(pluma_cli, pluma_config_file, temp_file):
+    load_plugin_modules(PLUGIN_DIR)
+
+    results_file = 'results-test.json'
+    config = pluma_config_file(
+        core_tests_params=[(
+            plugins.example_plugin.Maths, {'x': 1}
+        )],
+        settings={
+            'results': {
+                'file': results_file
+            }})
+
+    pluma_cli(['--config', config, '--target', temp_file(), '--jobs', '2'])
+
+    try:
+        with open(results_file, 'r') as f:
+            data = json.load(f)
+            assert len(data['results']) == 1
+            assert data['results'][0]['success']
+    finally:
+        if os.path.isfile(results_file):
+            os.remove(results_file)
+
+
+def test_cli_should_save_results_of_all_boards_in_farm_mode(pluma_cli, pluma_config_file,
+                                                            temp_file):
+    load_plugin_modules(PLUGIN_DIR)
+
+    results_file = 'results-test.json'
+    config = pluma_config_file(
+        core_tests_params=[(
+            plugins.example_plugin.Maths, {'x': 1}
+        )],
+        settings={
+            'iterations': 2,
+            'results': {
+                'file': results_file
+            }})
+    target = temp_file('''
+        boards:
+          board1: {}
+          board2: {}
+        ''')
+
+    pluma_cli(['--config', config, '--target', target])
+
+    try:
+        with open(results_file, 'r') as f:
+            data = json.load(f)
+            assert list(data['boards']) == ['board1', 'board2']
+            for board_results in data['boards'].values():
+                assert len(board_results['results']) == 2
+                assert PlumaOutputMatcher('example_plugin.maths.Maths',
+                                          [{'x': 1}]) == board_results['settings']
+    finally:
+        if os.path.isfile(results_file):
+            os.remove(results_file)
+
+
+def test_cli_should_merge_results_of_boards_sharing_iterations(pluma_cli, pluma_config_file,
+                                                              temp_file):
+    load_plugin_modules(PLUGIN_DIR)
+
+    results_file = 'results-test.json'
+    config = pluma_config_file(
+        core_tests_params=[(
+            plugins.example_plugin.Maths, {'x': 1}
+        )],
+        settings={
+            'iterations': 5,
+            'sharding': 'iterations',
+            'results': {
+                'file': results_file
+            }})
+    target = temp_file('''
+        boards:
+          board1: {}
+          board2: {}
+        ''')
+
+    pluma_cli(['--config', config, '--target', target])
+
+    try:
+        with open(results_file, 'r') as f:
+            data = json.load(f)
+            assert [r['iteration'] for r in data['results']] == list(range(5))
+            assert {r['board'] for r in data['results']} <= {'board1', 'board2'}
+            assert PlumaOutputMatcher('example_plugin.maths.Maths',
+                                      [{'x': 1}]) == data['settings']
+    finally:
+        if os.path.isfile(results_file):
+            os.remove(results_file)
+
+
+def test_cli_should_save_results_as_single_board_when_sharding_tests(pluma_cli,
+                                                                     pluma_config_file,
+                                                                     temp_file):
+    load_plugin_modules(PLUGIN_DIR)
+
+    results_file = 'results-test.json'
+    config = pluma_config_file(
+        core_tests_params=[(
+            plugins.example_plugin.Maths, {'x': 1}
+        )],
+        settings={
+            'sharding': 'tests',
+            'results': {
+                'file': results_file
+            }})
+    target = temp_file('''
+        boards:
+          board1: {}
+          board2: {}
+        ''')
+
+    pluma_cli(['--config', config, '--target', target])
+
+    try:
+        with open(results_file, 'r') as f:
+            data = json.load(f)
+            assert len(data['results']) == 1
+            tests_data = data['results'][0]['TestRunner'].values()
+            assert len(tests_data) == 1
+            assert all(test_data['board'] in ['board1', 'board2'] for test_data in tests_data)
+    finally:
+        if os.path.isfile(results_file):
+            os.remove(results_file)
+
+
+def test_cli_should_save_all_results_when_journaled(pluma_cli, pluma_config_file, temp_file):
+    load_plugin_modules(PLUGIN_DIR)
+
+    results_file = 'results-test.json'
+    journal_file = temp_file()
+    config = pluma_config_file(
+        core_tests_params=[(
+            plugins.example_plugin.Maths, {'x': 1}
+        )],
+        settings={
+            'iterations': 3,
+            'results': {
+                'file': results_file,
+                'journal': journal_file,
+                'iterations_in_memory': 1
+            }})
+
+    pluma_cli(['--config', config, '--target', TARGET_YAML])
+
+    try:
+        with open(results_file, 'r') as f:
+            data = json.load(f)
+            assert [r['iteration'] for r in data['results']] == [0, 1, 2]
+
+        with open(journal_file, 'r') as f:
+            assert [json.loads(line)['iteration'] for line in f] == [0, 1, 2]
+    finally:
+        if os.path.isfile(results_file):
+            os.remove(results_file)
+
+
+def test_cli_should_resume_run_from_results_journal(pluma_cli, pluma_config_file, temp_file):
+    load_plugin_modules(PLUGIN_DIR)
+
+    results_file = 'results-test.json'
+    journal_file = temp_file()
+
+    def config(iterations):
+        return pluma_config_file(
+            core_tests_params=[(
+                plugins.example_plugin.Maths, {'x': 1}
+            )],
+            settings={
+                'iterations': iterations,
+                'results': {
+                    'file': results_file,
+                    'journal': journal_file
+                }})
+
+    try:
+        pluma_cli(['--config', config(2), '--target', TARGET_YAML])
+        pluma_cli(['--config', config(4), '--target', TARGET_YAML, '--resume', journal_file])
+
+        with open(results_file, 'r') as f:
+            data = json.load(f)
+            assert [r['iteration'] for r in data['results']] == [0, 1, 2, 3]
+    finally:
+        if os.path.isfile(results_file):
+            os.remove(results_file)
@@ -2,7 +2,8 @@ import pytest
 from unittest.mock import MagicMock
 
 from pluma import Board
-from pluma.core.baseclasses import ConsoleBase
+from pluma.core.baseclasses import ConsoleBase, PowerBase
+from pluma.core.dataclasses import BoardState
 
 ssh_console = MagicMock(ConsoleBase)
 serial_console = MagicMock(ConsoleBase)
@@ -102,3 +103,81 @@ def test_Board_consoles_setter_should_error_on_invalid_type(consoles):
     board = Board(name='board')
     with pytest.raises(TypeError):
         board.consoles = consoles
+
+
+def probed_console(*states):
+    '''Console answering the state probes with "states", as (boot_id, user)'''
+    console = MagicMock(ConsoleBase)
+    console.send_and_expect.side_effect = [
+        ('', f'pluma-state={boot_id}:{user}\r\n' if boot_id is not None else None)
+        for boot_id, user in states]
+    return console
+
+
+def test_Board_login_should_skip_login_if_state_unchanged():
+    console = probed_console(('1234-abcd', 'root'), ('1234-abcd', 'root'))
+    board = Board(name='board', console=console)
+
+    board.login()
+    board.login()
+
+    console.login.assert_called_once()
+    assert board.state.boot_id == '1234-abcd'
+    assert board.state.user == 'root'
+
+
+def test_Board_login_should_login_if_board_rebooted():
+    console = probed_console(('1234-abcd', 'root'), ('5678-abcd', 'root'),
+                             ('5678-abcd', 'root'))
+    board = Board(name='board', console=console)
+
+    board.login()
+    board.login()
+
+    assert console.login.call_count == 2
+    assert board.state.boot_id == '5678-abcd'
+
+
+def test_Board_login_should_login_if_forced():
+    console = probed_console(('1234-abcd', 'root'), ('1234-abcd', 'root'))
+    board = Board(name='board', console=console)
+
+    board.login()
+    board.login(force=True)
+
+    assert console.login.call_count == 2
+
+
+def test_Board_reboot_should_skip_reboot_if_state_unchanged():
+    console = probed_console(('1234-abcd', 'root'), ('1234-abcd', 'root'))
+    board = Board(name='board', console=console, power=MagicMock(PowerBase))
+
+    board.login()
+
+    assert board.reboot() is False
+    board.power.reboot.assert_not_called()
+
+
+def test_Board_reboot_should_reboot_if_probe_fails_or_forced():
+    console = probed_console(('1234-abcd', 'root'), (None, None))
+    board = Board(name='board', console=console, power=MagicMock(PowerBase))
+
+    assert board.reboot() is True
+    board.login()
+    assert board.reboot() is True
+    assert board.state is None
+
+    board.state = BoardState(boot_id='1234-abcd', user='root', console='main')
+    assert board.reboot(force=True) is True
+    assert board.power.reboot.call_count == 3
+
+
+def test_Board_reboot_should_reboot_if_boot_id_unknown():
+    console = probed_console(('', 'root'), ('', 'root'))
+    board = Board(name='board', console=console, power=MagicMock(PowerBase))
+
+    board.login()
+
+    assert board.state is None
+    assert board.reboot() is True
+    board.power.reboot.assert_called_once()
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from pluma.core.baseclasses import CancellationToken, DeadlineWatchdog, TaskCancelled, \
+    check_cancelled, cancellable_sleep, cancellable_timeout, cancellable_input
+
+
+def test_CancellationToken_should_be_cancelled_after_deadline():
+    token = CancellationToken(deadline_s=0.05)
+    assert not token.cancelled
+
+    time.sleep(0.05)
+
+    assert token.cancelled
+    with pytest.raises(TaskCancelled):
+        token.check()
+
+
+def test_CancellationToken_sleep_should_stop_when_cancelled():
+    token = CancellationToken(reason='Stop')
+    threading.Timer(0.05, token.cancel).start()
+
+    start = time.monotonic()
+    with pytest.raises(TaskCancelled, match='Stop'):
+        token.sleep(10)
+    assert time.monotonic() - start < 5
+
+
+def test_CancellationToken_sleep_should_stop_at_deadline():
+    token = CancellationToken(deadline_s=0.1)
+
+    start = time.monotonic()
+    with pytest.raises(TaskCancelled):
+        token.sleep(10)
+    assert 0.1 <= time.monotonic() - start < 5
+
+
+def test_cancellable_functions_should_use_current_token():
+    check_cancelled()
+    cancellable_sleep(0)
+    assert cancellable_timeout(30) == 30
+
+    with CancellationToken(deadline_s=10).activate():
+        assert cancellable_timeout(30) <= 10
+        assert cancellable_timeout(5) == 5
+
+    with CancellationToken(deadline_s=0).activate():
+        with pytest.raises(TaskCancelled):
+            check_cancelled()
+
+    assert CancellationToken.current() is None
+
+
+def test_cancellable_input_should_return_lines_typed_ahead(monkeypatch):
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b'yes\nA comment\n')
+    with os.fdopen(read_fd) as stdin:
+        monkeypatch.setattr(sys, 'stdin', stdin)
+
+        with CancellationToken(deadline_s=1).activate():
+            assert cancellable_input() == 'yes'
+            assert cancellable_input() == 'A comment'
+            with pytest.raises(TaskCancelled):
+                cancellable_input()
+
+    os.close(write_fd)
+
+def test_DeadlineWatchdog_should_cancel_expired_tokens_only():
+    expired = []
+    watchdog = DeadlineWatchdog(on_expired=expired.append)
+    token = CancellationToken(deadline_s=0.05)
+    finished = CancellationToken(deadline_s=0.05)
+
+    watchdog.watch(token)
+    watchdog.watch(finished)
+    watchdog.unwatch(finished)
+    time.sleep(0.3)
+
+    assert expired == [token]
+    assert token._cancelled.is_set()
+    assert not finished._cancelled.is_set()
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock
 from utils import nonblocking
 
 from pluma.core.baseclasses import (ConsoleError, ConsoleInvalidJSONReceivedError,
-                                    MatchResult)
+                                    MatchResult, CancellationToken, TaskCancelled)
 from pluma.core.dataclasses import SystemContext
 
 
@@ -274,4 +274,13 @@ def test_ConsoleBase_should_call_open_for_send_control(basic_console):
     basic_console.open = MagicMock(side_effect=basic_console.open)
 
     basic_console.send_control('C')
-    basic_console.open.assert_called()
\ No newline at end of file
+    basic_console.open.assert_called()
+
+
+def test_ConsoleBase_wait_for_quiet_should_stop_at_task_deadline(basic_console):
+    start = time.time()
+    with CancellationToken(deadline_s=0.2).activate():
+        with pytest.raises(TaskCancelled):
+            basic_console.wait_for_quiet(quiet=10, sleep_time=0.05, timeout=10)
+
+    assert time.time() - start < 5
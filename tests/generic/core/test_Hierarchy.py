@@ -0,0 +1,68 @@
+from unittest.mock import Mock
+
+from pluma.core.baseclasses import HardwareBase
+from pluma.core.baseclasses.hierarchy import hier_property, hier_schema
+
+
+class Child(HardwareBase):
+    def __init__(self):
+        self.value = 1
+
+
+class Parent(HardwareBase):
+    constant = 'foo'
+
+    def __init__(self, side_effect: Mock):
+        self.child = Child()
+        self.side_effect = side_effect
+        self._private = 'hidden'
+
+    @property
+    def expensive(self):
+        return self.side_effect()
+
+    @property
+    @hier_property
+    def safe(self):
+        return 'bar'
+
+    def method(self):
+        pass
+
+
+def test_Hierarchy_get_hier_should_not_read_unmarked_properties():
+    side_effect = Mock(return_value='baz')
+    parent = Parent(side_effect)
+
+    __, attrs = parent._get_hier()
+
+    side_effect.assert_not_called()
+    assert 'expensive' not in attrs
+
+
+def test_Hierarchy_get_hier_should_return_children_and_attributes():
+    parent = Parent(Mock())
+
+    children, attrs = parent._get_hier()
+
+    assert children == {'child': parent.child}
+    assert attrs['safe'] == 'bar'
+    assert attrs['constant'] == 'foo'
+    assert 'side_effect' not in attrs
+    assert '_private' not in attrs
+    assert 'method' not in attrs
+
+
+def test_Hierarchy_schema_should_be_cached_per_class():
+    assert hier_schema(Parent) is hier_schema(Parent)
+    assert hier_schema(Parent) is not hier_schema(Child)
+
+
+def test_Hierarchy_show_hier_should_include_children():
+    parent = Parent(Mock())
+
+    hier = parent.show_hier()
+
+    assert 'Parent:' in hier
+    assert 'Child:' in hier
+    assert 'value: 1' in hier
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from pytest import fixture
+
+from pluma.core.baseclasses import Logger, LogMode, LogLevel, JsonLogSink
+
+
+@fixture
+def logger():
+    logger = Logger()
+    mode = logger.mode
+    hold_max_size = logger.hold_max_size
+    logger.mode = LogMode.DEBUG
+
+    yield logger
+
+    logger.release()
+    logger.mode = mode
+    logger.hold_max_size = hold_max_size
+
+
+def test_Logger_hold_should_buffer_output_until_release(logger, capsys):
+    logger.hold()
+    logger.log('Hello')
+    assert capsys.readouterr().out == ''
+
+    logger.release()
+    assert capsys.readouterr().out == f'Hello{os.linesep}{os.linesep}'
+
+
+def test_Logger_hold_should_not_buffer_bypass_hold_messages(logger, capsys):
+    logger.hold()
+    logger.log('Held')
+    logger.log('Bypass', bypass_hold=True)
+    assert capsys.readouterr().out == f'Bypass{os.linesep}'
+
+    logger.release()
+    assert capsys.readouterr().out == f'Held{os.linesep}{os.linesep}'
+
+
+def test_Logger_release_should_output_nothing_if_nothing_held(logger, capsys):
+    logger.hold()
+    logger.release()
+    assert capsys.readouterr().out == ''
+
+
+def test_Logger_hold_should_preserve_order_when_spilling_to_file(logger, capsys):
+    logger.hold_max_size = 10
+    messages = [f'message-{i}' for i in range(20)]
+
+    logger.hold()
+    for message in messages:
+        logger.log(message)
+
+    assert logger.log_buffer.spill_file is not None
+    assert capsys.readouterr().out == ''
+
+    logger.release()
+    expected = ''.join(f'{m}{os.linesep}' for m in messages) + os.linesep
+    assert capsys.readouterr().out == expected
+    assert not logger.log_buffer
+
+
+def test_Logger_group_should_buffer_all_output_until_exit(logger, capsys):
+    with logger.group():
+        logger.log('Status ', newline=False)
+        logger.hold()
+        logger.log('Held')
+        logger.log('PASS', bypass_hold=True)
+        logger.release()
+        assert capsys.readouterr().out == ''
+
+    assert capsys.readouterr().out == \
+        f'Status PASS{os.linesep}Held{os.linesep}{os.linesep}'
+
+
+def test_Logger_hold_should_be_per_thread(logger, capsys):
+    logger.hold()
+
+    thread = threading.Thread(target=logger.log, args=('From thread',))
+    thread.start()
+    thread.join()
+
+    assert capsys.readouterr().out == f'From thread{os.linesep}'
+
+
+def test_JsonLogSink_should_write_records_as_json_lines(temp_file):
+    log_file = temp_file()
+    sink = JsonLogSink(log_file)
+    sink.open()
+    sink.write(LogLevel.INFO, 'Hello', board='board', test='test', task='task')
+    sink.write(LogLevel.ERROR, 'World')
+    sink.close()
+
+    with open(log_file) as f:
+        records = [json.loads(line) for line in f]
+
+    assert [r['message'] for r in records] == ['Hello', 'World']
+    assert [r['level'] for r in records] == ['INFO', 'ERROR']
+    assert records[0]['board'] == 'board'
+    assert records[0]['test'] == 'test'
+    assert records[0]['task'] == 'task'
+    assert records[0]['monotonic'] <= records[1]['monotonic']
+
+
+def test_JsonLogSink_should_ignore_records_below_level(temp_file):
+    log_file = temp_file()
+    sink = JsonLogSink(log_file, level=LogLevel.WARNING)
+    sink.open()
+    sink.write(LogLevel.INFO, 'Hello')
+    sink.close()
+
+    with open(log_file) as f:
+        assert f.read() == ''
+
+
+def test_Logger_should_send_records_with_context_to_sinks(logger, temp_file):
+    log_file = temp_file()
+    sink = JsonLogSink(log_file)
+    logger.mode = LogMode.SILENT
+
+    logger.add_sink(sink)
+    try:
+        logger.set_context(board='board', test='test', task='task')
+        logger.error(['Hello', 'World'])
+    finally:
+        logger.context = {}
+        logger.remove_sink(sink)
+
+    with open(log_file) as f:
+        record = json.loads(f.readline())
+
+    assert record['message'] == f'Hello{os.linesep}World'
+    assert record['level'] == 'ERROR'
+    assert record['test'] == 'test'
@@ -120,6 +120,16 @@ def test_PexpectEngine_wait_for_match_should_match_only_once(pty_pair):
     assert match.regex_matched is None
 
 
+def test_PexpectEngine_wait_for_match_should_count_bytes_received_once(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abcdef')
+    assert engine.wait_for_match(match='not going to match', timeout=0.2).regex_matched is None
+    assert engine.wait_for_match(match='def', timeout=0.5).regex_matched
+
+    assert engine.bytes_received == len('abcdef')
+
 @pytest.mark.parametrize('timeout', [0.2, 1])
 def test_PexpectEngine_wait_for_match_should_return_after_timeout(pty_pair, timeout):
     engine = PexpectEngine()
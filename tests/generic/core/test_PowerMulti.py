@@ -1,5 +1,9 @@
+import time
+
+import pytest
+
 from pluma import PowerMulti
-from pluma.core.baseclasses import PowerBase
+from pluma.core.baseclasses import PowerBase, CancellationToken, TaskCancelled
 
 
 class MockPower(PowerBase):
@@ -119,3 +123,16 @@ def test_PowerMulti_calls_targets_reboot_methods():
     power.reboot()
 
     assert(all([mp.on_called == 1 and mp.off_called == 1 for mp in mock_powers]))
+
+
+def test_PowerMulti_sequence_should_stop_at_task_deadline():
+    mock_powers = [MockPower(), MockPower()]
+    power = PowerMulti(power_seq=[mock_powers[0], '10s', mock_powers[1]])
+
+    start = time.monotonic()
+    with CancellationToken(deadline_s=0.1).activate():
+        with pytest.raises(TaskCancelled):
+            power.on()
+
+    assert time.monotonic() - start < 5
+    assert [mp.on_called for mp in mock_powers] == [1, 0]
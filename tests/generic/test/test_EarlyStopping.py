@@ -0,0 +1,95 @@
+import pytest
+
+from pluma.test import EarlyStopping, wilson_interval
+
+
+def iteration_result(success=True, **data):
+    return {'success': success, 'TestRunner': {'MyTest': {'data': data}}}
+
+
+def test_wilson_interval_should_bound_proportion():
+    low, high = wilson_interval(50, 100, 1.96)
+
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    assert wilson_interval(10, 10, 1.96)[1] == 1.0
+    assert wilson_interval(0, 0, 1.96) == (0.0, 1.0)
+
+
+def test_EarlyStopping_should_stop_once_pass_rate_precise():
+    early_stopping = EarlyStopping(pass_rate_precision=0.05)
+
+    iterations = 0
+    while not early_stopping.should_stop():
+        early_stopping.add(iteration_result())
+        iterations += 1
+
+    # Half-width of the interval with no failure is about z^2 / 2n
+    assert 30 < iterations < 45
+    assert 'pass rate' in early_stopping.reason
+
+
+def test_EarlyStopping_should_wait_for_min_iterations():
+    early_stopping = EarlyStopping(pass_rate_precision=0.5, min_iterations=20)
+
+    for __ in range(19):
+        early_stopping.add(iteration_result())
+        assert not early_stopping.should_stop()
+
+    early_stopping.add(iteration_result())
+    assert early_stopping.should_stop()
+
+
+def test_EarlyStopping_should_stop_once_field_mean_precise():
+    early_stopping = EarlyStopping(test='MyTest', field='latency', field_precision=0.5,
+                                   min_iterations=2)
+
+    for value in [9, 11, 10, 'invalid']:
+        early_stopping.add(iteration_result(latency=value))
+    assert early_stopping.field_count == 3
+    assert not early_stopping.should_stop()
+
+    for __ in range(20):
+        early_stopping.add(iteration_result(latency=10))
+    assert early_stopping.should_stop()
+    assert early_stopping.field_interval()[0] < 10 < early_stopping.field_interval()[1]
+
+
+def test_EarlyStopping_should_stop_when_failure_rate_above_threshold():
+    early_stopping = EarlyStopping(max_failure_rate=0.1)
+
+    for __ in range(5):
+        early_stopping.add(iteration_result(success=False))
+    assert early_stopping.should_stop()
+    assert 'failure rate' in early_stopping.reason
+
+
+def test_EarlyStopping_should_not_stop_when_failure_rate_uncertain():
+    early_stopping = EarlyStopping(max_failure_rate=0.1)
+
+    early_stopping.add(iteration_result(success=False))
+    for __ in range(5):
+        early_stopping.add(iteration_result())
+    assert not early_stopping.should_stop()
+
+
+def test_EarlyStopping_should_stop_on_max_failures_and_iterations():
+    early_stopping = EarlyStopping(max_failures=2, max_iterations=5, pass_rate_precision=0.01)
+
+    early_stopping.add(iteration_result(success=False))
+    assert not early_stopping.should_stop()
+    early_stopping.add(iteration_result(success=False))
+    assert early_stopping.should_stop()
+
+    early_stopping = EarlyStopping(max_iterations=5, pass_rate_precision=0.01)
+    for __ in range(5):
+        early_stopping.add(iteration_result())
+    assert early_stopping.should_stop()
+
+
+def test_EarlyStopping_should_error_without_stop_criteria():
+    with pytest.raises(ValueError):
+        EarlyStopping()
+
+    with pytest.raises(ValueError):
+        EarlyStopping(field='latency', field_precision=1)
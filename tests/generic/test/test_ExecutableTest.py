@@ -22,6 +22,12 @@ def test_ExecutableTest_should_pass_with_local_file(mock_board):
         ExecutableTest(mock_board, executable_file=f.name, host_file=True)
 
 
+def test_ExecutableTest_should_only_be_cacheable_on_host(mock_board):
+    with tempfile.NamedTemporaryFile() as f:
+        assert ExecutableTest(mock_board, executable_file=f.name, run_on_host=True).cacheable
+        assert not ExecutableTest(mock_board, executable_file=f.name).cacheable
+
+
 def test_ExecutableTest_should_error_with_missing_local_file(mock_board):
     with pytest.raises(ValueError):
         ExecutableTest(mock_board, executable_file='some/random/file', host_file=True)
@@ -0,0 +1,108 @@
+import pytest
+
+from pluma.test import TestBase, TestRunner, GroupedTest, Fixture, FixtureManager, \
+    FixtureRegistry
+
+
+class CountingFixture(Fixture):
+    def __init__(self, scope=None):
+        super().__init__(scope=scope)
+        self.setups = 0
+        self.teardowns = []
+
+    def setup(self, board):
+        self.setups += 1
+        return f'value{self.setups}'
+
+    def teardown(self, board, value):
+        self.teardowns.append(value)
+
+
+class FixtureTest(TestBase):
+    def __init__(self, board=None, fixtures=None, log=None):
+        super().__init__(board)
+        self.fixtures = fixtures
+        self.log = log if log is not None else []
+
+    def test_body(self):
+        self.log.append((str(self), dict(self.fixture_values)))
+
+
+def test_FixtureManager_should_share_fixture_until_last_consumer(mock_board):
+    fixture = CountingFixture()
+    tests = [FixtureTest(mock_board, ['counted']) for __ in range(3)]
+    manager = FixtureManager({'counted': fixture}, board=mock_board)
+    manager.prepare(tests)
+
+    for test in tests:
+        manager.acquire(test)
+        assert test.fixture('counted') == 'value1'
+        assert fixture.teardowns == []
+        manager.release(test)
+
+    assert fixture.setups == 1
+    assert fixture.teardowns == ['value1']
+
+
+def test_FixtureManager_should_set_up_group_fixture_for_each_group(mock_board):
+    fixture = CountingFixture(scope='group')
+    groups = [GroupedTest(mock_board, tests=[FixtureTest(mock_board, ['counted'])
+                                             for __ in range(2)])
+              for __ in range(2)]
+    manager = FixtureManager({'counted': fixture}, board=mock_board)
+    manager.prepare(groups)
+
+    with manager.activate():
+        for group in groups:
+            group.test_body()
+
+    assert [test.fixture('counted') for group in groups for test in group.test_group.tests] \
+        == ['value1', 'value1', 'value2', 'value2']
+    assert fixture.teardowns == ['value1', 'value2']
+
+
+def test_FixtureManager_should_error_on_unknown_fixture(mock_board):
+    with pytest.raises(ValueError):
+        FixtureManager(board=mock_board).acquire(FixtureTest(mock_board, ['unknown']))
+
+
+def test_FixtureRegistry_should_create_registered_fixture():
+    assert FixtureRegistry.create('booted_board').scope == 'board'
+    assert FixtureRegistry.create('booted_board', {'scope': 'run'}).scope == 'run'
+
+    with pytest.raises(ValueError):
+        FixtureRegistry.create('booted_board', {'scope': 'unknown'})
+    with pytest.raises(ValueError):
+        FixtureRegistry.create('deployed_bundle')
+
+
+def test_TestRunner_should_set_up_fixtures_once_for_all_tests(mock_board):
+    fixture = CountingFixture()
+    log = []
+    tests = [FixtureTest(mock_board, ['counted'], log), FixtureTest(mock_board, None, log),
+             FixtureTest(mock_board, ['counted'], log)]
+    runner = TestRunner(board=mock_board, tests=tests)
+    runner.fixtures = {'counted': fixture}
+
+    assert runner.run() is True
+    assert runner.run() is True
+
+    assert [values for __, values in log] == [{'counted': 'value1'}, {},
+                                              {'counted': 'value1'},
+                                              {'counted': 'value2'}, {},
+                                              {'counted': 'value2'}]
+    assert fixture.teardowns == ['value1', 'value2']
+
+
+def test_TestRunner_should_fail_test_if_fixture_setup_fails(mock_board):
+    class FailingFixture(Fixture):
+        def setup(self, board):
+            raise RuntimeError('Boot failed')
+
+    test = FixtureTest(mock_board, ['failing'])
+    runner = TestRunner(board=mock_board, tests=test, continue_on_fail=True)
+    runner.fixtures = {'failing': FailingFixture()}
+
+    assert runner.run() is False
+    assert runner.data[str(test)]['tasks']['ran'] == []
+    assert 'Boot failed' in runner.data[str(test)]['tasks']['failed']['fixtures']
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+from pluma.test import Profiler
+from pluma.test import profiling
+
+
+def busy_wait(duration: float):
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        pass
+
+
+def profiled_functions(profiler: Profiler, name: str) -> list:
+    return [function for __, __, function in profiler.stats[name].stats]
+
+
+def test_Profiler_should_merge_stats_of_same_name():
+    profiler = Profiler()
+
+    for __ in range(2):
+        with profiler.profile('test'):
+            busy_wait(0.01)
+    profiler.stop()
+
+    assert list(profiler.stats) == ['test']
+    assert profiler.stats['test'].total_tt >= 0.02
+
+
+def test_Profiler_should_pause_outer_scope_in_nested_scope():
+    def outer_work():
+        busy_wait(0.01)
+
+    def inner_work():
+        busy_wait(0.01)
+
+    profiler = Profiler()
+    with profiler.profile('outer'):
+        outer_work()
+        with profiler.profile('inner'):
+            inner_work()
+    profiler.stop()
+
+    assert 'outer_work' in profiled_functions(profiler, 'outer')
+    assert 'inner_work' not in profiled_functions(profiler, 'outer')
+    assert 'inner_work' in profiled_functions(profiler, 'inner')
+
+
+def test_Profiler_should_profile_threads_independently():
+    profiler = Profiler(sample_interval_s=0.001)
+
+    def run(name):
+        with profiler.profile(name):
+            busy_wait(0.01)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profiler.stop()
+
+    assert sorted(set(profiler.stats) | set(profiler.stacks)) == ['a', 'b']
+
+
+def test_Profiler_should_only_sample_concurrent_scopes_if_cprofile_process_wide(monkeypatch):
+    monkeypatch.setattr(profiling, 'CPROFILE_PROCESS_WIDE', True)
+    profiler = Profiler(sample_interval_s=0.001)
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def run(name):
+        try:
+            with profiler.profile(name):
+                barrier.wait()
+                busy_wait(0.05)
+                barrier.wait()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profiler.stop()
+
+    assert errors == []
+    assert len(profiler.stats) == 1
+    assert sorted(profiler.stacks) == ['a', 'b']
+
+    with profiler.profile('c'):
+        busy_wait(0.01)
+    assert 'c' in profiler.stats
+
+
+def test_Profiler_should_sample_collapsed_stacks():
+    def sampled_work():
+        busy_wait(0.1)
+
+    profiler = Profiler(sample_interval_s=0.001)
+    with profiler.profile('test'):
+        sampled_work()
+    profiler.stop()
+
+    stacks = profiler.stacks['test']
+    assert sum(stacks.values()) > 0
+    assert any('sampled_work' in stack.split(';')[-2] for stack in stacks)
+
+
+def test_Profiler_write_should_save_profiles_and_hotspots(tmp_path):
+    profiler = Profiler(sample_interval_s=0.001)
+    for name in ('my.Test', 'TestController'):
+        with profiler.profile(name):
+            busy_wait(0.05)
+
+    files = profiler.write(str(tmp_path))
+
+    assert sorted(os.path.basename(f) for f in files) == [
+        'TestController.collapsed', 'TestController.pstats', 'hotspots.txt',
+        'my.Test.collapsed', 'my.Test.pstats']
+    with open(tmp_path / 'hotspots.txt') as f:
+        hotspots = f.read()
+    assert '==== All scopes ====' in hotspots
+    assert 'busy_wait' in hotspots
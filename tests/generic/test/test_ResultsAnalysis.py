@@ -0,0 +1,90 @@
+import json
+import random
+
+from pytest import approx
+
+from pluma.test.resultsanalysis import ResultsAnalyser, load_results_files
+from pluma.test.resultsprocessor import StreamingStatistics
+
+
+def create_results(test_values, settings=None):
+    return {
+        'results': [
+            {'TestRunner': {test_name: {'data': data, 'settings': settings or {}}
+                            for test_name, data in iteration.items()}}
+            for iteration in test_values
+        ]
+    }
+
+
+def streaming_summary(values):
+    statistics = StreamingStatistics()
+    for value in values:
+        statistics.update(value)
+
+    return statistics.summary()
+
+
+def test_ResultsAnalyser_should_match_DefaultResultsProcessor_statistics():
+    random.seed(0)
+    values = [random.choice([random.randint(0, 20), round(random.random() * 20, 3)])
+              for __ in range(501)]
+
+    analyser = ResultsAnalyser()
+    analyser.add_results(create_results([{'test': {'field': v}} for v in values]))
+    statistics = analyser.analyse()['tests']['test']['field']
+
+    expected = streaming_summary(values)
+    for key in ['min', 'max', 'mode']:
+        assert statistics[key] == expected[key]
+    for key in ['mean', 'median', 'stdev', 'variance']:
+        assert statistics[key] == approx(expected[key])
+    assert statistics['chunked_mean'] == approx(expected['chunked_mean'])
+
+
+def test_ResultsAnalyser_should_return_first_most_common_value_as_mode():
+    analyser = ResultsAnalyser()
+    analyser.add_results(create_results([{'test': {'field': v}} for v in [3, 2, 2, 3, 1]]))
+    statistics = analyser.analyse()['tests']['test']['field']
+
+    assert statistics['mode'] == 3
+    assert statistics['count'] == {'1': 1, '2': 2, '3': 2}
+
+
+def test_ResultsAnalyser_should_compute_percentiles_and_rolling_statistics():
+    analyser = ResultsAnalyser(percentiles=[50, 90], rolling_window=5)
+    analyser.add_results(create_results([{'test': {'field': v}} for v in range(101)]))
+    statistics = analyser.analyse()['tests']['test']['field']
+
+    assert statistics['percentiles'] == {'p50': 50, 'p90': 90}
+    assert statistics['rolling'] == {
+        'window': 5, 'min_mean': 2, 'max_mean': 98, 'last_mean': 98,
+        'max_stdev': approx(1.41), 'last_stdev': approx(1.41)
+    }
+
+
+def test_ResultsAnalyser_should_only_count_non_numerical_values():
+    analyser = ResultsAnalyser()
+    analyser.add_results(create_results([{'test': {'field': v}} for v in ['a', 'b', 'a']]))
+
+    assert analyser.analyse()['tests']['test']['field'] == {'count': {'a': 2, 'b': 1}}
+
+
+def test_ResultsAnalyser_should_group_fields_by_setting():
+    analyser = ResultsAnalyser(group_by=['size'])
+    analyser.add_results(create_results([{'test': {'field': v}} for v in [1, 3]],
+                                        settings={'size': 10}))
+    analyser.add_results(create_results([{'other': {'field': v}} for v in [5, 7]],
+                                        settings={'size': 20}))
+    groups = analyser.analyse()['groups']['size']
+
+    assert groups['10']['field']['mean'] == 2
+    assert groups['20']['field']['mean'] == 6
+
+
+def test_load_results_files_should_yield_results_of_each_board(temp_file):
+    results = create_results([{'test': {'field': 1}}])
+    single_file = temp_file(json.dumps(results))
+    farm_file = temp_file(json.dumps({'boards': {'a': results, 'b': results}}))
+
+    assert list(load_results_files([single_file, farm_file])) == [results] * 3
@@ -0,0 +1,42 @@
+from pluma.test import ResultsJournal
+
+
+def test_ResultsJournal_should_read_appended_results(temp_file):
+    journal = ResultsJournal(temp_file())
+    journal.append({'iteration': 0})
+    journal.append({'iteration': 1})
+
+    assert list(journal.read()) == [{'iteration': 0}, {'iteration': 1}]
+    assert len(journal) == 2
+
+    journal.close()
+    assert list(journal.read()) == [{'iteration': 0}, {'iteration': 1}]
+
+
+def test_ResultsJournal_should_replace_existing_file_unless_resuming(temp_file):
+    journal_file = temp_file('{"iteration": 0}\n')
+
+    journal = ResultsJournal(journal_file)
+    journal.append({'iteration': 1})
+    journal.close()
+
+    assert list(ResultsJournal(journal_file).read()) == [{'iteration': 1}]
+
+    journal = ResultsJournal(journal_file, resume=True)
+    journal.append({'iteration': 2})
+    journal.close()
+
+    assert list(journal.read()) == [{'iteration': 1}, {'iteration': 2}]
+
+
+def test_ResultsJournal_should_ignore_incomplete_last_line(temp_file):
+    journal_file = temp_file('{"iteration": 0}\n{"itera')
+
+    journal = ResultsJournal(journal_file, resume=True)
+    assert list(journal.read()) == [{'iteration': 0}]
+    assert len(journal) == 1
+
+    journal.append({'iteration': 1})
+    journal.close()
+
+    assert list(journal.read()) == [{'iteration': 0}, {'iteration': 1}]
@@ -0,0 +1,115 @@
+import os
+from unittest.mock import patch
+
+import pygal
+import pytest
+
+from pluma.test.resultsplotter import DefaultResultsPlotter, downsample_lttb, \
+    downsample_minmax
+
+
+def create_results(values):
+    return [{'test': {'field': v}} for v in values]
+
+
+def test_downsample_lttb_should_keep_first_and_last_points():
+    points = [(i, (i * 7) % 13) for i in range(1000)]
+
+    downsampled = downsample_lttb(points, 50)
+
+    assert len(downsampled) == 50
+    assert downsampled[0] == points[0]
+    assert downsampled[-1] == points[-1]
+    assert downsampled == sorted(downsampled)
+
+
+def test_downsample_lttb_should_keep_peaks():
+    points = [(i, 100 if i == 517 else 0) for i in range(1000)]
+
+    assert (517, 100) in downsample_lttb(points, 20)
+
+
+def test_downsample_minmax_should_keep_extremes_of_each_bucket():
+    points = [(i, v) for i, v in enumerate([1, 5, 3, 2, 9, 0, 4, 4])]
+
+    assert downsample_minmax(points, 4) == [(0, 1), (1, 5), (4, 9), (5, 0)]
+
+
+def test_downsample_should_not_change_short_series():
+    points = [(0, 1), (1, 2)]
+
+    assert downsample_lttb(points, 10) == points
+    assert downsample_minmax(points, 10) == points
+
+
+def test_DefaultResultsPlotter_should_error_on_unknown_downsampling():
+    with pytest.raises(AttributeError):
+        DefaultResultsPlotter(downsample='average')
+
+
+def test_DefaultResultsPlotter_should_downsample_series():
+    plotter = DefaultResultsPlotter(downsample='lttb', max_points=100)
+
+    chart_args, _ = plotter.prepare_chart('graph.svg', create_results(range(10000)))
+
+    series = chart_args[1]
+    assert len(series['test: field']) == 100
+
+
+def test_DefaultResultsPlotter_should_not_render_unchanged_chart(temp_file):
+    file = temp_file()
+    plotter = DefaultResultsPlotter()
+
+    with patch('pluma.test.resultsplotter.render_chart') as render_chart:
+        assert plotter.plot(file, create_results([1, 2, 3])) is True
+        assert plotter.plot(file, create_results([1, 2, 3])) is False
+        assert plotter.plot(file, create_results([1, 2, 4])) is True
+
+    assert render_chart.call_count == 2
+
+
+def test_DefaultResultsPlotter_should_render_chart_again_if_file_removed(temp_file):
+    file = temp_file()
+    plotter = DefaultResultsPlotter()
+    plotter.plot(file, create_results([1, 2, 3]))
+
+    os.remove(file)
+
+    assert plotter.plot(file, create_results([1, 2, 3])) is True
+    assert os.path.isfile(file)
+
+
+def test_DefaultResultsPlotter_plot_many_should_render_all_charts(temp_file):
+    files = [temp_file() for __ in range(3)]
+    for file in files:
+        os.remove(file)
+
+    DefaultResultsPlotter(max_workers=2).plot_many(
+        [{'file': file, 'results': create_results([1, i, 3])} for i, file in enumerate(files)])
+
+    assert all(os.path.getsize(file) > 0 for file in files)
+
+
+def test_DefaultResultsPlotter_should_render_chart_with_function_in_config(temp_file):
+    file = temp_file()
+    config = pygal.Config(value_formatter=lambda value: f'{value} ms')
+    plotter = DefaultResultsPlotter()
+
+    assert plotter.plot(file, create_results([1, 2, 3]), config=config) is True
+    assert plotter.plot(file, create_results([1, 2, 3]), config=config) is True
+    assert os.path.getsize(file) > 0
+
+
+def test_DefaultResultsPlotter_plot_many_should_render_charts_with_function_in_config(temp_file):
+    files = [temp_file() for __ in range(3)]
+    for file in files:
+        os.remove(file)
+
+    def formatter(value):
+        return f'{value} ms'
+
+    DefaultResultsPlotter(max_workers=2).plot_many(
+        [{'file': file, 'results': create_results([1, i, 3]),
+          'config': pygal.Config(value_formatter=formatter)} for i, file in enumerate(files)])
+
+    assert all(os.path.getsize(file) > 0 for file in files)
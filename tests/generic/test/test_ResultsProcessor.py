@@ -0,0 +1,115 @@
+import random
+from statistics import mean, median_grouped, stdev, variance
+from unittest.mock import Mock
+
+from pytest import approx
+
+from pluma.test.resultsprocessor import DefaultResultsProcessor, StreamingStatistics
+
+
+def create_statistics(values):
+    statistics = StreamingStatistics()
+    for value in values:
+        statistics.update(value)
+
+    return statistics
+
+
+def test_StreamingStatistics_should_match_statistics_module():
+    random.seed(0)
+    values = [random.choice([random.randint(0, 20), random.random() * 20])
+              for __ in range(501)]
+
+    summary = create_statistics(values).summary()
+
+    assert summary['min'] == min(values)
+    assert summary['max'] == max(values)
+    assert summary['mean'] == approx(round(mean(values), 2))
+    assert summary['median'] == approx(round(median_grouped(values), 2))
+    assert summary['stdev'] == approx(round(stdev(values), 2))
+    assert summary['variance'] == approx(round(variance(values), 2))
+
+
+def test_StreamingStatistics_should_compute_median_grouped_with_repeated_values():
+    for values in ([1, 2, 2, 3], [3, 3, 3, 1, 5], [1, 1], [5, 4, 3, 2, 1, 1, 2, 3, 4, 5]):
+        summary = create_statistics(values).summary()
+        assert summary['median'] == approx(round(median_grouped(values), 2))
+
+
+def test_StreamingStatistics_should_return_first_most_common_value_as_mode():
+    summary = create_statistics([1, 2, 2, 1, 3]).summary()
+
+    assert summary['mode'] == 1
+    assert summary['count'] == {'1': 2, '2': 2, '3': 1}
+
+
+def test_StreamingStatistics_should_compute_chunked_mean():
+    summary = create_statistics(list(range(25))).summary()
+
+    # Chunks of round(25 / 10) = 2 values, limited to 10 chunks
+    assert summary['chunked_mean'] == [0.5, 2.5, 4.5, 6.5, 8.5, 10.5, 12.5, 14.5, 16.5, 18.5]
+
+
+def test_StreamingStatistics_should_only_compute_chunked_mean_with_booleans():
+    summary = create_statistics([True, False, 1, True]).summary()
+
+    assert 'mean' not in summary
+    assert summary['chunked_mean'] == [1.0, 0.0, 1.0, 1.0]
+
+
+def test_StreamingStatistics_should_only_count_non_numerical_values():
+    summary = create_statistics([1, 'foo', 2]).summary()
+
+    assert summary == {'count': {'1': 1, 'foo': 1, '2': 1}}
+
+
+def test_StreamingStatistics_should_not_compute_statistics_for_single_value():
+    assert create_statistics([1]).summary() == {'count': {'1': 1}}
+
+
+def test_DefaultResultsProcessor_should_summarise_tests_with_data():
+    test_with_data = Mock(data={'value': 2}, __str__=Mock(return_value='with_data'))
+    test_without_data = Mock(data={}, __str__=Mock(return_value='without_data'))
+    results = [{'TestRunner': {'with_data': {'data': {'value': value}},
+                               'without_data': {'data': {'value': value}}}}
+               for value in (1, 2, 3)]
+
+    summary = DefaultResultsProcessor().generate_summary(
+        [test_with_data, test_without_data], results)
+
+    assert list(summary) == ['with_data']
+    assert summary['with_data']['value']['mean'] == 2
+    assert summary['with_data']['value']['count'] == {'1': 1, '2': 1, '3': 1}
+
+
+def test_DefaultResultsProcessor_summary_builder_should_match_generate_summary():
+    test = Mock(data={'value': 1}, __str__=Mock(return_value='test'))
+    results = [{'TestRunner': {'test': {'data': {'value': value}}}}
+               for value in (4, 8, 15, 16, 23, 42)]
+    processor = DefaultResultsProcessor()
+
+    builder = processor.summary_builder()
+    for result in results:
+        builder.add(result)
+
+    assert builder.summary([test]) == processor.generate_summary([test], results)
+
+
+def test_DefaultResultsProcessor_summary_builder_should_summarise_task_usage():
+    test = Mock(data={}, __str__=Mock(return_value='test'))
+    results = [{'TestRunner': {'test': {'data': {}, 'tasks': {'usage': {
+        'test_body': {'wall_time_s': wall_time, 'console_bytes_sent': 10}}}}}}
+        for wall_time in (1.5, 2.5, 5.0)]
+
+    builder = DefaultResultsProcessor().summary_builder()
+    for result in results:
+        builder.add(result)
+
+    assert builder.tasks_summary([test]) == {
+        'test': {
+            'test_body': {
+                'wall_time_s': {'total': 9.0, 'mean': 3.0, 'max': 5.0},
+                'console_bytes_sent': {'total': 30, 'mean': 10.0, 'max': 10}
+            }
+        }
+    }
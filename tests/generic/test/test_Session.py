@@ -1,20 +1,23 @@
 from unittest.mock import Mock
 
-from pluma.test import Session
+from pluma.test import Session, TestRunner
 from pluma.core.baseclasses import PowerBase
 
 
-def test_Session_setup_reboots_device(mock_board):
+def test_Session_should_reboot_device_once_for_all_sessions(mock_board):
     mock_board.power = Mock(PowerBase)
-    session = Session(mock_board)
-    session.setup()
+    sessions = [Session(mock_board), Session(mock_board)]
 
-    mock_board.power.reboot.assert_called_once()
+    assert TestRunner(board=mock_board, tests=sessions).run() is True
 
+    mock_board.reboot.assert_called_once_with(force=False)
 
-def test_Session_teardown_powers_off_device(mock_board):
+
+def test_Session_should_power_off_device_after_last_session(mock_board):
     mock_board.power = Mock(PowerBase)
-    session = Session(mock_board)
-    session.teardown()
+    sessions = [Session(mock_board), Session(mock_board)]
+
+    TestRunner(board=mock_board, tests=sessions).run()
 
     mock_board.power.off.assert_called_once()
+    assert mock_board.power.method_calls[-1][0] == 'off'
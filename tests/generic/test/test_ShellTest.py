@@ -0,0 +1,23 @@
+import os
+
+from pluma.test import ShellTest, TestResultCache
+
+
+def test_ShellTest_should_only_be_cacheable_on_host_with_cache_files(mock_board):
+    assert not ShellTest(mock_board, script='true', run_on_host=True).cacheable
+    assert not ShellTest(mock_board, script='true', cache_files=['check.sh']).cacheable
+    assert ShellTest(mock_board, script='true', run_on_host=True,
+                     cache_files=['check.sh']).cacheable
+
+
+def test_ShellTest_cache_key_should_depend_on_cache_files(mock_board, tmp_path):
+    script = tmp_path / 'check.sh'
+    script.write_text('exit 0')
+    test = ShellTest(mock_board, script=f'sh {script}', run_on_host=True,
+                     cache_files=[str(script)])
+    cache = TestResultCache(str(tmp_path / 'cache.json'))
+
+    assert test.cache_files() == [os.path.abspath(script)]
+    key = cache.key(test)
+    script.write_text('exit 1')
+    assert cache.key(test) != key
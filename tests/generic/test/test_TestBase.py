@@ -34,3 +34,14 @@ def test_TestBase_same_name_parameter_should_still_generate_unique_name():
     test1 = DummyTest(test_name=name)
     test2 = DummyTest(test_name=name)
     assert str(test1) != str(test2)
+
+
+def test_TestBase_matches_name_should_accept_class_and_instance_names():
+    test = DummyTest(test_name='login')
+
+    assert test.matches_name(test.base_name)
+    assert test.matches_name('DummyTest')
+    assert test.matches_name(f'{DummyTest.__module__}.DummyTest')
+    assert test.matches_name('login')
+    assert not test.matches_name('Test')
+    assert not test.matches_name('log')
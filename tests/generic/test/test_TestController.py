@@ -0,0 +1,263 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from pluma.test import TestBase, TestController, TestRunner, ResultsJournal, deferred_function, \
+    EarlyStopping
+from pluma.test.stock import deffuncs
+from pluma.test.stock.deffuncs import sc_run_n_iterations, sc_run_daily_at_hour, \
+    sc_run_until_confident
+
+
+class DataTest(TestBase):
+    def __init__(self, board=None):
+        super().__init__(board)
+        self.settings = {'setting': [1, 2]}
+        self.values = []
+
+    def test_body(self):
+        # Reuse the same object between iterations
+        self.values.append(len(self.values))
+        self.save_data(values=self.values)
+
+
+def create_controller(iterations):
+    test = DataTest()
+    controller = TestController(TestRunner(tests=test), email_on_except=False,
+                                log_func=lambda message: None)
+    controller.run_condition = sc_run_n_iterations(ntimes=iterations)
+
+    return controller, str(test)
+
+
+def test_TestController_should_save_results_of_each_iteration():
+    controller, test_name = create_controller(3)
+
+    assert controller.run() is True
+
+    assert [r['iteration'] for r in controller.results] == [0, 1, 2]
+    assert [r['TestRunner'][test_name]['data']['values'] for r in controller.results] == \
+        [[0], [0, 1], [0, 1, 2]]
+
+
+def test_TestController_should_share_test_settings_between_iteration_results():
+    controller, test_name = create_controller(3)
+
+    controller.run()
+
+    settings = [r['TestRunner'][test_name]['settings'] for r in controller.results]
+    assert settings[0] == {'setting': [1, 2]}
+    assert all(s is settings[0] for s in settings)
+    assert settings[0] is not controller.testrunner.tests[0].settings
+
+
+def test_TestController_should_only_build_results_summary_when_read(monkeypatch):
+    controller, test_name = create_controller(3)
+    builder = controller.results_processor.summary_builder()
+    summary_calls = []
+    monkeypatch.setattr(builder, 'summary',
+                        lambda tests: summary_calls.append(tests) or {'iterations': 3})
+    monkeypatch.setattr(controller.results_processor, 'summary_builder', lambda: builder)
+
+    controller.run()
+    assert summary_calls == []
+
+    assert controller.results_summary == {'iterations': 3}
+    assert controller.results_summary == {'iterations': 3}
+    assert len(summary_calls) == 1
+
+def test_TestController_should_keep_latest_results_in_memory_with_journal(temp_file):
+    test = DataTest()
+    controller = TestController(TestRunner(tests=test), email_on_except=False,
+                                log_func=lambda message: None,
+                                results_journal=ResultsJournal(temp_file()),
+                                results_in_memory=2)
+    controller.run_condition = sc_run_n_iterations(ntimes=5)
+
+    controller.run()
+
+    assert [r['iteration'] for r in controller.results] == [3, 4]
+    assert [r['iteration'] for r in controller.all_results()] == [0, 1, 2, 3, 4]
+    assert [d[str(test)]['values'] for d in controller.get_test_data()] == \
+        [[0], [0, 1], [0, 1, 2], [0, 1, 2, 3], [0, 1, 2, 3, 4]]
+    assert controller.get_test_data_summary() == controller.results_summary
+
+
+def create_journaled_controller(journal_file, iterations, resume=False):
+    controller = TestController(TestRunner(tests=DataTest()), email_on_except=False,
+                                log_func=lambda message: None,
+                                results_journal=ResultsJournal(journal_file, resume=resume),
+                                checkpoint_file=f'{journal_file}.checkpoint')
+    controller.run_condition = sc_run_n_iterations(ntimes=iterations)
+
+    return controller
+
+
+def test_TestController_should_resume_from_journal_and_checkpoint(temp_file):
+    journal_file = temp_file()
+    create_journaled_controller(journal_file, 3).run()
+
+    controller = create_journaled_controller(journal_file, 5, resume=True)
+    controller.resume()
+    assert controller.stats['num_iterations_run'] == 3
+
+    controller.run()
+
+    assert [r['iteration'] for r in controller.all_results()] == [0, 1, 2, 3, 4]
+    assert controller.stats['num_iterations_run'] == 5
+    assert controller.stats['num_iterations_pass'] == 5
+    assert controller.stats['num_tests_total'] == 5
+
+
+def test_TestController_should_resume_from_journal_without_checkpoint(temp_file):
+    journal_file = temp_file()
+    create_journaled_controller(journal_file, 2).run()
+    os.remove(f'{journal_file}.checkpoint')
+
+    controller = create_journaled_controller(journal_file, 3, resume=True)
+    controller.resume()
+
+    assert controller.stats['num_iterations_run'] == 2
+    assert controller.stats['num_tests_pass'] == 2
+    assert controller.results_summary == controller.get_test_data_summary()
+
+
+class CsvTest(TestBase):
+    def test_body(self):
+        self.save_data(value=1.5, text='a,b\nc', missing=None)
+
+
+def create_csv_controller():
+    test = CsvTest()
+    controller = TestController(TestRunner(tests=test), email_on_except=False,
+                                log_func=lambda message: None)
+    controller.run_condition = sc_run_n_iterations(ntimes=2)
+    controller.run()
+
+    return controller, str(test)
+
+
+def test_TestController_get_test_data_should_return_csv():
+    controller, test_name = create_csv_controller()
+
+    assert controller.get_test_data(output_format='csv') == (
+        'iteration,test_name,missing,text,value\n'
+        f'0,{test_name},None,"a,b c",1.5\n'
+        f'1,{test_name},None,"a,b c",1.5\n')
+
+
+def test_TestController_get_test_data_should_use_csv_header_if_provided():
+    controller, test_name = create_csv_controller()
+
+    assert controller.get_test_data(output_format='csv', header=['value', 'other']) == (
+        'iteration,test_name,value,other\n'
+        f'0,{test_name},1.5,\n'
+        f'1,{test_name},1.5,\n')
+
+
+def test_TestController_get_test_data_should_return_empty_csv_without_data():
+    controller, __ = create_csv_controller()
+
+    assert controller.get_test_data(test_names='NoSuchTest', output_format='csv') == ''
+
+
+def test_TestController_write_test_data_should_write_json_to_file(temp_file):
+    controller, __ = create_csv_controller()
+    data_file = temp_file()
+
+    with open(data_file, 'w') as f:
+        controller.write_test_data(f, output_format='json')
+
+    with open(data_file, 'r') as f:
+        assert f.read() == json.dumps(list(controller.get_test_data()), indent=4)
+
+
+def test_TestController_get_test_data_should_filter_test_names_and_settings():
+    tests = [DataTest(), CsvTest()]
+    tests[1].settings = {'setting': 'other'}
+    controller = TestController(TestRunner(tests=tests), email_on_except=False,
+                                log_func=lambda message: None)
+    controller.run_condition = sc_run_n_iterations(ntimes=2)
+    controller.run()
+
+    assert [list(d) for d in controller.get_test_data(test_names='.*CsvTest.*')] == \
+        [[str(tests[1])]] * 2
+    assert [list(d) for d in controller.get_test_data(settings={'setting': [1, 2]})] == \
+        [[str(tests[0])]] * 2
+
+
+def test_TestController_sleep_until_should_return_at_time():
+    controller, __ = create_controller(1)
+
+    start = time.monotonic()
+    assert controller.sleep_until(datetime.now() - timedelta(seconds=1)) is True
+    assert controller.sleep_until(datetime.now() + timedelta(seconds=0.1)) is True
+    assert time.monotonic() - start >= 0.1
+
+
+def test_TestController_sleep_until_should_return_early_when_woken():
+    controller, __ = create_controller(1)
+    threading.Timer(0.05, controller.wake).start()
+
+    start = time.monotonic()
+    assert controller.sleep_until(datetime.now() + timedelta(seconds=10)) is False
+    assert time.monotonic() - start < 5
+
+
+def test_TestController_should_sleep_until_next_run_of_run_condition():
+    controller, __ = create_controller(1)
+    controller.settings['run_forever'] = True
+    checks = []
+
+    @deferred_function
+    def run_every_100ms(TestController):
+        checks.append(time.monotonic())
+        if TestController.stats['num_iterations_run'] == 2:
+            raise InterruptedError()
+        return len(checks) % 2 == 1
+
+    @run_every_100ms.next_run_function
+    def next_run(TestController):
+        return datetime.now() + timedelta(seconds=0.1)
+
+    controller.run_condition = run_every_100ms
+    with pytest.raises(InterruptedError):
+        controller.run()
+
+    assert controller.stats['num_iterations_run'] == 2
+    assert checks[2] - checks[1] >= 0.1
+
+
+def test_sc_run_daily_at_hour_next_run_should_be_start_hour(monkeypatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2021, 3, 1, 10, 30)
+
+    monkeypatch.setattr(deffuncs, 'datetime', FixedDatetime)
+    controller, __ = create_controller(1)
+
+    assert sc_run_daily_at_hour(start_hour=12).next_run(controller) == \
+        datetime(2021, 3, 1, 12)
+    assert sc_run_daily_at_hour(start_hour=2).next_run(controller) == \
+        datetime(2021, 3, 1, 10, 30)
+
+    assert sc_run_daily_at_hour(start_hour=2).run(controller) is True
+    assert sc_run_daily_at_hour(start_hour=2).next_run(controller) == \
+        datetime(2021, 3, 2, 2)
+
+
+def test_sc_run_until_confident_should_stop_once_precise():
+    controller, __ = create_controller(1)
+    early_stopping = EarlyStopping(pass_rate_precision=0.2, max_iterations=100)
+    controller.run_condition = sc_run_until_confident(early_stopping=early_stopping)
+
+    assert controller.run() is True
+
+    assert 3 <= controller.stats['num_iterations_run'] < 100
+    assert early_stopping.iterations == controller.stats['num_iterations_run']
+    assert controller.data['sc_run_until_confident:early_stopping']['stop_reason']
@@ -1,3 +1,5 @@
+import pytest
+
 from pluma.test import TestGroup, TestBase
 
 
@@ -109,3 +111,29 @@ def test_TestGroup_get_test_by_name_returns_match(mock_board):
 
     test1 = group.tests[0]
     assert group.get_test_by_name(str(test1)) == test1
+
+
+def test_TestGroup_index_returns_position(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    tests = [MyTest(mock_board) for __ in range(3)]
+    group = TestGroup(tests=iter(tests))
+
+    assert [group.index(test) for test in tests] == [0, 1, 2]
+    assert group.get_test_by_name(str(tests[2])) is tests[2]
+    with pytest.raises(ValueError):
+        group.index(MyTest(mock_board))
+
+
+def test_TestGroup_add_test_should_error_on_duplicate_name(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    test = MyTest(mock_board)
+    group = TestGroup(tests=[test])
+
+    with pytest.raises(RuntimeError):
+        group.add_test(test)
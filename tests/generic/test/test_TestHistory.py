@@ -0,0 +1,69 @@
+import json
+
+from pluma.test import TestBase, TestHistory
+
+
+class DummyTest(TestBase):
+    def test_body(self):
+        pass
+
+
+def test_TestHistory_should_start_empty_without_file(tmp_path):
+    history = TestHistory(str(tmp_path / 'history.json'))
+
+    assert history.tests == {}
+    assert history.failure_score(DummyTest()) == 0
+
+
+def test_TestHistory_should_ignore_invalid_file(tmp_path):
+    history_file = tmp_path / 'history.json'
+    history_file.write_text('{not json')
+
+    assert TestHistory(str(history_file)).tests == {}
+
+
+def test_TestHistory_should_save_and_load_history(tmp_path):
+    history_file = str(tmp_path / 'history.json')
+    test = DummyTest(test_name='saved')
+    history = TestHistory(history_file)
+    history.record(test, passed=False, duration_s=2.0)
+    history.save()
+
+    loaded = TestHistory(history_file)
+
+    assert loaded.tests == {test.base_name: {'outcomes': [False], 'duration_s': 2.0}}
+    with open(history_file) as f:
+        assert json.load(f) == {'tests': loaded.tests}
+
+
+def test_TestHistory_should_keep_latest_outcomes(tmp_path):
+    test = DummyTest()
+    history = TestHistory(str(tmp_path / 'history.json'), history_size=3)
+    for passed in (False, True, True, False):
+        history.record(test, passed=passed)
+
+    assert history.tests[test.base_name]['outcomes'] == [True, True, False]
+
+
+def test_TestHistory_should_weigh_recent_failures_most(tmp_path):
+    recently_failed, failed_before = DummyTest(test_name='recent'), DummyTest(test_name='old')
+    history = TestHistory(str(tmp_path / 'history.json'))
+    for passed in (True, False):
+        history.record(recently_failed, passed=passed)
+    for passed in (False, True):
+        history.record(failed_before, passed=passed)
+
+    assert history.failure_score(recently_failed) > history.failure_score(failed_before) > 0
+
+
+def test_TestHistory_order_should_run_failing_then_shortest_tests_first(tmp_path):
+    passing_long = DummyTest(test_name='passing_long')
+    passing_short = DummyTest(test_name='passing_short')
+    failing = DummyTest(test_name='failing')
+    history = TestHistory(str(tmp_path / 'history.json'))
+    history.record(passing_long, passed=True, duration_s=60)
+    history.record(passing_short, passed=True, duration_s=1)
+    history.record(failing, passed=False, duration_s=600)
+
+    assert history.order([passing_long, passing_short, failing]) == \
+        [failing, passing_short, passing_long]
@@ -0,0 +1,109 @@
+import time
+
+from pluma.test import TestBase, TestResultCache
+
+
+class CacheableTest(TestBase):
+    cacheable = True
+
+    def __init__(self, files=None, **kwargs):
+        super().__init__(**kwargs)
+        self.files = files or []
+
+    def test_body(self):
+        pass
+
+    def cache_files(self):
+        return self.files
+
+
+def passed_data(data=None):
+    return {'tasks': {'ran': ['test_body'], 'failed': {}, 'usage': {}}, 'data': data or {}}
+
+
+def test_TestResultCache_should_not_cache_tests_not_cacheable(tmp_path):
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    cache = TestResultCache(str(tmp_path / 'cache.json'))
+    test = MyTest()
+    cache.put(test, passed_data())
+
+    assert cache.key(test) is None
+    assert cache.entries == {}
+
+
+def test_TestResultCache_should_only_cache_passed_tests(tmp_path):
+    cache = TestResultCache(str(tmp_path / 'cache.json'))
+    test = CacheableTest()
+    failed = passed_data()
+    failed['tasks']['failed'] = {'test_body': 'Failed'}
+
+    cache.put(test, failed)
+    assert cache.get(test) is None
+
+    cache.put(test, passed_data({'value': 1}))
+    assert cache.get(test)['data'] == {'value': 1}
+
+
+def test_TestResultCache_should_only_cache_target_tests_with_fingerprint(tmp_path):
+    test = CacheableTest()
+    test.run_on_host = False
+
+    assert TestResultCache(str(tmp_path / 'cache.json')).key(test) is None
+    assert TestResultCache(str(tmp_path / 'cache.json'), fingerprint='v1').key(test)
+
+    test.run_on_host = True
+    assert TestResultCache(str(tmp_path / 'cache.json')).key(test)
+
+
+def test_TestResultCache_key_should_depend_on_settings_files_and_fingerprint(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('a')
+    cache = TestResultCache(str(tmp_path / 'cache.json'), fingerprint='v1')
+    test = CacheableTest(files=[str(input_file)])
+    key = cache.key(test)
+
+    assert cache.key(CacheableTest(files=[str(input_file)])) == key
+
+    test.settings['param'] = 1
+    assert cache.key(test) != key
+    test.settings = {}
+
+    input_file.write_text('b')
+    assert cache.key(test) != key
+    input_file.write_text('a')
+
+    cache.fingerprint = 'v2'
+    assert cache.key(test) != key
+
+
+def test_TestResultCache_should_save_and_load_entries(tmp_path):
+    cache_file = str(tmp_path / 'cache.json')
+    test = CacheableTest()
+    cache = TestResultCache(cache_file)
+    cache.put(test, passed_data({'value': 1}))
+    cache.save()
+
+    assert TestResultCache(cache_file).get(test)['data'] == {'value': 1}
+
+
+def test_TestResultCache_should_ignore_invalid_file(tmp_path):
+    cache_file = tmp_path / 'cache.json'
+    cache_file.write_text('{not json')
+
+    assert TestResultCache(str(cache_file)).entries == {}
+
+
+def test_TestResultCache_should_expire_entries(tmp_path):
+    cache = TestResultCache(str(tmp_path / 'cache.json'), expiry_s=10)
+    test = CacheableTest()
+    cache.put(test, passed_data())
+    assert cache.get(test) is not None
+
+    cache.entries[cache.key(test)]['time'] = time.time() - 20
+    assert cache.get(test) is None
+
+    cache.save()
+    assert cache.entries == {}
@@ -1,6 +1,10 @@
+import threading
+import time
+import pytest
 from pluma.test.testrunner import TestRunnerParallel
-from unittest.mock import Mock, patch
-from pluma.test import TestRunner, TestBase
+from unittest.mock import ANY, Mock, patch
+from pluma.test import TestRunner, TestBase, Profiler, TestHistory, TestResultCache
+from pluma.core.baseclasses import cancellable_sleep
 from utils import PlumaOutputMatcher
 
 
@@ -320,7 +324,8 @@ def test_TestRunner_should_have_expected_data_single_test(mock_board):
             },
             'tasks': {
                 'failed': {},
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         }
     ]
 
@@ -361,7 +366,8 @@ def test_TestRunner_should_have_expected_data_multiple_tests_same_class(mock_boa
             },
             'tasks': {
                 'failed': {},
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         },
         {
             'data': {
@@ -373,7 +379,8 @@ def test_TestRunner_should_have_expected_data_multiple_tests_same_class(mock_boa
             },
             'tasks': {
                 'failed': {},
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         }
     ]
 
@@ -425,7 +432,8 @@ def test_TestRunner_should_have_expected_data_multiple_tests_different_class(moc
             },
             'tasks': {
                 'failed': {},
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         },
         {
             'data': {
@@ -438,7 +446,8 @@ def test_TestRunner_should_have_expected_data_multiple_tests_different_class(moc
             },
             'tasks': {
                 'failed': {},
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         }
     ]
 
@@ -477,7 +486,8 @@ def test_TestRunner_should_have_expected_data_on_test_body_and_teardown_failure(
                     'test_body': 'Foobar',
                     'teardown': 'Baz'
                 },
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         }
     ]
 
@@ -511,7 +521,8 @@ def test_TestRunner_should_have_expected_data_on_setup_failure(mock_board):
                 'failed': {
                     'setup': 'Hello'
                 },
-                'ran': ['setup']}
+                'ran': ['setup'],
+                'usage': ANY}
         }
     ]
 
@@ -545,7 +556,8 @@ def test_TestRunner_should_have_expected_data_on_test_body_failure(mock_board):
                 'failed': {
                     'test_body': 'Foobar'
                 },
-                'ran': ['setup', 'test_body', 'teardown']}
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
         }
     ]
 
@@ -569,3 +581,365 @@ def test_TestRunner_board_should_be_optional():
     )
 
     runner.run()
+
+
+def test_TestRunner_should_save_usage_of_each_task(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            time.sleep(0.05)
+
+        def teardown(self):
+            raise Exception('Baz')
+
+    runner = TestRunner(
+        board=mock_board,
+        tests=MyTest(mock_board),
+        continue_on_fail=True
+    )
+
+    runner.run()
+
+    usage = next(iter(runner.data.values()))['tasks']['usage']
+    assert list(usage) == ['setup', 'test_body', 'teardown']
+    assert usage['test_body']['wall_time_s'] >= 0.05
+    assert usage['test_body']['cpu_time_s'] >= 0
+    assert usage['test_body']['peak_rss_delta_kb'] >= 0
+    assert usage['teardown']['console_bytes_sent'] == 0
+
+
+def test_TestRunner_should_save_console_bytes_exchanged_by_task(mock_board, mock_console,
+                                                               mock_console_engine):
+    class MyTest(TestBase):
+        def test_body(self):
+            mock_console_engine.bytes_sent += 5
+            mock_console_engine.bytes_received += 12
+
+    mock_console.engine = mock_console_engine
+    mock_board.consoles = {'main': mock_console}
+    runner = TestRunner(
+        board=mock_board,
+        tests=MyTest(mock_board)
+    )
+
+    runner.run()
+
+    usage = next(iter(runner.data.values()))['tasks']['usage']['test_body']
+    assert usage['console_bytes_sent'] == 5
+    assert usage['console_bytes_received'] == 12
+
+
+def test_TestRunner_should_profile_tasks_of_each_test(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    test = MyTest(mock_board)
+    runner = TestRunner(
+        board=mock_board,
+        tests=test
+    )
+    runner.profiler = Profiler()
+
+    runner.run()
+    runner.profiler.stop()
+
+    assert list(runner.profiler.stats) == [str(test)]
+
+
+def test_TestRunner_should_run_prerequisites_first(mock_board):
+    ran = []
+
+    class MyTest(TestBase):
+        def test_body(self):
+            ran.append(self)
+
+    dependent = MyTest(mock_board, test_name='dependent')
+    dependent.depends_on = ['prerequisite']
+    prerequisite = MyTest(mock_board, test_name='prerequisite')
+
+    assert TestRunner(board=mock_board, tests=[dependent, prerequisite]).run() is True
+    assert ran == [prerequisite, dependent]
+
+
+def test_TestRunner_should_skip_tests_depending_on_failed_test(mock_board):
+    class FailingTest(TestBase):
+        def test_body(self):
+            raise Exception('Login failed')
+
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    failing = FailingTest(mock_board)
+    dependent = MyTest(mock_board, test_name='dependent')
+    dependent.depends_on = ['FailingTest']
+    indirect = MyTest(mock_board, test_name='indirect')
+    indirect.depends_on = ['dependent']
+    independent = MyTest(mock_board, test_name='independent')
+
+    runner = TestRunner(board=mock_board, tests=[failing, dependent, indirect, independent],
+                        continue_on_fail=True)
+
+    assert runner.run() is False
+    assert runner.data[str(dependent)]['tasks']['ran'] == []
+    assert runner.data[str(dependent)]['tasks']['skipped'] == \
+        f'Prerequisite failed: {failing}'
+    assert 'skipped' in runner.data[str(indirect)]['tasks']
+    assert runner.data[str(independent)]['tasks']['ran'] == ['setup', 'test_body', 'teardown']
+
+
+def test_TestRunner_should_error_on_unknown_or_circular_dependency(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    unknown = MyTest(mock_board)
+    unknown.depends_on = ['unknown']
+    with pytest.raises(ValueError):
+        TestRunner(board=mock_board, tests=unknown).run()
+
+    first, second = MyTest(mock_board, test_name='first'), MyTest(mock_board, test_name='second')
+    first.depends_on, second.depends_on = ['second'], ['first']
+    with pytest.raises(ValueError):
+        TestRunner(board=mock_board, tests=[first, second]).run()
+
+
+def test_TestRunner_should_run_tests_which_failed_before_first(mock_board, tmp_path):
+    ran = []
+
+    class MyTest(TestBase):
+        def test_body(self):
+            ran.append(self)
+            if self.settings.get('fail'):
+                raise Exception('Failed')
+
+    passing = MyTest(mock_board, test_name='passing')
+    failing = MyTest(mock_board, test_name='failing')
+    failing.settings['fail'] = True
+    runner = TestRunner(board=mock_board, tests=[passing, failing], continue_on_fail=True)
+    runner.history = TestHistory(str(tmp_path / 'history.json'))
+
+    runner.run()
+    ran.clear()
+    runner.run()
+
+    assert ran == [failing, passing]
+    assert TestHistory(runner.history.file).tests[failing.base_name]['outcomes'] == \
+        [False, False]
+
+
+def test_TestRunner_should_reuse_cached_results_of_passed_tests(mock_board, tmp_path):
+    ran = []
+
+    class MyTest(TestBase):
+        cacheable = True
+
+        def test_body(self):
+            ran.append(self)
+            self.save_data(value=1)
+            if self.settings.get('fail'):
+                raise Exception('Failed')
+
+    passing = MyTest(mock_board, test_name='passing')
+    failing = MyTest(mock_board, test_name='failing')
+    failing.settings['fail'] = True
+    runner = TestRunner(board=mock_board, tests=[passing, failing], continue_on_fail=True)
+    runner.result_cache = TestResultCache(str(tmp_path / 'cache.json'))
+
+    runner.run()
+    ran.clear()
+    runner.run()
+
+    assert ran == [failing]
+    assert runner.data[str(passing)]['tasks']['ran'] == ['setup', 'test_body', 'teardown']
+    assert runner.data[str(passing)]['tasks']['cached'] == {'time': ANY}
+    assert runner.data[str(passing)]['data'] == {'value': 1}
+    assert 'cached' not in runner.data[str(failing)]['tasks']
+    assert TestResultCache(runner.result_cache.file).get(passing) is not None
+
+
+def test_TestRunner_should_cancel_tasks_past_their_deadline(mock_board):
+    class SlowTest(TestBase):
+        def test_body(self):
+            cancellable_sleep(10)
+
+        def teardown(self):
+            cancellable_sleep(0)
+
+    test = SlowTest(mock_board)
+    test.task_deadline_s = 0.1
+    runner = TestRunner(board=mock_board, tests=test, continue_on_fail=True)
+
+    start = time.monotonic()
+    assert runner.run() is False
+
+    assert time.monotonic() - start < 5
+    assert runner.data[str(test)]['tasks']['ran'] == \
+        ['setup', 'test_body', 'teardown', 'teardown']
+    assert list(runner.data[str(test)]['tasks']['failed']) == ['test_body']
+    assert 'deadline' in runner.data[str(test)]['tasks']['failed']['test_body']
+
+
+def test_TestRunnerParallel_should_run_independent_tests_while_waiting_for_prerequisite(
+        mock_board):
+    prerequisite_started = threading.Event()
+    independent_ran = threading.Event()
+    ran = []
+
+    class SlowTest(TestBase):
+        resources = ['console']
+
+        def test_body(self):
+            prerequisite_started.set()
+            assert independent_ran.wait(timeout=5)
+            ran.append(self)
+
+    class MyTest(TestBase):
+        resources = ['console']
+
+        def test_body(self):
+            ran.append(self)
+            independent_ran.set()
+
+    prerequisite = SlowTest(mock_board)
+    dependent = MyTest(mock_board, test_name='dependent')
+    dependent.depends_on = ['SlowTest']
+    independent = MyTest(mock_board, test_name='independent')
+    independent.resources = []
+
+    runner = TestRunnerParallel(board=mock_board, tests=[prerequisite, dependent, independent],
+                                jobs=3)
+
+    assert runner.run() is True
+    assert ran == [independent, prerequisite, dependent]
+
+
+def test_TestRunnerParallel_should_skip_dependents_of_failed_test(mock_board):
+    class FailingTest(TestBase):
+        resources = []
+
+        def test_body(self):
+            raise Exception('Login failed')
+
+    class MyTest(TestBase):
+        resources = []
+
+        def test_body(self):
+            pass
+
+    failing = FailingTest(mock_board)
+    dependent = MyTest(mock_board)
+    dependent.depends_on = ['FailingTest']
+
+    runner = TestRunnerParallel(board=mock_board, tests=[failing, dependent],
+                                continue_on_fail=True, jobs=2)
+
+    assert runner.run() is False
+    assert runner.data[str(dependent)]['tasks']['ran'] == []
+    assert 'skipped' in runner.data[str(dependent)]['tasks']
+
+
+def test_TestRunnerParallel_should_run_tests_without_shared_resources_concurrently(mock_board):
+    barrier = threading.Barrier(2, timeout=5)
+
+    class MyTest(TestBase):
+        def test_body(self):
+            barrier.wait()
+
+    test1 = MyTest(mock_board)
+    test1.resources = ['console']
+    test2 = MyTest(mock_board)
+    test2.resources = []
+
+    runner = TestRunnerParallel(
+        board=mock_board,
+        tests=[test1, test2],
+        jobs=2
+    )
+
+    assert runner.run() is True
+
+
+def test_TestRunnerParallel_should_not_run_tests_with_shared_resources_concurrently(mock_board):
+    lock = threading.Lock()
+    overlaps = []
+
+    class MyTest(TestBase):
+        def test_body(self):
+            if not lock.acquire(blocking=False):
+                overlaps.append(self)
+                return
+            time.sleep(0.05)
+            lock.release()
+
+    tests = [MyTest(mock_board) for __ in range(3)]
+    for test in tests:
+        test.resources = ['console']
+
+    TestRunnerParallel(
+        board=mock_board,
+        tests=tests,
+        jobs=3
+    ).run()
+
+    assert overlaps == []
+
+
+def test_TestRunnerParallel_should_have_expected_data(mock_board):
+    class MyTest(TestBase):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.resources = []
+
+        def test_body(self):
+            self.save_data({'foo': 'bar'})
+
+    expected_data = [
+        {
+            'data': {
+                'foo': 'bar'
+            },
+            'order': order,
+            'settings': {},
+            'tasks': {
+                'failed': {},
+                'ran': ['setup', 'test_body', 'teardown'],
+                'usage': ANY}
+        } for order in range(2)
+    ]
+
+    runner = TestRunnerParallel(
+        board=mock_board,
+        tests=[MyTest(mock_board), MyTest(mock_board)],
+        jobs=2
+    )
+
+    runner.run()
+
+    assert PlumaOutputMatcher(
+        ['test_TestRunner.MyTest', 'test_TestRunner.MyTest'], expected_data) == runner.data
+
+
+def test_TestRunnerParallel_should_not_start_more_tests_if_failure_and_no_continue_on_fail(
+        mock_board):
+    class MyTest1(TestBase):
+        def test_body(self):
+            raise RuntimeError
+
+    class MyTest2(TestBase):
+        def test_body(self):
+            pass
+
+    test1 = MyTest1(mock_board)
+    test2 = MyTest2(mock_board)
+    test2.test_body = Mock(test2.test_body)
+
+    success = TestRunnerParallel(
+        board=mock_board,
+        tests=[test1, test2],
+        continue_on_fail=False,
+        jobs=2
+    ).run()
+
+    assert success is False
+    test2.test_body.assert_not_called()
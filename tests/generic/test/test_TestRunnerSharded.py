@@ -0,0 +1,169 @@
+import threading
+import time
+from unittest.mock import MagicMock, Mock
+
+from pluma import Board
+from pluma.test import TestBase, TestRunnerSharded, IterationPool, merge_iteration_results
+
+
+def create_boards(count):
+    boards = []
+    for index in range(count):
+        board = MagicMock(Board)
+        board.name = f'board{index}'
+        boards.append(board)
+
+    return boards
+
+
+def test_TestRunnerSharded_should_run_each_test_once_on_any_board():
+    boards = create_boards(2)
+    ran_on = {}
+
+    class MyTest(TestBase):
+        def test_body(self):
+            ran_on[str(self)] = self.board
+            self.save_data({'foo': 'bar'})
+
+    runner = TestRunnerSharded(boards=boards, tests=[MyTest(boards[0]) for __ in range(4)])
+
+    assert runner.run() is True
+    assert sorted(ran_on) == sorted(map(str, runner.tests))
+    for name, test_data in runner.data.items():
+        assert test_data['data'] == {'foo': 'bar'}
+        assert test_data['board'] == ran_on[name].name
+        assert test_data['tasks']['ran'] == ['setup', 'test_body', 'teardown']
+
+
+def test_TestRunnerSharded_should_run_tests_on_boards_concurrently():
+    boards = create_boards(2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    class MyTest(TestBase):
+        def test_body(self):
+            barrier.wait()
+
+    runner = TestRunnerSharded(boards=boards, tests=[MyTest(boards[0]), MyTest(boards[0])])
+
+    assert runner.run() is True
+    assert {data['board'] for data in runner.data.values()} == {'board0', 'board1'}
+
+
+def test_TestRunnerSharded_should_queue_longest_tests_first():
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    short, unknown, long = MyTest(test_name='short'), MyTest(), MyTest(test_name='long')
+    runner = TestRunnerSharded(boards=create_boards(1), durations={
+        short.base_name: 1, long.base_name: 10})
+
+    assert runner.queue_order([short, unknown, long]) == [long, short, unknown]
+
+
+def test_TestRunnerSharded_should_record_test_durations():
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    test = MyTest()
+    runner = TestRunnerSharded(boards=create_boards(1), tests=test)
+    runner.run()
+
+    assert runner.durations[test.base_name] >= 0
+
+
+def test_TestRunnerSharded_should_not_start_more_tests_if_failure_and_no_continue_on_fail():
+    class MyTest1(TestBase):
+        def test_body(self):
+            raise RuntimeError
+
+    class MyTest2(TestBase):
+        def test_body(self):
+            pass
+
+    test1 = MyTest1()
+    test2 = MyTest2()
+    test2.test_body = Mock(test2.test_body)
+
+    success = TestRunnerSharded(
+        boards=create_boards(1),
+        tests=[test1, test2],
+        continue_on_fail=False
+    ).run()
+
+    assert success is False
+    test2.test_body.assert_not_called()
+
+
+def test_IterationPool_should_give_each_iteration_once():
+    pool = IterationPool(100)
+    taken = []
+
+    def take_all():
+        while pool.take():
+            taken.append(1)
+
+    threads = [threading.Thread(target=take_all) for __ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(taken) == 100
+    assert pool.take() is False
+
+
+def test_merge_iteration_results_should_sort_and_renumber_iterations():
+    boards = create_boards(2)
+    controllers = [Mock(), Mock()]
+    controllers[0].testrunner.board = boards[0]
+    controllers[0].all_results.return_value = iter([{'iteration': 0, 'start': '2'}])
+    controllers[1].testrunner.board = boards[1]
+    controllers[1].all_results.return_value = iter([{'iteration': 0, 'start': '1'},
+                                                    {'iteration': 1, 'start': '3'}])
+
+    merged = list(merge_iteration_results(controllers))
+
+    assert merged == [
+        {'iteration': 0, 'start': '1', 'board': 'board1'},
+        {'iteration': 1, 'start': '2', 'board': 'board0'},
+        {'iteration': 2, 'start': '3', 'board': 'board1'},
+    ]
+
+
+def test_TestRunnerSharded_should_wait_for_prerequisites_on_other_boards():
+    boards = create_boards(2)
+    ran = []
+
+    class SlowTest(TestBase):
+        def test_body(self):
+            time.sleep(0.1)
+            ran.append(self)
+
+    class MyTest(TestBase):
+        def test_body(self):
+            ran.append(self)
+
+    prerequisite = SlowTest(boards[0])
+    dependent = MyTest(boards[0])
+    dependent.depends_on = ['SlowTest']
+
+    runner = TestRunnerSharded(boards=boards, tests=[dependent, prerequisite])
+
+    assert runner.run() is True
+    assert [str(test) for test in ran] == [str(prerequisite), str(dependent)]
+
+
+def test_TestRunnerSharded_should_queue_prerequisites_before_longer_tests():
+    class MyTest(TestBase):
+        def test_body(self):
+            pass
+
+    prerequisite, dependent = MyTest(test_name='short'), MyTest(test_name='long')
+    dependent.depends_on = ['short']
+    runner = TestRunnerSharded(boards=create_boards(1), durations={
+        prerequisite.base_name: 1, dependent.base_name: 10})
+    runner.prerequisites = runner.dependency_graph([prerequisite, dependent])
+
+    assert runner.queue_order([prerequisite, dependent]) == [prerequisite, dependent]
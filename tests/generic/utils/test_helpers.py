@@ -0,0 +1,34 @@
+from pluma.utils import RegexFilter, regex_filter_list, json_load, json_dump_atomic
+
+
+def test_RegexFilter_should_match_as_regex_filter_list():
+    patterns = ['Test[12]$', 'Other.*']
+    items = ['Test1', 'Test2', 'Test3', 'Other', 'Test1', 'NotOther']
+
+    assert RegexFilter(patterns).filter(items) == \
+        regex_filter_list(patterns, items, unique=True) == ['Other', 'Test1', 'Test2']
+
+
+def test_RegexFilter_should_cache_filtered_items():
+    regex_filter = RegexFilter(['Test.*'])
+
+    assert regex_filter.filter(['Test1', 'Foo']) is regex_filter.filter(['Test1', 'Foo'])
+    assert regex_filter.filter(['Test2']) == ['Test2']
+
+
+def test_json_dump_atomic_should_create_directories_and_replace_file(tmp_path):
+    file = str(tmp_path / 'directory' / 'file.json')
+
+    json_dump_atomic({'value': 1}, file)
+    json_dump_atomic({'value': 2}, file)
+
+    assert json_load(file) == {'value': 2}
+    assert not (tmp_path / 'directory' / 'file.json.tmp').exists()
+
+
+def test_json_load_should_return_none_if_missing_or_invalid(tmp_path):
+    invalid = tmp_path / 'invalid.json'
+    invalid.write_text('{"value":')
+
+    assert json_load(str(tmp_path / 'missing.json')) is None
+    assert json_load(str(invalid)) is None